@@ -0,0 +1,345 @@
+#!/usr/bin/env python
+"""
+Checker suite benchmark for the compliance checker.
+
+Times CheckSuite.run_all for each checker suite on synthetic netCDF datasets
+generated in a temporary directory, growing one size at a time from a small
+base dataset: the number of data variables, the number of attributes per
+variable, the number of time steps, the length of a contiguous ragged array
+of station time series and the node count of a CF 1.8 line geometry.  The
+fastest wall time of the runs and the peak Python memory allocation of a
+separate run under tracemalloc are reported, along with the number of check
+methods which raised.  No network access is needed, but wcrp_cmip6 needs the
+esgvoc vocabulary databases to be installed beforehand.
+
+Results can be saved with --json and compared with a saved baseline with
+--compare, which exits with status 1 when a case got slower than the
+threshold allows.
+
+    python benchmarks/bench_checkers.py -t cf:1.8 -a time_steps --json base.json
+    python benchmarks/bench_checkers.py -t cf:1.8 -a time_steps --compare base.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from netCDF4 import Dataset
+
+from compliance_checker.suite import CheckSuite
+
+CHECKERS = [
+    "cf:1.6",
+    "cf:1.7",
+    "cf:1.8",
+    "cf:1.9",
+    "cf:1.10",
+    "cf:1.11",
+    "acdd",
+    "ioos:1.2",
+    "wcrp_cmip6",
+]
+
+# sizes of each scaled dimension, the others are kept at their base size
+SIZES = {
+    "variables": [10, 100, 400],
+    "attributes": [10, 100, 1000],
+    "time_steps": [10, 1000, 10000],
+    "ragged_length": [10000, 100000, 1000000],
+    "geometry_nodes": [1000, 10000, 100000],
+}
+
+BASE = {
+    "variables": 4,
+    "attributes": 4,
+    "time_steps": 10,
+    "ragged_length": 100,
+    "geometry_nodes": 100,
+}
+
+GLOBAL_ATTRS = {
+    "Conventions": "CF-1.8, ACDD-1.3",
+    "title": "Synthetic benchmark dataset",
+    "summary": "Generated by benchmarks/bench_checkers.py",
+    "institution": "ESGF",
+    "source": "synthetic",
+    "history": "created for benchmarking",
+    "references": "none",
+    "keywords": "benchmark",
+    "license": "CC-BY-4.0",
+    "project": "CMIP6",
+    "mip_era": "CMIP6",
+    "activity_id": "CMIP",
+    "experiment_id": "historical",
+    "frequency": "day",
+    "table_id": "day",
+    "variable_id": "tas",
+    "variant_label": "r1i1p1f1",
+    "grid_label": "gn",
+    "source_id": "BENCH-1-0",
+    "institution_id": "ESGF",
+    "geospatial_lat_min": -85.0,
+    "geospatial_lat_max": 85.0,
+    "geospatial_lon_min": -175.0,
+    "geospatial_lon_max": 175.0,
+    "time_coverage_start": "2000-01-01T00:00:00Z",
+    "time_coverage_end": "2000-01-10T00:00:00Z",
+}
+
+
+def make_dataset(
+    path, variables, attributes, time_steps, ragged_length, geometry_nodes
+):
+    """
+    Writes a dataset with `variables` (time, lat, lon) data variables, each
+    with `attributes` extra attributes, `time_steps` time steps, a
+    contiguous ragged array of `ragged_length` observations and a line
+    geometry of `geometry_nodes` nodes.
+    """
+    rng = np.random.default_rng(0)
+    with Dataset(path, "w") as nc:
+        nc.setncatts(GLOBAL_ATTRS)
+        nc.featureType = "timeSeries"
+        nc.createDimension("time", time_steps)
+        nc.createDimension("lat", 18)
+        nc.createDimension("lon", 36)
+        nc.createDimension("bnds", 2)
+
+        time_var = nc.createVariable("time", "f8", ("time",))
+        time_var.setncatts(
+            {
+                "standard_name": "time",
+                "units": "days since 2000-01-01",
+                "calendar": "standard",
+                "axis": "T",
+                "bounds": "time_bnds",
+            },
+        )
+        time_var[:] = np.arange(time_steps) + 0.5
+        time_bnds = nc.createVariable("time_bnds", "f8", ("time", "bnds"))
+        time_bnds[:] = np.stack([np.arange(time_steps), np.arange(time_steps) + 1], 1)
+        for name, size, step, units, std_name, axis in (
+            ("lat", 18, 10.0, "degrees_north", "latitude", "Y"),
+            ("lon", 36, 10.0, "degrees_east", "longitude", "X"),
+        ):
+            coord = nc.createVariable(name, "f8", (name,))
+            coord.setncatts(
+                {"standard_name": std_name, "units": units, "axis": axis},
+            )
+            coord[:] = np.arange(size) * step - (size - 1) * step / 2
+
+        for i in range(variables):
+            var = nc.createVariable(
+                f"var{i}" if i else GLOBAL_ATTRS["variable_id"],
+                "f4",
+                ("time", "lat", "lon"),
+                fill_value=np.float32(1e20),
+            )
+            var.setncatts(
+                {
+                    "standard_name": "air_temperature",
+                    "long_name": f"Air temperature {i}",
+                    "units": "K",
+                    "coordinates": "time lat lon",
+                    "cell_methods": "time: mean",
+                },
+            )
+            var.setncatts({f"attr_{j}": f"value {j}" for j in range(attributes)})
+            var[:] = rng.uniform(200, 320, (time_steps, 18, 36)).astype("f4")
+
+        # contiguous ragged array of station time series, CF 9.3.3
+        nc.createDimension("station", 10)
+        nc.createDimension("obs", ragged_length)
+        station = nc.createVariable("station_name", str, ("station",))
+        station.cf_role = "timeseries_id"
+        station[:] = np.array([f"station {i}" for i in range(10)], dtype=object)
+        row_size = nc.createVariable("row_size", "i4", ("station",))
+        row_size.setncatts(
+            {"long_name": "number of observations", "sample_dimension": "obs"},
+        )
+        sizes = np.full(10, ragged_length // 10)
+        sizes[-1] += ragged_length - sizes.sum()
+        row_size[:] = sizes
+        obs_time = nc.createVariable("obs_time", "f8", ("obs",))
+        obs_time.setncatts(
+            {"standard_name": "time", "units": "days since 2000-01-01"},
+        )
+        obs_time[:] = np.concatenate([np.arange(size) for size in sizes])
+        obs = nc.createVariable("air_pressure", "f4", ("obs",))
+        obs.setncatts(
+            {
+                "standard_name": "air_pressure",
+                "units": "Pa",
+                "coordinates": "obs_time station_name",
+            },
+        )
+        obs[:] = rng.uniform(90000, 105000, ragged_length).astype("f4")
+
+        # line geometry, CF 7.5
+        nc.createDimension("instance", 10)
+        nc.createDimension("node", geometry_nodes)
+        container = nc.createVariable("geometry_container", "i4")
+        container.setncatts(
+            {
+                "geometry_type": "line",
+                "node_count": "node_count",
+                "node_coordinates": "x y",
+            },
+        )
+        node_count = nc.createVariable("node_count", "i4", ("instance",))
+        counts = np.full(10, geometry_nodes // 10)
+        counts[-1] += geometry_nodes - counts.sum()
+        node_count[:] = counts
+        for name, axis in (("x", "X"), ("y", "Y")):
+            node = nc.createVariable(name, "f8", ("node",))
+            node.setncatts({"units": "m", "axis": axis})
+            node[:] = np.cumsum(rng.uniform(0, 1, geometry_nodes))
+        discharge = nc.createVariable("discharge", "f4", ("instance",))
+        discharge.setncatts(
+            {"units": "m3 s-1", "geometry": "geometry_container"},
+        )
+        discharge[:] = rng.uniform(0, 100, 10).astype("f4")
+
+
+def run_case(cs, path, checker, repeat):
+    """
+    Returns the fastest run_all wall time, the peak memory allocated during
+    a traced run and the number of check methods which raised
+    """
+    times = []
+    errors = 0
+    for _ in range(repeat):
+        with Dataset(path) as ds:
+            start = time.perf_counter()
+            score_groups = cs.run_all(ds, [checker])
+            times.append(time.perf_counter() - start)
+        errors = sum(len(errs) for _groups, errs in score_groups.values())
+
+    with Dataset(path) as ds:
+        tracemalloc.start()
+        try:
+            cs.run_all(ds, [checker])
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return min(times), peak, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "-t",
+        "--test",
+        action="append",
+        default=[],
+        help="Checker suite to time, can be repeated.  Defaults to all of "
+        + ", ".join(CHECKERS),
+    )
+    parser.add_argument(
+        "-a",
+        "--axis",
+        action="append",
+        default=[],
+        choices=list(SIZES),
+        help="Dataset dimension to scale, can be repeated.  Defaults to all.",
+    )
+    parser.add_argument(
+        "-s",
+        "--steps",
+        type=int,
+        default=len(next(iter(SIZES.values()))),
+        help="Number of sizes of each dimension to time, from the smallest",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of runs, the fastest is reported",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Save the results as JSON")
+    parser.add_argument(
+        "--compare",
+        metavar="FILE",
+        help="Compare the times with the results saved in FILE",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="Slowdown over the compared results reported as a regression",
+    )
+    args = parser.parse_args()
+
+    checkers = args.test or CHECKERS
+    CheckSuite.load_checkers(checkers)
+    cs = CheckSuite()
+    for checker in checkers:
+        if checker not in cs.checkers:
+            print(f"{checker}: checker not installed, skipped", file=sys.stderr)
+    checkers = [checker for checker in checkers if checker in cs.checkers]
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {(r["checker"], r["axis"], r["size"]): r for r in json.load(f)}
+
+    results = []
+    regressions = 0
+    print(
+        f"{'checker':<12} {'axis':<15} {'size':>8} {'seconds':>9} "
+        f"{'peak MiB':>9} {'errors':>6}" + (f" {'vs base':>8}" if baseline else ""),
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # the first run of a checker instantiates it and loads its resources,
+        # such as the CF standard name table, which is not what is timed
+        path = os.path.join(tmpdir, "warmup.nc")
+        make_dataset(path, **BASE)
+        for checker in checkers:
+            with Dataset(path) as ds:
+                cs.run_all(ds, [checker])
+        os.remove(path)
+
+        for axis in args.axis or list(SIZES):
+            for size in SIZES[axis][: args.steps]:
+                path = os.path.join(tmpdir, f"{axis}_{size}.nc")
+                make_dataset(path, **dict(BASE, **{axis: size}))
+                for checker in checkers:
+                    seconds, peak, errors = run_case(cs, path, checker, args.repeat)
+                    line = (
+                        f"{checker:<12} {axis:<15} {size:>8} {seconds:>9.3f} "
+                        f"{peak / 2**20:>9.1f} {errors:>6}"
+                    )
+                    base = baseline.get((checker, axis, size))
+                    if base is not None:
+                        ratio = seconds / base["seconds"]
+                        line += f" {ratio:>7.2f}x"
+                        if ratio > args.threshold:
+                            regressions += 1
+                            line += "  slower"
+                    print(line, flush=True)
+                    results.append(
+                        {
+                            "checker": checker,
+                            "axis": axis,
+                            "size": size,
+                            "seconds": seconds,
+                            "peak_memory": peak,
+                            "errors": errors,
+                        },
+                    )
+                os.remove(path)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if regressions:
+        raise SystemExit(f"{regressions} case(s) slower than {args.threshold}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Result grouping benchmark for the compliance checker.
+
+Times CheckSuite.scores, which groups the raw results of a checker into the
+scored tree of the reports, against the recursive sort/groupby grouping it
+replaced, on synthetic raw results shaped like those of the CF and WCRP
+checkers: "flat" results named by one of a few sections, as TestCtx results
+are, and "nested" results of which half are named by a (section, variable)
+path.  A third of the results fail with a message.  Both groupings are
+checked to give the same tree.
+
+    python benchmarks/bench_grouping.py -n 10000 -n 100000
+"""
+
+import argparse
+import itertools
+import random
+import time
+
+from compliance_checker.base import BaseCheck, Result
+from compliance_checker.suite import CheckSuite
+
+WEIGHTS = [BaseCheck.HIGH, BaseCheck.MEDIUM, BaseCheck.LOW]
+
+
+def legacy_group_raw(raw_scores, cur=None, level=1):
+    """
+    The recursive grouping used by CheckSuite.scores before the trie
+    """
+
+    def trim_groups(r):
+        if isinstance(r.name, tuple) or isinstance(r.name, list):
+            new_name = r.name[1:]
+        else:
+            new_name = []
+
+        return Result(r.weight, r.value, new_name, r.msgs)
+
+    terminal = [len(x.name) for x in raw_scores]
+    if terminal == [0] * len(raw_scores):
+        return []
+
+    def group_func(r):
+        if isinstance(r.name, tuple) or isinstance(r.name, list):
+            if len(r.name) == 0:
+                retval = ""
+            else:
+                retval = r.name[0:1][0]
+        else:
+            retval = r.name
+        return retval, r.weight
+
+    grouped = itertools.groupby(sorted(raw_scores, key=group_func), key=group_func)
+
+    ret_val = []
+
+    for k, v in grouped:
+        k = k[0]
+        v = list(v)
+
+        cv = legacy_group_raw(list(map(trim_groups, v)), k, level + 1)
+        if len(cv):
+            max_weight = max([x.weight for x in cv])
+            sum_scores = tuple(map(sum, list(zip(*([x.value for x in cv])))))
+            msgs = []
+
+        else:
+            max_weight = max([x.weight for x in v])
+            sum_scores = tuple(
+                map(
+                    sum,
+                    list(zip(*([CheckSuite()._translate_value(x.value) for x in v]))),
+                ),
+            )
+            msgs = sum([x.msgs for x in v], [])
+
+        ret_val.append(
+            Result(
+                name=k,
+                weight=max_weight,
+                value=sum_scores,
+                children=cv,
+                msgs=msgs,
+            ),
+        )
+
+    return ret_val
+
+
+def make_results(count, nested, sections=40, variables=500, seed=0):
+    """
+    Returns count raw results spread over sections, and over variables
+    within the sections for half of them when nested is set
+    """
+    rng = random.Random(seed)
+    results = []
+    for i in range(count):
+        section = f"§{rng.randrange(sections)} Section"
+        weight = rng.choice(WEIGHTS)
+        passed = i % 3 != 0
+        msgs = [] if passed else [f"var{rng.randrange(variables)} failed check {i}"]
+        if not nested or rng.random() < 0.5:
+            name = section
+        else:
+            name = (section, f"var{rng.randrange(variables)}")
+        results.append(Result(weight, (int(passed), 1), name, msgs))
+    return results
+
+
+def best_time(func, raw_scores, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        groups = func(raw_scores)
+        times.append(time.perf_counter() - start)
+    return min(times), groups
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "-n",
+        "--results",
+        type=int,
+        action="append",
+        default=[],
+        help="Number of raw results to group, can be repeated. Defaults to 100000.",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of runs, the fastest is reported",
+    )
+    args = parser.parse_args()
+
+    cs = CheckSuite()
+    print(
+        f"{'names':<8} {'results':>10} {'legacy s':>10} {'trie s':>10} {'speedup':>8}"
+    )
+    for count in args.results or [100000]:
+        for shape in ("flat", "nested"):
+            raw_scores = make_results(count, nested=shape == "nested")
+            legacy, legacy_groups = best_time(legacy_group_raw, raw_scores, args.repeat)
+            trie, groups = best_time(cs.scores, raw_scores, args.repeat)
+            if [g.serialize() for g in groups] != [
+                g.serialize() for g in legacy_groups
+            ]:
+                raise SystemExit("The groupings differ")
+            print(
+                f"{shape:<8} {count:>10} {legacy:>10.3f} {trie:>10.3f} "
+                f"{legacy / trie:>7.1f}x",
+            )
+
+
+if __name__ == "__main__":
+    main()
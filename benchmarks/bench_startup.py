@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Startup benchmark for the compliance checker CLI.
+
+Times, in fresh interpreters, how long it takes to get the checkers needed
+for a run of a single suite, loading either every installed checker (the
+previous behaviour of cchecker.py) or only the selected one, and the wall
+time of `cchecker.py --list-tests`.
+
+    python benchmarks/bench_startup.py -t wcrp_cmip6 -t acdd -n 5
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+CCHECKER = os.path.join(os.path.dirname(os.path.dirname(__file__)), "cchecker.py")
+
+EAGER = (
+    "from compliance_checker.runner import CheckSuite\n"
+    "CheckSuite.load_all_available_checkers()\n"
+)
+
+LAZY = (
+    "from compliance_checker.runner import CheckSuite\n"
+    "CheckSuite.register_available_checkers()\n"
+    "CheckSuite.load_checkers([{!r}])\n"
+)
+
+
+def best_time(cmd, repeat):
+    """
+    Returns the fastest wall time of running a command `repeat` times
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "-t",
+        "--test",
+        action="append",
+        default=[],
+        help="Checker to time a single suite run for. Defaults to wcrp_cmip6.",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of runs, the fastest is reported",
+    )
+    args = parser.parse_args()
+
+    print(f"{'case':<36} {'seconds':>8}")
+    eager = best_time([sys.executable, "-c", EAGER], args.repeat)
+    print(f"{'load all checkers':<36} {eager:>8.3f}")
+    for checker in args.test or ["wcrp_cmip6"]:
+        lazy = best_time([sys.executable, "-c", LAZY.format(checker)], args.repeat)
+        label = f"load {checker} only"
+        print(f"{label:<36} {lazy:>8.3f}  ({eager / lazy:.1f}x)")
+    list_tests = best_time([sys.executable, CCHECKER, "--list-tests"], args.repeat)
+    print(f"{'cchecker.py --list-tests':<36} {list_tests:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,19 @@
 #!/usr/bin/env python
 
 import argparse
+import itertools
+import json
+import os
 import sys
 import warnings
 from collections import defaultdict
 from textwrap import dedent
 
 from compliance_checker import __version__
-from compliance_checker.cf.util import download_cf_standard_name_table
-from compliance_checker.runner import CheckSuite, ComplianceChecker
+
+# The checker modules and their dependencies (netCDF4, lxml, owslib, ...) are
+# imported inside the command functions, so that the thin `submit` client
+# does not pay for them at startup.
 
 
 def _print_checker_name_header(checker_str):
@@ -44,12 +49,310 @@ def parse_options(opts):
     return options_dict
 
 
+def _exit_status(passed, errors_occurred):
+    """
+    Maps the outcome of a run to the command line exit status: 2 if any
+    check raised an exception, 0 if all checks passed and 1 otherwise.
+    """
+    if errors_occurred:
+        return 2
+    return 0 if passed else 1
+
+
+def serve_main(argv):
+    """
+    Entry point for `cchecker.py serve`, which keeps the checkers loaded in a
+    resident process and checks datasets submitted over a Unix socket or
+    localhost HTTP.
+    """
+    from compliance_checker import service
+    from compliance_checker.cache import ResultCache
+    from compliance_checker.runner import CheckSuite
+
+    parser = argparse.ArgumentParser(prog="cchecker.py serve")
+    parser.add_argument(
+        "--socket",
+        help="Listen on this Unix domain socket path instead of TCP.",
+    )
+    parser.add_argument(
+        "--host",
+        default=service.DEFAULT_HOST,
+        help=(
+            f"Host to listen on. Defaults to {service.DEFAULT_HOST}. Hosts "
+            "other than loopback addresses require a token."
+        ),
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=service.DEFAULT_PORT,
+        help=f"Port to listen on. Defaults to {service.DEFAULT_PORT}.",
+    )
+    parser.add_argument(
+        "-O",
+        "--option",
+        default=[],
+        action="append",
+        help=(
+            "Additional options to be passed to the checkers, as "
+            "'<checker>:<option_name>[:<option_value>]'."
+        ),
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=True,
+        default=None,
+        metavar="PATH",
+        help="Reuse results from a persistent cache, as for the main command.",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get(service.TOKEN_ENV),
+        help=(
+            "Token clients must send to use the service. Defaults to the "
+            f"{service.TOKEN_ENV} environment variable."
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        cache = ResultCache(None if args.cache is True else args.cache)
+    check_suite = CheckSuite(options=parse_options(args.option), cache=cache)
+    check_suite.load_all_available_checkers()
+    try:
+        service.serve(check_suite, args.socket, args.host, args.port, args.token)
+    except ValueError as e:
+        parser.error(str(e))
+    return 0
+
+
+def submit_main(argv):
+    """
+    Entry point for `cchecker.py submit`, a thin client which sends datasets
+    to a running `cchecker.py serve` process and prints the 'json_new'
+    results.
+    """
+    from compliance_checker import service
+
+    parser = argparse.ArgumentParser(prog="cchecker.py submit")
+    parser.add_argument("--socket", help="Unix domain socket of the service.")
+    parser.add_argument(
+        "--host",
+        default=service.DEFAULT_HOST,
+        help=f"Host of the service. Defaults to {service.DEFAULT_HOST}.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=service.DEFAULT_PORT,
+        help=f"Port of the service. Defaults to {service.DEFAULT_PORT}.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds to wait for the service to respond.",
+    )
+    parser.add_argument(
+        "--token",
+        default=os.environ.get(service.TOKEN_ENV),
+        help=(
+            "Token of the service, if it requires one. Defaults to the "
+            f"{service.TOKEN_ENV} environment variable."
+        ),
+    )
+    parser.add_argument("--test", "-t", default=[], action="append")
+    parser.add_argument(
+        "--criteria",
+        "-c",
+        default="normal",
+        choices=["lenient", "normal", "strict"],
+    )
+    include_exclude = parser.add_mutually_exclusive_group()
+    include_exclude.add_argument("--skip-checks", "-s", action="append")
+    include_exclude.add_argument("--include-checks", "-i", action="append")
+    parser.add_argument("dataset_location", nargs="+")
+    args = parser.parse_args(argv)
+
+    # the service may run in a different working directory
+    dataset_locations = [
+        os.path.abspath(loc) if os.path.exists(loc) else loc
+        for loc in args.dataset_location
+    ]
+    try:
+        results, passed, errors_occurred = service.submit(
+            dataset_locations,
+            tests=args.test,
+            criteria=args.criteria,
+            skip_checks=args.skip_checks,
+            include_checks=args.include_checks,
+            socket_path=args.socket,
+            host=args.host,
+            port=args.port,
+            timeout=args.timeout,
+            token=args.token,
+        )
+    except (OSError, RuntimeError) as e:
+        print(f"Could not check datasets with the service: {e}", file=sys.stderr)
+        return 2
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    return _exit_status(passed, errors_occurred)
+
+
+def generate_main(argv):
+    """
+    Entry point for `cchecker.py generate`, which writes a CMIP6 DRS tree of
+    synthetic datasets for benchmarks and load tests.
+    """
+    from compliance_checker import synthetic
+
+    parser = argparse.ArgumentParser(prog="cchecker.py generate")
+    parser.add_argument("root", help="Directory to write the CMIP6 tree in.")
+    parser.add_argument(
+        "-n",
+        "--files",
+        type=int,
+        default=10,
+        help="Number of files to write. Defaults to 10.",
+    )
+    parser.add_argument(
+        "--files-per-dataset",
+        type=int,
+        default=2,
+        help="Number of consecutive time periods each dataset is split into. Defaults to 2.",
+    )
+    parser.add_argument(
+        "--time-steps",
+        type=int,
+        default=12,
+        help="Number of time steps per file. Defaults to 12.",
+    )
+    parser.add_argument(
+        "--file-size",
+        default=None,
+        help=(
+            "Approximate size of the data of each file, e.g. `100M`, which "
+            "sets the number of time steps for the grid."
+        ),
+    )
+    parser.add_argument(
+        "--grid",
+        default="36x72",
+        help="Number of latitudes and longitudes, as LATxLON. Defaults to 36x72.",
+    )
+    parser.add_argument(
+        "--chunk-time",
+        type=int,
+        default=0,
+        help="Length of the data chunks along time. Defaults to the netCDF library chunking.",
+    )
+    parser.add_argument(
+        "--complevel",
+        type=int,
+        default=0,
+        choices=range(10),
+        help="zlib compression level of the data. Defaults to 0, no compression.",
+    )
+    parser.add_argument(
+        "--defect-rate",
+        type=float,
+        default=0.0,
+        help="Share of the files given a defect. Defaults to 0.",
+    )
+    parser.add_argument(
+        "--defect",
+        action="append",
+        default=[],
+        choices=synthetic.DEFECTS,
+        help="Kind of defect to inject, can be repeated. Defaults to all kinds.",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the generated tree. Defaults to 0.",
+    )
+    parser.add_argument(
+        "--manifest",
+        help=(
+            "Write an ESGF mapfile listing the files, for `--from-file`.  The "
+            "defect of a file is added as a `defect=...` field."
+        ),
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        grid = tuple(int(size) for size in args.grid.lower().split("x"))
+        if len(grid) != 2:
+            raise ValueError
+    except ValueError:
+        parser.error(f"Invalid grid '{args.grid}', expected LATxLON")
+    time_steps = args.time_steps
+    if args.file_size:
+        try:
+            file_size = synthetic.parse_size(args.file_size)
+        except ValueError:
+            parser.error(f"Invalid file size '{args.file_size}'")
+        time_steps = max(file_size // (grid[0] * grid[1] * 4), 1)
+
+    manifest = open(args.manifest, "w", encoding="utf-8") if args.manifest else None
+    try:
+        for generated in synthetic.iter_tree(
+            args.root,
+            files=args.files,
+            files_per_dataset=args.files_per_dataset,
+            time_steps=time_steps,
+            grid=grid,
+            chunk_time=args.chunk_time,
+            complevel=args.complevel,
+            defect_rate=args.defect_rate,
+            defects=args.defect or synthetic.DEFECTS,
+            seed=args.seed,
+        ):
+            if manifest is not None:
+                line = f"{generated.dataset_id} | {generated.path} | {generated.size}"
+                if generated.defect:
+                    line += f" | defect={generated.defect}"
+                manifest.write(line + "\n")
+    finally:
+        if manifest is not None:
+            manifest.close()
+    return 0
+
+
 def main():
-    # Load all available checker classes
+    # The service and generator commands take their own arguments
+    if sys.argv[1:2] == ["serve"]:
+        return serve_main(sys.argv[2:])
+    if sys.argv[1:2] == ["submit"]:
+        return submit_main(sys.argv[2:])
+    if sys.argv[1:2] == ["generate"]:
+        return generate_main(sys.argv[2:])
+
+    from compliance_checker.cache import ResultCache
+    from compliance_checker.crawler import expand_locations, iter_manifest_file
+    from compliance_checker.journal import CheckJournal
+    from compliance_checker.runner import (
+        CRITERIA_LIMITS,
+        CheckSuite,
+        ComplianceChecker,
+    )
+    from compliance_checker.sampling import SamplingPolicy
+
+    # Register the available checkers; only the selected ones are imported
     check_suite = CheckSuite()
-    check_suite.load_all_available_checkers()
+    check_suite.register_available_checkers()
 
-    parser = argparse.ArgumentParser()
+    parser = argparse.ArgumentParser(
+        epilog=(
+            "Use `serve` as the first argument to start a resident checker "
+            "service and `submit` to send datasets to it; see "
+            "`cchecker.py serve -h` and `cchecker.py submit -h`."
+        ),
+    )
     parser.add_argument(
         "--test",
         "-t",
@@ -145,9 +448,12 @@ def main():
             " key, whereas the 'json_new' format has the dataset name(s) as the"
             " main key in the output follow by any checks as subkeys.  Also, "
             "'json' format can be only be run against one input file, whereas "
-            "'json_new' can be run against multiple files."
+            "'json_new' can be run against multiple files.  The 'jsonl' "
+            "format writes one line of JSON per dataset, in the same layout "
+            "as a 'json_new' dataset entry, as soon as that dataset has been "
+            "checked, without keeping earlier results in memory."
         ),
-        choices=["text", "html", "json", "json_new"],
+        choices=["text", "html", "json", "json_new", "jsonl"],
     )
 
     parser.add_argument(
@@ -189,6 +495,167 @@ def main():
         ),
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Number of worker processes used to check multiple datasets in "
+            "parallel.  Each worker opens its own dataset handles and results "
+            "are reported in input order.  Use 0 for one process per CPU. "
+            "Defaults to 1 (serial)."
+        ),
+    )
+
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "Number of datasets prefetched in background threads while the "
+            "current ones are checked: remote datasets are probed and "
+            "downloaded concurrently, and the headers of local files read "
+            "ahead, which helps on network file systems.  Defaults to 0 (off)."
+        ),
+    )
+
+    parser.add_argument(
+        "--host-limit",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "Maximum number of datasets prefetched at once from the same "
+            "host, to stay within the connection limits of a server.  "
+            "Defaults to 0 (no limit)."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=True,
+        default=None,
+        metavar="PATH",
+        help=(
+            "Reuse results from a persistent cache for local files which have "
+            "not changed since they were last checked with the same checkers, "
+            "versions and options.  Optionally takes the path of the SQLite "
+            "cache file, which defaults to results.sqlite in the compliance "
+            "checker data directory."
+        ),
+    )
+
+    parser.add_argument(
+        "--cache-hash-content",
+        action="store_true",
+        help=(
+            "With `--cache`, also key cached results on a hash of the file "
+            "contents instead of only the file size and modification time."
+        ),
+    )
+
+    parser.add_argument(
+        "--journal",
+        default=None,
+        metavar="PATH",
+        help=(
+            "Record the results of each dataset in a SQLite checkpoint "
+            "journal as soon as it has been checked, so that an interrupted "
+            "run can be continued with `--resume`.  Without `--resume`, the "
+            "results already recorded in the journal are discarded at the "
+            "start of the run."
+        ),
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=(
+            "With `--journal`, skip the datasets recorded in the journal by "
+            "a previous run with the same checkers and options and report "
+            "their recorded results, so that the report is the same as that "
+            "of an uninterrupted run."
+        ),
+    )
+
+    parser.add_argument(
+        "--metadata-only",
+        action="store_true",
+        help=(
+            "Only run checks which inspect attributes, dimensions and "
+            "variable definitions, skipping checks which read variable data. "
+            "`-D` marks the checks which read data."
+        ),
+    )
+
+    parser.add_argument(
+        "--sample",
+        default=None,
+        metavar="SPEC",
+        help=(
+            "Let the checks which read variable data check a sample of the "
+            "data, spread over the first dimension of each variable, and report "
+            "the share of the values checked.  SPEC is `fraction:F` for a "
+            "fraction of the data, `bytes:N` for at most N bytes per variable "
+            "(with an optional K, M or G suffix) or `chunks:N` for N whole "
+            "HDF5 chunks, e.g. `--sample bytes:64M`."
+        ),
+    )
+
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help=(
+            "Stop checking a dataset at the first failed result which makes it "
+            "fail the `--criteria`, running path only checks first, then "
+            "metadata checks and checks which read data last.  The report of "
+            "a failing dataset then only holds the results obtained until then."
+        ),
+    )
+
+    parser.add_argument(
+        "--check-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=(
+            "Time budget for each check.  A check which exceeds it is "
+            "reported as an error and the remaining checks are run."
+        ),
+    )
+
+    parser.add_argument(
+        "--dataset-timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=(
+            "Time budget for all checks on a dataset.  Checks left once it is "
+            "used up are reported as errors without being run.  With "
+            "`--jobs`, a worker which cannot interrupt a check, e.g. one "
+            "blocked reading data, is stopped and replaced."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile-checks",
+        nargs="?",
+        type=int,
+        const=20,
+        default=None,
+        metavar="N",
+        help=(
+            "Record the wall time, CPU time and peak memory allocation of "
+            "each check.  The timings are added to JSON output under "
+            "'check_profile' and the N slowest checks over all datasets "
+            "(default 20) are listed on stderr.  Profiling slows down the "
+            "checks and bypasses `--cache`."
+        ),
+    )
+
     parser.add_argument(
         "-V",
         "--version",
@@ -209,6 +676,86 @@ def main():
         ),
     )
 
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help=(
+            "Treat local directories given as dataset locations as trees "
+            "(e.g. DRS trees) and check the files found below them.  Files "
+            "are discovered lazily, so checking starts as soon as the first "
+            "file is found."
+        ),
+    )
+
+    parser.add_argument(
+        "--from-file",
+        default=[],
+        action="append",
+        metavar="MANIFEST",
+        help=(
+            "Also check the datasets listed in a manifest file, either one "
+            "path per line or an ESGF mapfile.  The manifest is read one line "
+            "at a time while checking, and its name and line number are added "
+            "to the JSON results of each dataset as `manifest` and "
+            "`manifest_line`.  Use `-` for the standard input, named "
+            "`<stdin>`.  May be specified multiple times."
+        ),
+    )
+
+    parser.add_argument(
+        "--from-stdin",
+        action="store_true",
+        help="Also check the datasets listed on the standard input, as with `--from-file -`.",
+    )
+
+    parser.add_argument(
+        "--include-files",
+        default=[],
+        action="append",
+        help=(
+            "With `-r`, only check files whose name or path relative to the "
+            "crawled directory matches this glob pattern.  May be specified "
+            "multiple times."
+        ),
+    )
+
+    parser.add_argument(
+        "--exclude-files",
+        default=[],
+        action="append",
+        help=(
+            "With `-r`, skip files and directories whose name or relative "
+            "path matches this glob pattern.  May be specified multiple times."
+        ),
+    )
+
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        help=(
+            "With `-r`, the maximum number of directory levels to descend. "
+            "Unlimited by default."
+        ),
+    )
+
+    parser.add_argument(
+        "--extension",
+        default=[],
+        action="append",
+        help="With `-r`, file extension(s) of the files to check. Defaults to '.nc'.",
+    )
+
+    parser.add_argument(
+        "--match-magic",
+        action="store_true",
+        help=(
+            "With `-r`, select netCDF files by their magic bytes instead of "
+            "by extension."
+        ),
+    )
+
     parser.add_argument(
         "-l",
         "--list-tests",
@@ -240,12 +787,32 @@ def main():
         sys.exit(0)
 
     options_dict = parse_options(args.option) if args.option else defaultdict(dict)
+    if args.profile_checks is not None:
+        options_dict["profile"] = True
+    if args.metadata_only:
+        options_dict["metadata_only"] = True
+    if args.sample:
+        try:
+            SamplingPolicy.from_spec(args.sample)
+        except ValueError as e:
+            parser.error(str(e))
+        options_dict["sample"] = args.sample
+    if args.fail_fast:
+        options_dict["fail_fast"] = CRITERIA_LIMITS[args.criteria]
+    if args.check_timeout:
+        options_dict["check_timeout"] = args.check_timeout
+    if args.dataset_timeout:
+        options_dict["dataset_timeout"] = args.dataset_timeout
+    if args.resume and not args.journal:
+        parser.error("--resume requires --journal")
 
     if args.describe_checks:
         error_stat = 0
         if args.test:
             checker_names = set(args.test)
+            check_suite.load_checkers(checker_names)
         else:
+            check_suite.load_all_available_checkers()
             # skip "latest" meta-versions (":latest" or no explicit version
             # specifier)
             checker_names = [
@@ -273,9 +840,13 @@ def main():
         return 0
 
     if args.download_standard_names:
+        # compliance_checker.cf imports every CF checker
+        from compliance_checker.cf.util import download_cf_standard_name_table
+
         download_cf_standard_name_table(args.download_standard_names)
 
-    if len(args.dataset_location) == 0:
+    manifests = args.from_file + (["-"] if args.from_stdin else [])
+    if len(args.dataset_location) == 0 and not manifests:
         parser.print_help()
         sys.exit(1)
 
@@ -289,6 +860,54 @@ def main():
             file=sys.stderr,
         )
         sys.exit(2)
+    if args.recursive and output_len > 1:
+        print(
+            "Only one output file can be used when crawling directories with -r",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+    if manifests and output_len > 1:
+        print(
+            "Only one output file can be used when reading datasets from a manifest",
+            file=sys.stderr,
+        )
+        sys.exit(2)
+
+    # manifests are streamed, so that no list of their entries is built
+    dataset_locations = itertools.chain(
+        args.dataset_location,
+        *(iter_manifest_file(path) for path in manifests),
+    )
+    if args.recursive:
+        dataset_locations = expand_locations(
+            dataset_locations,
+            include=args.include_files,
+            exclude=args.exclude_files,
+            max_depth=args.max_depth,
+            extensions=args.extension or [".nc"],
+            match_magic=args.match_magic,
+        )
+
+    check_suite.load_checkers(args.test or ["acdd"])
+
+    cache = None
+    if args.cache:
+        cache = ResultCache(
+            None if args.cache is True else args.cache,
+            hash_content=args.cache_hash_content,
+        )
+
+    journal = None
+    if args.journal:
+        journal = CheckJournal(args.journal)
+        if not args.resume:
+            discarded = journal.clear()
+            if discarded:
+                print(
+                    f"Discarded {discarded} results recorded in {args.journal}, "
+                    "use --resume to continue the run which recorded them",
+                    file=sys.stderr,
+                )
 
     # Run the compliance checker
     # 2 modes, concatenated output file or multiple output files
@@ -296,12 +915,15 @@ def main():
     had_errors = []
     if output_len == 1:
         if args.format != "json":
+            sources = args.dataset_location + [
+                "<stdin>" if path == "-" else path for path in manifests
+            ]
             print(
-                f"Running Compliance Checker on the datasets from: {args.dataset_location}",
+                f"Running Compliance Checker on the datasets from: {sources}",
                 file=sys.stderr,
             )
         return_value, errors = ComplianceChecker.run_checker(
-            args.dataset_location,
+            dataset_locations,
             args.test or ["acdd"],
             args.verbose,
             args.criteria,
@@ -310,6 +932,12 @@ def main():
             args.output[0],
             args.format or ["text"],
             options=options_dict,
+            jobs=args.jobs,
+            cache=cache,
+            profile_top=args.profile_checks,
+            prefetch=args.prefetch,
+            journal=journal,
+            host_limit=args.host_limit,
         )
         return_values.append(return_value)
         had_errors.append(errors)
@@ -330,6 +958,12 @@ def main():
                 output,
                 args.format or ["text"],
                 options=options_dict,
+                jobs=args.jobs,
+                cache=cache,
+                profile_top=args.profile_checks,
+                prefetch=args.prefetch,
+                journal=journal,
+                host_limit=args.host_limit,
             )
             return_values.append(return_value)
             had_errors.append(errors)
@@ -0,0 +1 @@
+__version__ = '0.1.dev1+g2faa55db2'
\ No newline at end of file
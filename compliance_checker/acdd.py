@@ -20,8 +20,11 @@ from compliance_checker.base import (
     Result,
     check_has,
     ratable_result,
+    reads_data,
 )
 from compliance_checker.cf.util import _possiblexunits, _possibleyunits
+from compliance_checker.reduction import reduce_values, variable_stats
+from compliance_checker.sampling import sampled_message
 from compliance_checker.util import dateparse, datetime_is_iso, kvp_convert
 
 
@@ -81,6 +84,10 @@ class ACDDBaseCheck(BaseCheck):
         # to be used to format variable Result groups headers
         self._var_header = 'variable "{}" missing the following attributes:'
 
+    def reset(self):
+        super().reset()
+        self._applicable_variables = None
+
     # set up attributes according to version
     @check_has(BaseCheck.HIGH, gname="Global Attributes")
     def check_high(self, ds):
@@ -224,6 +231,7 @@ class ACDDBaseCheck(BaseCheck):
         # name="Global Attributes" so gets grouped with Global Attributes
         return Result(BaseCheck.MEDIUM, check, "Global Attributes", msgs=messages)
 
+    @reads_data
     def check_lat_extents(self, ds):
         """
         Check that the values of geospatial_lat_min/geospatial_lat_max
@@ -291,12 +299,10 @@ class ACDDBaseCheck(BaseCheck):
         # sort by criteria passed
         final_lats = sorted(lat_vars, key=lambda x: lat_vars[x], reverse=True)
 
-        obs_mins = {
-            var._name: np.nanmin(var) for var in final_lats if not np.isnan(var).all()
-        }
-        obs_maxs = {
-            var._name: np.nanmax(var) for var in final_lats if not np.isnan(var).all()
-        }
+        # a single read of each variable, skipping those without valid data
+        stats = {var._name: variable_stats(ds, var) for var in final_lats}
+        obs_mins = {name: s.nanmin for name, s in stats.items() if s.valid_count}
+        obs_maxs = {name: s.nanmax for name, s in stats.items() if s.valid_count}
 
         min_pass = any(np.isclose(lat_min, min_val) for min_val in obs_mins.values())
         max_pass = any(np.isclose(lat_max, max_val) for max_val in obs_maxs.values())
@@ -320,6 +326,7 @@ class ACDDBaseCheck(BaseCheck):
             msgs,
         )
 
+    @reads_data
     def check_lon_extents(self, ds):
         """
         Check that the values of geospatial_lon_min/geospatial_lon_max
@@ -389,12 +396,10 @@ class ACDDBaseCheck(BaseCheck):
         # sort by criteria passed
         final_lons = sorted(lon_vars, key=lambda x: lon_vars[x], reverse=True)
 
-        obs_mins = {
-            var._name: np.nanmin(var) for var in final_lons if not np.isnan(var).all()
-        }
-        obs_maxs = {
-            var._name: np.nanmax(var) for var in final_lons if not np.isnan(var).all()
-        }
+        # a single read of each variable, skipping those without valid data
+        stats = {var._name: variable_stats(ds, var) for var in final_lons}
+        obs_mins = {name: s.nanmin for name, s in stats.items() if s.valid_count}
+        obs_maxs = {name: s.nanmax for name, s in stats.items() if s.valid_count}
 
         min_pass = any(np.isclose(lon_min, min_val) for min_val in obs_mins.values())
         max_pass = any(np.isclose(lon_max, max_val) for max_val in obs_maxs.values())
@@ -476,13 +481,12 @@ class ACDDBaseCheck(BaseCheck):
                 msgs,
             )
 
-        zvalue = ds.variables[z_variable][:]
-        # If the array has fill values, which is allowed in the case of point
-        # features
-        if hasattr(zvalue, "mask"):
-            zvalue = zvalue[~zvalue.mask]
+        # Fill values are allowed in the case of point features, only the
+        # unmasked values are compared
+        stats = reduce_values(ds, ds.variables[z_variable])
+        coverage = stats.coverage
 
-        if zvalue.size == 0:
+        if stats.masked_count == stats.count:
             msgs.append(
                 "Cannot compare geospatial vertical extents "
                 "against min/max of data, as non-masked data "
@@ -495,20 +499,26 @@ class ACDDBaseCheck(BaseCheck):
                 msgs,
             )
         else:
-            zmin = zvalue.min()
-            zmax = zvalue.max()
-            if not np.isclose(vert_min, zmin):
+            zmin = stats.min
+            zmax = stats.max
+            # the min/max of the data may lie outside of a sample, only
+            # sampled values beyond the extents are wrong
+            sampled = coverage < 1
+            if not np.isclose(vert_min, zmin) and not (sampled and zmin > vert_min):
                 msgs.append(
                     f"geospatial_vertical_min != min({z_variable}) values, {vert_min} != {zmin}",
                 )
-            if not np.isclose(vert_max, zmax):
+            if not np.isclose(vert_max, zmax) and not (sampled and zmax < vert_max):
                 msgs.append(
                     f"geospatial_vertical_max != max({z_variable}) values, {vert_min} != {zmax}",
                 )
 
+        score = total - len(msgs)
+        if sampled:
+            msgs.append(sampled_message(z_variable, coverage))
         return Result(
             BaseCheck.MEDIUM,
-            (total - len(msgs), total),
+            (score, total),
             "geospatial_vertical_extents_match",
             msgs,
         )
@@ -544,6 +554,7 @@ class ACDDBaseCheck(BaseCheck):
             msgs,
         )
 
+    @reads_data
     def check_vertical_extents(self, ds):
         """
         Check that the values of geospatial_vertical_min/geospatial_vertical_max approximately match the data.
@@ -571,6 +582,7 @@ class ACDDBaseCheck(BaseCheck):
 
         return self._check_total_z_extents(ds, z_variable)
 
+    @reads_data
     def check_time_extents(self, ds):
         """
         Check that the values of time_coverage_start/time_coverage_end approximately match the data.
@@ -682,6 +694,7 @@ class ACDDNCCheck(BaseNCCheck, ACDDBaseCheck):
 
 class ACDD1_1Check(ACDDNCCheck):
     _cc_spec_version = "1.1"
+    _cc_reusable = True
     _cc_description = "Attribute Conventions for Dataset Discovery (ACDD) 1.1"
     register_checker = True
 
@@ -701,6 +714,7 @@ class ACDD1_1Check(ACDDNCCheck):
 
 class ACDD1_3Check(ACDDNCCheck):
     _cc_spec_version = "1.3"
+    _cc_reusable = True
     _cc_description = "Attribute Conventions for Dataset Discovery (ACDD) 1.3"
     register_checker = True
 
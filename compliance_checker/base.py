@@ -7,6 +7,7 @@ import csv
 import itertools
 import pprint
 import re
+import sys
 import warnings
 from collections import defaultdict
 from functools import wraps
@@ -147,6 +148,12 @@ class BaseCheck:
 
     supported_ds = []
 
+    # Whether a CheckSuite may keep a single instance of this checker for all
+    # the datasets it checks.  Checkers setting this must clear any state
+    # left from the previous dataset in reset() or rebuild it in setup().
+    # Only read from the class defining it, so subclasses set it again.
+    _cc_reusable = False
+
     def setup(self, ds):
         """
         Common setup method for a Checker.
@@ -154,6 +161,15 @@ class BaseCheck:
         Automatically run when running a CheckSuite. Define this method in your Checker class.
         """
 
+    def reset(self):
+        """
+        Clears the state left behind by checking a dataset so the instance
+        can check another one, while keeping what was loaded in __init__.
+
+        Run by a CheckSuite before setup(ds) on reused checker instances.
+        """
+        self._defined_results = defaultdict(lambda: defaultdict(dict))
+
     def __init__(self, options=None):
         self._defined_results = defaultdict(lambda: defaultdict(dict))
         if options is None:
@@ -227,6 +243,12 @@ class BaseSOSDSCheck:
     supported_ds = [SensorML]
 
 
+# (score, out of) value -> the tuple instance shared by all results with it,
+# bounded for long running services
+_shared_values = {}
+_MAX_SHARED_VALUES = 65536
+
+
 class Result:
     """
     Holds the result of a check method.
@@ -236,8 +258,28 @@ class Result:
     is cast as a boolean using the bool() function.
 
     Stores the checker instance and the check method that produced this result.
+
+    A run over a large batch can hold millions of results, so their fields
+    are slots, string names are interned, (score, out of) values of plain
+    ints are shared between results and results without children share an
+    empty tuple.  This about halves the memory of a result; the fields are
+    not packed into arrays, since every output format walks Result objects.
+    A __dict__ is kept for attributes set by third-party checkers, and only
+    allocated for the results which get one.
     """
 
+    __slots__ = (
+        "__dict__",
+        "weight",
+        "value",
+        "name",
+        "msgs",
+        "children",
+        "checker",
+        "check_method",
+        "variable_name",
+    )
+
     def __init__(
         self,
         weight=BaseCheck.MEDIUM,
@@ -258,17 +300,25 @@ class Result:
                 raise ValueError(
                     f"Result value must be 2-tuple or boolean! Got {value}",
                 )
+            if (
+                type(value[0]) is int
+                and type(value[1]) is int
+                and len(_shared_values) < _MAX_SHARED_VALUES
+            ):
+                value = _shared_values.setdefault(value, value)
             self.value = value
         else:
             self.value = bool(value)
-        self.name = name
+        self.name = sys.intern(name) if type(name) is str else name
         self.msgs = msgs or []
 
-        self.children = children or []
+        self.children = children or ()
 
         self.checker = checker
         self.check_method = check_method
-        self.variable_name = variable_name
+        self.variable_name = (
+            sys.intern(variable_name) if type(variable_name) is str else variable_name
+        )
 
     def __repr__(self):
         ret = f"{self.name} (*{self.weight}): {self.value}"
@@ -589,6 +639,53 @@ def check_has(priority=BaseCheck.HIGH, gname=None):
     return _inner
 
 
+def reads_data(func):
+    """
+    Decorator marking a check method which reads variable data, as opposed
+    to checks which only inspect the dataset's attributes, dimensions and
+    variable definitions.  Marked checks are skipped by metadata only runs.
+    The mark is kept by decorators which use functools.wraps.
+    :param function func: check method to mark
+    """
+    func.reads_data = True
+    return func
+
+
+def check_reads_data(method):
+    """
+    Returns True if a check method was marked with the reads_data decorator
+    :param method: check method, bound or not
+    :rtype: bool
+    """
+    return getattr(method, "reads_data", False)
+
+
+def path_only(func):
+    """
+    Decorator marking a check method which only inspects the dataset's path
+    or file name, e.g. DRS filename checks.  Fail-fast runs run these checks
+    before those reading the dataset's metadata.
+    :param function func: check method to mark
+    """
+    func.path_only = True
+    return func
+
+
+def check_cost(method):
+    """
+    Returns the relative cost of a check method: 0 for checks marked with
+    path_only, 2 for checks marked with reads_data and 1 for the checks
+    which inspect the dataset's metadata
+    :param method: check method, bound or not
+    :rtype: int
+    """
+    if getattr(method, "path_only", False):
+        return 0
+    if check_reads_data(method):
+        return 2
+    return 1
+
+
 def fix_return_value(v, method_name, method=None, checker=None):
     """
     Transforms scalar return values into Result.
@@ -598,7 +695,8 @@ def fix_return_value(v, method_name, method=None, checker=None):
     if v is None or not isinstance(v, Result):
         v = Result(value=v, name=method_name)
 
-    v.name = v.name or method_name
+    if not v.name:
+        v.name = sys.intern(method_name)
 
     v.checker = checker
     v.check_method = method
@@ -0,0 +1,184 @@
+"""
+compliance_checker/cache.py
+
+Persistent store of check results for unchanged local datasets
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+
+from compliance_checker import __version__
+
+
+def _file_digest(path):
+    """
+    Returns the SHA-256 hex digest of a file's contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _options_digest(options):
+    """
+    Returns a digest of the effective checker options.  Option values which
+    point to existing files, such as the WCRP `project_config_path` TOML
+    file, contribute their contents so that editing the file invalidates
+    cached results.  Run settings which are not per checker options, such as
+    time budgets, are left out; make_key adds those which change the results.
+    """
+    checker_options = {
+        name: opts for name, opts in options.items() if isinstance(opts, dict)
+    }
+    digest = hashlib.sha256(
+        json.dumps(checker_options, sort_keys=True, default=str).encode(),
+    )
+    for checker_opts in checker_options.values():
+        for _, value in sorted(checker_opts.items()):
+            if isinstance(value, str) and os.path.isfile(value):
+                digest.update(_file_digest(value).encode())
+    return digest.hexdigest()
+
+
+def run_key(suite, checker_names, include_checks, skip_checks):
+    """
+    Returns a digest of everything besides the dataset which determines the
+    results of checking it: the compliance checker and checker versions, the
+    included/skipped checks, the run settings which change results and the
+    checker options
+    """
+    checker_versions = [
+        (name, getattr(suite.checkers.get(name), "_cc_spec_version", None))
+        for name in (checker_names or sorted(suite.checkers))
+    ]
+    return hashlib.sha256(
+        json.dumps(
+            [
+                __version__,
+                checker_versions,
+                sorted(include_checks or []),
+                sorted(skip_checks or []),
+                bool(suite.options.get("metadata_only")),
+                suite.options.get("fail_fast"),
+                str(suite.options.get("sample")),
+                _options_digest(suite.options),
+            ],
+        ).encode(),
+    ).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite backed store of grouped check results, keyed on a local file's
+    path, size and modification time (and optionally a hash of its
+    contents), along with the checkers run and their versions, the compliance
+    checker version, the included/skipped checks and the checker options.
+
+    A lookup only costs a stat() call when the hash is disabled, so
+    re-checking an archive which has not changed is cheap.  Connections are
+    opened lazily and not pickled, which lets a cache be handed to process
+    pool workers.
+    """
+
+    def __init__(self, path=None, hash_content=False):
+        """
+        :param str path: Location of the SQLite database.  Defaults to
+                         results.sqlite in the compliance checker data dir.
+        :param bool hash_content: Also key results on a SHA-256 hash of the
+                                  file contents, which requires reading
+                                  every file in full
+        """
+        if path is None:
+            # compliance_checker.cf imports every CF checker, which is only
+            # done when the default location is needed
+            from compliance_checker.cf.util import create_cached_data_dir
+
+            path = os.path.join(create_cached_data_dir(), "results.sqlite")
+        self.path = path
+        self.hash_content = hash_content
+        self._conn = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            # allow several worker processes to read while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "path TEXT NOT NULL, run_key TEXT NOT NULL, size INTEGER, "
+                "mtime_ns INTEGER, content_hash TEXT, data BLOB, "
+                "PRIMARY KEY (path, run_key))",
+            )
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def make_key(self, suite, ds_loc, checker_names, include_checks, skip_checks):
+        """
+        Builds the cache key for checking a dataset.  Returns None for
+        locations which cannot be cached, i.e. remote resources and
+        directories.
+
+        :param CheckSuite suite: The suite running the checks
+        :param str ds_loc: Dataset location
+        :param list checker_names: Names of the checkers to run
+        :param list include_checks: Names of checks to include
+        :param list skip_checks: Names of checks to skip
+        :rtype: tuple or None
+        """
+        ds_loc = os.fspath(ds_loc)
+        try:
+            stat = os.stat(ds_loc)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isfile(ds_loc):
+            return None
+
+        content_hash = _file_digest(ds_loc) if self.hash_content else ""
+        return (
+            os.path.abspath(ds_loc),
+            run_key(suite, checker_names, include_checks, skip_checks),
+            stat.st_size,
+            stat.st_mtime_ns,
+            content_hash,
+        )
+
+    def get(self, key):
+        """
+        Returns the cached score groups for a key made by make_key, or None
+        on a miss
+        """
+        path, run_key, size, mtime_ns, content_hash = key
+        row = self.conn.execute(
+            "SELECT data FROM results WHERE path = ? AND run_key = ? "
+            "AND size = ? AND mtime_ns = ? AND content_hash = ?",
+            (path, run_key, size, mtime_ns, content_hash),
+        ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def put(self, key, score_groups):
+        """
+        Stores score groups as returned by CheckSuite.run_all, replacing any
+        previous results for the same file and run
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (*key, pickle.dumps(score_groups, pickle.HIGHEST_PROTOCOL)),
+            )
@@ -4,6 +4,7 @@ from compliance_checker.base import BaseCheck, TestCtx
 from compliance_checker.cf.appendix_a import appendix_a
 from compliance_checker.cf.cf_1_10 import CF1_10Check
 from compliance_checker.cf.util import VariableReferenceError, reference_attr_variables
+from compliance_checker.dataset_index import get_variables_by_attributes
 
 
 @lru_cache
@@ -29,6 +30,7 @@ def _temperature_standard_names(standard_name_table):
 
 class CF1_11Check(CF1_10Check):
     _cc_spec_version = "1.11"
+    _cc_reusable = True
     _cc_url = "http://cfconventions.org/Data/cf-conventions/cf-conventions-1.11/cf-conventions.html"
 
     def __init__(self, options=None):
@@ -42,7 +44,8 @@ class CF1_11Check(CF1_10Check):
     # IMPLEMENTATION CONFORMANCE 3.1 RECOMMENDED
     def check_temperature_units_metadata(self, ds):
         """Checks that units_metadata exists for variables with standard name of temperature"""
-        temperature_variables = ds.get_variables_by_attributes(
+        temperature_variables = get_variables_by_attributes(
+            ds,
             standard_name=lambda s: s in _temperature_standard_names(self._std_names),
         )
         if not temperature_variables:
@@ -74,7 +77,8 @@ class CF1_11Check(CF1_10Check):
 
     def check_time_units_metadata(self, ds):
         """Checks that units_metadata exists for time coordinates with specific calendar attributes"""
-        time_variables = ds.get_variables_by_attributes(
+        time_variables = get_variables_by_attributes(
+            ds,
             standard_name="time",
             calendar=lambda c: c in {"standard", "proleptic_gregorian", "julian"},
         )
@@ -126,7 +130,8 @@ class CF1_11Check(CF1_10Check):
             for attribute_name, data_dict in appendix_a.items()
             if "BI" in data_dict["Use"]
         }
-        for parent_variable in ds.get_variables_by_attributes(
+        for parent_variable in get_variables_by_attributes(
+            ds,
             bounds=lambda b: b is not None,
         ):
             parent_bi_attrs = set(parent_variable.ncattrs()) & appendix_a_bi_attrs
@@ -195,7 +200,10 @@ class CF1_11Check(CF1_10Check):
         )
         cf_role_var_names = [
             var.name
-            for var in (ds.get_variables_by_attributes(cf_role=lambda x: x is not None))
+            for var in get_variables_by_attributes(
+                ds,
+                cf_role=lambda x: x is not None,
+            )
         ]
         test_ctx.assert_true(
             len(cf_role_var_names) < 2,
@@ -8,7 +8,7 @@ import regex
 from cf_units import Unit
 
 import compliance_checker.cf.util as cfutil
-from compliance_checker.base import BaseCheck, Result, TestCtx
+from compliance_checker.base import BaseCheck, Result, TestCtx, reads_data
 from compliance_checker.cf import util
 from compliance_checker.cf.appendix_c import valid_modifiers
 from compliance_checker.cf.appendix_d import dimless_vertical_coordinates_1_6
@@ -18,6 +18,8 @@ from compliance_checker.cf.appendix_f import (
     grid_mapping_dict16,
 )
 from compliance_checker.cf.cf_base import CFNCCheck, appendix_a_base
+from compliance_checker.dataset_index import get_variables_by_attributes
+from compliance_checker.reduction import variable_stats
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +33,7 @@ class CF1_6Check(CFNCCheck):
     register_checker = True
     _cc_spec = "cf"
     _cc_spec_version = "1.6"
+    _cc_reusable = True
     _cc_description = "Climate and Forecast Conventions (CF)"
     _cc_url = "http://cfconventions.org/cf-conventions/v1.6.0/cf-conventions.html"
     _cc_display_headers = {3: "Errors", 2: "Warnings", 1: "Info"}
@@ -169,10 +172,12 @@ class CF1_6Check(CFNCCheck):
         """
 
         results = []
-        add_offset_vars = ds.get_variables_by_attributes(
+        add_offset_vars = get_variables_by_attributes(
+            ds,
             add_offset=lambda x: x is not None,
         )
-        scale_factor_vars = ds.get_variables_by_attributes(
+        scale_factor_vars = get_variables_by_attributes(
+            ds,
             scale_factor=lambda x: x is not None,
         )
 
@@ -567,6 +572,7 @@ class CF1_6Check(CFNCCheck):
         return valid_globals.to_result()
 
     # IMPLEMENTATION CONFORMANCE 1.2
+    @reads_data
     def check_coordinate_variables_strict_monotonicity(self, ds):
         """
         Checks that data in coordinate variables is either monotonically
@@ -576,10 +582,15 @@ class CF1_6Check(CFNCCheck):
         ret_val = []
         for coord_var_name in self._find_coord_vars(ds):
             coord_var = ds.variables[coord_var_name]
-            arr_diff = np.diff(coord_var)
+            if coord_var.ndim == 1:
+                stats = variable_stats(ds, coord_var)
+                monotonic = stats.increasing or stats.decreasing
+            else:
+                arr_diff = np.diff(coord_var)
+                monotonic = np.all(arr_diff > 0) or np.all(arr_diff < 0)
             monotonicity = TestCtx(BaseCheck.HIGH, self.section_titles["1.2"])
             monotonicity.assert_true(
-                np.all(arr_diff > 0) or np.all(arr_diff < 0),
+                monotonic,
                 f'Coordinate variable "{coord_var_name}" must be strictly monotonic',
             )
             ret_val.append(monotonicity.to_result())
@@ -669,7 +680,8 @@ class CF1_6Check(CFNCCheck):
 
         dimless_vert = {
             var.name
-            for var in ds.get_variables_by_attributes(
+            for var in get_variables_by_attributes(
+                ds,
                 standard_name=lambda s: s in self.appendix_d_parametric_coords,
             )
             if not hasattr(var, "units")
@@ -1091,7 +1103,8 @@ class CF1_6Check(CFNCCheck):
         """
         ret_val = []
 
-        for ncvar in ds.get_variables_by_attributes(
+        for ncvar in get_variables_by_attributes(
+            ds,
             ancillary_variables=lambda x: x is not None,
         ):
             name = ncvar.name
@@ -1384,7 +1397,7 @@ class CF1_6Check(CFNCCheck):
         """
         ret_val = []
 
-        for variable in ds.get_variables_by_attributes(axis=lambda x: x is not None):
+        for variable in get_variables_by_attributes(ds, axis=lambda x: x is not None):
             name = variable.name
             # Coordinate compressions should not be checked as a valid
             # coordinate, which they are not. They are a mechanism to project
@@ -1539,7 +1552,7 @@ class CF1_6Check(CFNCCheck):
                 )
                 ret_val.append(recommended_units)
 
-            y_variables = ds.get_variables_by_attributes(axis="Y")
+            y_variables = get_variables_by_attributes(ds, axis="Y")
             # Check that latitude defines either standard_name or axis
             definition = TestCtx(BaseCheck.MEDIUM, self.section_titles["4.1"])
             definition.assert_true(
@@ -1648,7 +1661,7 @@ class CF1_6Check(CFNCCheck):
                 )
                 ret_val.append(recommended_units)
 
-            x_variables = ds.get_variables_by_attributes(axis="X")
+            x_variables = get_variables_by_attributes(ds, axis="X")
             # Check that longitude defines either standard_name or axis
             definition = TestCtx(BaseCheck.MEDIUM, self.section_titles["4.2"])
             definition.assert_true(
@@ -1949,73 +1962,9 @@ class CF1_6Check(CFNCCheck):
 
         ret_val = []
 
-        def check_standard_calendar_no_cross(time_var):
-            """
-            Check that the time variable does not cross the date
-            1582-10-15 when standard or gregorian calendars are used
-            """
-            # Short-circuit if using months/years.
-            if any(unit in time_var.units for unit in ("months", "years")):
-                return Result(
-                    BaseCheck.LOW,
-                    False,
-                    self.section_titles["4.4"],
-                    [
-                        "Miscellaneous failure when attempting to calculate crossover, possible malformed date",
-                    ],
-                )
-            time_values = time_var[:]
-
-            # IMPLEMENTATION CONFORMANCE 4.4.1 RECOMMENDED 2/2
-            # Only get non-nan/FillValue times, as these are the only things
-            # that make sense for conversion.  Furthermore, non-null checks
-            # should be made for time coordinate variables anyways, so errors
-            # should be caught where implemented there
-            crossover_date = cftime.DatetimeGregorian(1582, 10, 15)
-            crossover_date_value = cftime.date2num(
-                crossover_date,
-                time_var.units,
-                calendar=time_var.calendar,
-                has_year_zero=True,
-            )
-            # has_year_zero set to true in order to just check crossover,
-            # actual year less than or equal to zero check handled elsewhere
-            # when standard/Gregorian, or Julian calendars used.
-
-            # Comparing cftime objects is awfully slow. Converting them toordinal makes this a bit faster.
-            # https://github.com/ioos/compliance-checker/issues/1211
-            crossover_1582 = np.any(time_values < crossover_date_value) and np.any(
-                time_values >= crossover_date_value,
-            )
-            if not crossover_1582:
-                reasoning = (
-                    f"Variable {time_var.name} has standard or Gregorian "
-                    "calendar and does not cross 1582-10-15T00:00Z"
-                )
-            else:
-                reasoning = (
-                    f"Variable {time_var.name} has time values "
-                    "prior to 1582-10-15T00:00Z and utilizes "
-                    "the standard or Gregorian calendar"
-                )
-
-            return Result(
-                BaseCheck.LOW,
-                not crossover_1582,
-                self.section_titles["4.4"],
-                [reasoning],
-            )
-
         # if has a calendar, check that it is within the valid values
         # otherwise no calendar is valid
-
-        # this will only fetch variables with time units defined
-        for time_var_name in cfutil.get_time_variables(ds):
-            if time_var_name not in {var.name for var in util.find_coord_vars(ds)}:
-                continue
-            time_var = ds.variables[time_var_name]
-            if not hasattr(time_var, "calendar"):
-                continue
+        for time_var in self._calendar_time_variables(ds):
             if time_var.calendar.lower() == "gregorian":
                 reasoning = (
                     f"For time variable {time_var.name}, when using "
@@ -2030,11 +1979,6 @@ class CF1_6Check(CFNCCheck):
                     [reasoning],
                 )
                 ret_val.append(result)
-                # check here and in the below case that time does not cross
-                # thee date 1582-10-15 as requested by CF conformance
-                ret_val.append(check_standard_calendar_no_cross(time_var))
-            elif time_var.calendar == "standard":
-                ret_val.append(check_standard_calendar_no_cross(time_var))
             # if a nonstandard calendar, then leap_years and leap_months must
             # must be present
             if time_var.calendar.lower() not in standard_calendars:
@@ -2047,6 +1991,97 @@ class CF1_6Check(CFNCCheck):
 
         return ret_val
 
+    @reads_data
+    def check_calendar_crossover(self, ds):
+        """
+        Check that time variables with the standard or Gregorian calendar do
+        not cross the date 1582-10-15, which requires reading their values,
+        unlike the calendar attribute checks of check_calendar.
+
+        :param netCDF4.Dataset ds: An open netCDF dataset
+        :rtype: list
+        :return: List of results
+        """
+        ret_val = []
+        for time_var in self._calendar_time_variables(ds):
+            # as requested by CF conformance
+            if (
+                time_var.calendar.lower() == "gregorian"
+                or time_var.calendar == "standard"
+            ):
+                ret_val.append(self._check_standard_calendar_no_cross(ds, time_var))
+        return ret_val
+
+    def _calendar_time_variables(self, ds):
+        """
+        Returns the time coordinate variables with a calendar attribute
+        """
+        # this will only fetch variables with time units defined
+        coord_var_names = {var.name for var in util.find_coord_vars(ds)}
+        return [
+            ds.variables[time_var_name]
+            for time_var_name in cfutil.get_time_variables(ds)
+            if time_var_name in coord_var_names
+            and hasattr(ds.variables[time_var_name], "calendar")
+        ]
+
+    def _check_standard_calendar_no_cross(self, ds, time_var):
+        """
+        Check that the time variable does not cross the date
+        1582-10-15 when standard or gregorian calendars are used
+        """
+        # Short-circuit if using months/years.
+        if any(unit in time_var.units for unit in ("months", "years")):
+            return Result(
+                BaseCheck.LOW,
+                False,
+                self.section_titles["4.4"],
+                [
+                    "Miscellaneous failure when attempting to calculate crossover, possible malformed date",
+                ],
+            )
+        stats = variable_stats(ds, time_var)
+
+        # IMPLEMENTATION CONFORMANCE 4.4.1 RECOMMENDED 2/2
+        # Only get non-nan/FillValue times, as these are the only things
+        # that make sense for conversion.  Furthermore, non-null checks
+        # should be made for time coordinate variables anyways, so errors
+        # should be caught where implemented there
+        crossover_date = cftime.DatetimeGregorian(1582, 10, 15)
+        crossover_date_value = cftime.date2num(
+            crossover_date,
+            time_var.units,
+            calendar=time_var.calendar,
+            has_year_zero=True,
+        )
+        # has_year_zero set to true in order to just check crossover,
+        # actual year less than or equal to zero check handled elsewhere
+        # when standard/Gregorian, or Julian calendars used.
+
+        # Comparing cftime objects is awfully slow. Converting them toordinal makes this a bit faster.
+        # https://github.com/ioos/compliance-checker/issues/1211
+        crossover_1582 = bool(stats.valid_count) and (
+            stats.nanmin < crossover_date_value <= stats.nanmax
+        )
+        if not crossover_1582:
+            reasoning = (
+                f"Variable {time_var.name} has standard or Gregorian "
+                "calendar and does not cross 1582-10-15T00:00Z"
+            )
+        else:
+            reasoning = (
+                f"Variable {time_var.name} has time values "
+                "prior to 1582-10-15T00:00Z and utilizes "
+                "the standard or Gregorian calendar"
+            )
+
+        return Result(
+            BaseCheck.LOW,
+            not crossover_1582,
+            self.section_titles["4.4"],
+            [reasoning],
+        )
+
     def _check_leap_time(self, time_variable):
         """
         Helper method to handle checking custom calendar leap time specifications
@@ -2130,12 +2165,14 @@ class CF1_6Check(CFNCCheck):
         # these representaitions can be identified by two attributes:
 
         # required for contiguous
-        count_vars = ds.get_variables_by_attributes(
+        count_vars = get_variables_by_attributes(
+            ds,
             sample_dimension=lambda x: x is not None,
         )
 
         # required for indexed
-        index_vars = ds.get_variables_by_attributes(
+        index_vars = get_variables_by_attributes(
+            ds,
             instance_dimension=lambda x: x is not None,
         )
 
@@ -2715,6 +2752,7 @@ class CF1_6Check(CFNCCheck):
     # Chapter 6: Labels and Alternative Coordinates
     ###############################################################################
 
+    @reads_data
     def check_geographic_region(self, ds):
         """
         6.1.1 When data is representative of geographic regions which can be identified by names but which have complex
@@ -2803,7 +2841,7 @@ class CF1_6Check(CFNCCheck):
             ]
         )
 
-        for var in ds.get_variables_by_attributes(standard_name="region"):
+        for var in get_variables_by_attributes(ds, standard_name="region"):
             valid_region = TestCtx(BaseCheck.MEDIUM, self.section_titles["6.1"])
             region = var[:]
             if np.ma.isMA(region):
@@ -3026,7 +3064,8 @@ class CF1_6Check(CFNCCheck):
         :return: List of results
         """
         ret_val = []
-        variables = ds.get_variables_by_attributes(
+        variables = get_variables_by_attributes(
+            ds,
             cell_measures=lambda c: c is not None,
         )
         for var in variables:
@@ -3066,7 +3105,10 @@ class CF1_6Check(CFNCCheck):
             r"?(?P<over>over (?P<otypevar>\w+))?| ?)(?:\((?P<paren_contents>[^)]*)\))?",
         )
 
-        for var in ds.get_variables_by_attributes(cell_methods=lambda x: x is not None):
+        for var in get_variables_by_attributes(
+            ds,
+            cell_methods=lambda x: x is not None,
+        ):
             if not getattr(var, "cell_methods", ""):
                 continue
 
@@ -3272,7 +3314,8 @@ class CF1_6Check(CFNCCheck):
 
         # find any climatology axis variables; any variables which contain climatological stats will use
         # these variables as coordinates
-        clim_time_coord_vars = ds.get_variables_by_attributes(
+        clim_time_coord_vars = get_variables_by_attributes(
+            ds,
             climatology=lambda s: s is not None,
         )
 
@@ -3414,7 +3457,8 @@ class CF1_6Check(CFNCCheck):
         )
 
         # find any variables with a valid climatological cell_methods
-        for cell_method_var in ds.get_variables_by_attributes(
+        for cell_method_var in get_variables_by_attributes(
+            ds,
             cell_methods=lambda s: s is not None,
         ):
             if any(
@@ -3601,7 +3645,8 @@ class CF1_6Check(CFNCCheck):
         :return: List of results
         """
         ret_val = []
-        for compress_var in ds.get_variables_by_attributes(
+        for compress_var in get_variables_by_attributes(
+            ds,
             compress=lambda s: s is not None,
         ):
             valid = True
@@ -3715,7 +3760,10 @@ class CF1_6Check(CFNCCheck):
         valid_roles = ["timeseries_id", "profile_id", "trajectory_id"]
         variable_count = 0
         valid_cf_role = TestCtx(BaseCheck.HIGH, self.section_titles["9.5"])
-        for variable in ds.get_variables_by_attributes(cf_role=lambda x: x is not None):
+        for variable in get_variables_by_attributes(
+            ds,
+            cf_role=lambda x: x is not None,
+        ):
             variable_count += 1
             cf_role = variable.cf_role
             valid_cf_role.assert_true(
@@ -7,7 +7,7 @@ import numpy as np
 import pyproj
 
 import compliance_checker.cf.util as cfutil
-from compliance_checker.base import BaseCheck, Result, TestCtx
+from compliance_checker.base import BaseCheck, Result, TestCtx, reads_data
 from compliance_checker.cf.appendix_d import dimless_vertical_coordinates_1_7
 from compliance_checker.cf.appendix_e import cell_methods17
 from compliance_checker.cf.appendix_f import (
@@ -19,6 +19,9 @@ from compliance_checker.cf.appendix_f import (
 )
 from compliance_checker.cf.cf_1_6 import CF1_6Check
 from compliance_checker.cf.cf_base import appendix_a_base
+from compliance_checker.dataset_index import get_variables_by_attributes
+from compliance_checker.reduction import reduce_values
+from compliance_checker.sampling import sampled_message
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,7 @@ class CF1_7Check(CF1_6Check):
 
     # things that are specific to 1.7
     _cc_spec_version = "1.7"
+    _cc_reusable = True
     _cc_url = "http://cfconventions.org/Data/cf-conventions/cf-conventions-1.7/cf-conventions.html"
 
     appendix_a = appendix_a_base.copy()
@@ -96,6 +100,7 @@ class CF1_7Check(CF1_6Check):
 
         return external_vars_ctx.to_result()
 
+    @reads_data
     def check_actual_range(self, ds):
         """
         Check the actual_range attribute of variables. As stated in
@@ -157,16 +162,32 @@ class CF1_7Check(CF1_6Check):
 
                 # check equality to existing min/max values
                 # NOTE this is a data check
+                stats = reduce_values(ds, variable)
+                coverage = stats.coverage
                 # If every value is masked, a data check of actual_range isn't
                 # appropriate, so skip.
-                if not (hasattr(variable[:], "mask") and variable[:].mask.all()):
+                if stats.masked_count < stats.count:
                     # if min/max values aren't close to actual_range bounds,
                     # fail.
                     out_of += 1
-                    if not np.isclose(
-                        variable.actual_range[0],
-                        variable[:].min(),
-                    ) or not np.isclose(variable.actual_range[1], variable[:].max()):
+                    data_min, data_max = stats.min, stats.max
+                    if coverage < 1:
+                        # the min/max of the data may lie outside of a sample,
+                        # only sampled values beyond actual_range are wrong
+                        consistent = (
+                            data_min >= variable.actual_range[0]
+                            or np.isclose(variable.actual_range[0], data_min)
+                        ) and (
+                            data_max <= variable.actual_range[1]
+                            or np.isclose(variable.actual_range[1], data_max)
+                        )
+                        msgs.append(sampled_message(name, coverage))
+                    else:
+                        consistent = np.isclose(
+                            variable.actual_range[0],
+                            data_min,
+                        ) and np.isclose(variable.actual_range[1], data_max)
+                    if not consistent:
                         msgs.append(
                             f"actual_range elements of '{name}' inconsistent with its min/max values",
                         )
@@ -354,6 +375,7 @@ class CF1_7Check(CF1_6Check):
             ret_val.append(result)
         return ret_val
 
+    @reads_data
     def check_cell_boundaries_interval(self, ds):
         """
         7.1 Cell Boundaries
@@ -421,7 +443,8 @@ class CF1_7Check(CF1_6Check):
         :return: List of results
         """
         ret_val = []
-        variables = ds.get_variables_by_attributes(
+        variables = get_variables_by_attributes(
+            ds,
             cell_measures=lambda c: c is not None,
         )
         try:
@@ -21,9 +21,10 @@ from lxml import etree
 from netCDF4 import Dataset
 from shapely.geometry import Polygon
 
-from compliance_checker.base import BaseCheck, TestCtx
+from compliance_checker.base import BaseCheck, TestCtx, reads_data
 from compliance_checker.cf.cf_1_7 import CF1_7Check
 from compliance_checker.cf.util import reference_attr_variables, string_from_var_type
+from compliance_checker.dataset_index import get_variables_by_attributes
 
 
 class CF1_8Check(CF1_7Check):
@@ -31,6 +32,7 @@ class CF1_8Check(CF1_7Check):
 
     # things that are specific to 1.8
     _cc_spec_version = "1.8"
+    _cc_reusable = True
     _cc_url = "http://cfconventions.org/Data/cf-conventions/cf-conventions-1.8/cf-conventions.html"
 
     ROOT_GROUP_ONLY_ATTRS = ["Conventions", "external_variables"]
@@ -314,6 +316,7 @@ class CF1_8Check(CF1_7Check):
 
         return results
 
+    @reads_data
     def check_geometry(self, ds: Dataset):
         """Runs any necessary checks for geometry well-formedness
         :param netCDF4.Dataset ds: An open netCDF dataset
@@ -322,7 +325,8 @@ class CF1_8Check(CF1_7Check):
         results = []
         geom_valid = TestCtx(BaseCheck.MEDIUM, self.section_titles["7.5"])
 
-        vars_with_geometry = ds.get_variables_by_attributes(
+        vars_with_geometry = get_variables_by_attributes(
+            ds,
             geometry=lambda g: g is not None,
         )
 
@@ -702,6 +706,7 @@ class CF1_8Check(CF1_7Check):
             results.append(geom_valid.to_result())
         return results
 
+    @reads_data
     def check_taxa(self, ds: Dataset):
         """
         6.1.2. Taxon Names and Identifiers
@@ -747,7 +752,8 @@ class CF1_8Check(CF1_7Check):
                 and standard_name_string in self._std_names
             )
 
-        taxa_quantifier_variables = ds.get_variables_by_attributes(
+        taxa_quantifier_variables = get_variables_by_attributes(
+            ds,
             standard_name=match_taxa_standard_names,
         )
         # If there are no matches, there either are no taxa variables
@@ -12,6 +12,7 @@ import compliance_checker.cf.util as cfutil
 from compliance_checker.base import BaseCheck, BaseNCCheck, Result, TestCtx
 from compliance_checker.cf import util
 from compliance_checker.cf.appendix_d import no_missing_terms
+from compliance_checker.dataset_index import get_variables_by_attributes
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,9 @@ class CFBaseCheck(BaseCheck):
         self._aux_coords = defaultdict(list)
 
         self._std_names = util.StandardNameTable()
+        # the table shipped with the package, restored by reset() when a
+        # dataset asked for another version
+        self._packaged_std_names = self._std_names
 
         self.section_titles = {  # dict of section headers shared by grouped checks
             "1.2": "§1.2 Terminology",
@@ -90,6 +94,24 @@ class CFBaseCheck(BaseCheck):
     # Helper Methods - var classifications, etc
     ################################################################################
 
+    def reset(self):
+        """
+        Drops the variable classifications cached for previously checked
+        datasets and goes back to the packaged standard name table.
+        """
+        super().reset()
+        for cache in (
+            self._coord_vars,
+            self._ancillary_vars,
+            self._clim_vars,
+            self._metadata_vars,
+            self._boundary_vars,
+            self._geophysical_vars,
+            self._aux_coords,
+        ):
+            cache.clear()
+        self._std_names = self._packaged_std_names
+
     def setup(self, ds):
         """
         Initialize various special variable types within the class.
@@ -105,7 +127,8 @@ class CFBaseCheck(BaseCheck):
         self._find_metadata_vars(ds)
         self._find_cf_standard_name_table(ds)
         self._find_geophysical_vars(ds)
-        coord_containing_vars = ds.get_variables_by_attributes(
+        coord_containing_vars = get_variables_by_attributes(
+            ds,
             coordinates=lambda val: isinstance(val, str),
         )
 
@@ -177,7 +200,8 @@ class CFBaseCheck(BaseCheck):
         grid_mapping_variables = cfutil.get_grid_mapping_variables(ds)
 
         # Check the grid_mapping attribute to be a non-empty string and that its reference exists
-        for variable in ds.get_variables_by_attributes(
+        for variable in get_variables_by_attributes(
+            ds,
             grid_mapping=lambda x: x is not None,
         ):
             grid_mapping = getattr(variable, "grid_mapping", None)
@@ -280,7 +304,8 @@ class CFBaseCheck(BaseCheck):
             # Make sure that exactly one variable is defined for each of the required standard_names
             expected_std_names = grid_mapping[2]
             for expected_std_name in expected_std_names:
-                found_vars = ds.get_variables_by_attributes(
+                found_vars = get_variables_by_attributes(
+                    ds,
                     standard_name=expected_std_name,
                 )
                 valid_grid_mapping.assert_true(
@@ -895,7 +920,8 @@ class CFBaseCheck(BaseCheck):
         :returns: A list of variable dimensions
         """
         ret_val = []
-        for variable in ds.get_variables_by_attributes(
+        for variable in get_variables_by_attributes(
+            ds,
             cf_role=lambda x: isinstance(x, str),
         ):
             if variable.ndim > 0:
@@ -16,6 +16,8 @@ from cf_units import Unit
 from lxml import etree
 from netCDF4 import Dataset, Dimension, Group, Variable
 
+from compliance_checker.dataset_index import get_variables_by_attributes
+
 _UNITLESS_DB = None
 _SEA_NAMES = None
 
@@ -435,7 +437,8 @@ def get_auxiliary_coordinate_variables(nc):
 
     aux_vars = []
     # get any variables referenced by the coordinates attribute
-    for ncvar in nc.get_variables_by_attributes(
+    for ncvar in get_variables_by_attributes(
+        nc,
         coordinates=lambda x: isinstance(x, str),
     ):
         # split the coordinates into individual variable names
@@ -462,7 +465,8 @@ def get_auxiliary_coordinate_variables(nc):
     ]
     coordinate_standard_names += DIMENSIONLESS_VERTICAL_COORDINATES
     # Some datasets like ROMS use multiple variables to define coordinates
-    for ncvar in nc.get_variables_by_attributes(
+    for ncvar in get_variables_by_attributes(
+        nc,
         standard_name=lambda x: x in coordinate_standard_names,
     ):
         if ncvar.name not in aux_vars:
@@ -506,7 +510,7 @@ def get_cell_boundary_map(nc):
     :param netCDF4.Dataset nc: netCDF dataset
     """
     boundary_map = {}
-    for variable in nc.get_variables_by_attributes(bounds=lambda x: x is not None):
+    for variable in get_variables_by_attributes(nc, bounds=lambda x: x is not None):
         if variable.bounds in nc.variables:
             boundary_map[variable.name] = variable.bounds
     return boundary_map
@@ -520,7 +524,7 @@ def get_cell_boundary_variables(nc):
     :param netCDF4.Dataset nc: netCDF dataset
     """
     boundary_variables = []
-    has_bounds = nc.get_variables_by_attributes(bounds=lambda x: x is not None)
+    has_bounds = get_variables_by_attributes(nc, bounds=lambda x: x is not None)
     for var in has_bounds:
         if var.bounds in nc.variables:
             boundary_variables.append(var.bounds)
@@ -528,7 +532,10 @@ def get_cell_boundary_variables(nc):
 
 
 def get_bounds_variables(nc):
-    contains_bounds = nc.get_variables_by_attributes(bounds=lambda s: s in nc.variables)
+    contains_bounds = get_variables_by_attributes(
+        nc,
+        bounds=lambda s: s in nc.variables,
+    )
     return {nc.variables[parent_var.bounds] for parent_var in contains_bounds}
 
 
@@ -642,11 +649,11 @@ def get_latitude_variables(nc):
     """
     latitude_variables = []
     # standard_name takes precedence
-    for variable in nc.get_variables_by_attributes(standard_name="latitude"):
+    for variable in get_variables_by_attributes(nc, standard_name="latitude"):
         latitude_variables.append(variable.name)
 
     # Then axis
-    for variable in nc.get_variables_by_attributes(axis="Y"):
+    for variable in get_variables_by_attributes(nc, axis="Y"):
         if not (
             variable.name in latitude_variables
             or getattr(variable, "standard_name", None)
@@ -659,7 +666,7 @@ def get_latitude_variables(nc):
         value_set=VALID_LAT_UNITS,
         modifier_fn=lambda s: s.lower(),
     )
-    for variable in nc.get_variables_by_attributes(units=check_fn):
+    for variable in get_variables_by_attributes(nc, units=check_fn):
         if variable.name not in latitude_variables:
             latitude_variables.append(variable.name)
 
@@ -712,11 +719,11 @@ def get_longitude_variables(nc):
     """
     longitude_variables = []
     # standard_name takes precedence
-    for variable in nc.get_variables_by_attributes(standard_name="longitude"):
+    for variable in get_variables_by_attributes(nc, standard_name="longitude"):
         longitude_variables.append(variable.name)
 
     # Then axis
-    for variable in nc.get_variables_by_attributes(axis="X"):
+    for variable in get_variables_by_attributes(nc, axis="X"):
         if not (
             variable.name in longitude_variables
             or getattr(variable, "standard_name", None)
@@ -729,7 +736,7 @@ def get_longitude_variables(nc):
         value_set=VALID_LON_UNITS,
         modifier_fn=lambda s: s.lower(),
     )
-    for variable in nc.get_variables_by_attributes(units=check_fn):
+    for variable in get_variables_by_attributes(nc, units=check_fn):
         if variable.name not in longitude_variables:
             longitude_variables.append(variable.name)
 
@@ -812,7 +819,7 @@ def get_time_variable(nc):
         if getattr(nc.variables[var], "axis", "") == "T":
             return var
     else:
-        candidates = nc.get_variables_by_attributes(standard_name="time")
+        candidates = get_variables_by_attributes(nc, standard_name="time")
         if len(candidates) == 1:
             return candidates[0].name
         else:  # Look for a coordinate variable time
@@ -839,15 +846,15 @@ def get_time_variables(nc):
     :param netCDF4.Dataset nc: An open netCDF4 Dataset
     """
     time_variables = set()
-    for variable in nc.get_variables_by_attributes(standard_name="time"):
+    for variable in get_variables_by_attributes(nc, standard_name="time"):
         time_variables.add(variable.name)
 
-    for variable in nc.get_variables_by_attributes(axis="T"):
+    for variable in get_variables_by_attributes(nc, axis="T"):
         if variable.name not in time_variables:
             time_variables.add(variable.name)
 
     regx = r"^(?:day|d|hour|hr|h|minute|min|second|s)s? since .*$"
-    for variable in nc.get_variables_by_attributes(units=lambda x: isinstance(x, str)):
+    for variable in get_variables_by_attributes(nc, units=lambda x: isinstance(x, str)):
         if re.match(regx, variable.units) and variable.name not in time_variables:
             time_variables.add(variable.name)
 
@@ -861,7 +868,7 @@ def get_axis_variables(nc):
     :param netCDF4.Dataset nc: An open netCDF4 Dataset
     """
     axis_variables = []
-    for ncvar in nc.get_variables_by_attributes(axis=lambda x: x is not None):
+    for ncvar in get_variables_by_attributes(nc, axis=lambda x: x is not None):
         axis_variables.append(ncvar.name)
     return axis_variables
 
@@ -905,7 +912,8 @@ def _find_standard_name_modifier_variables(nc, return_deprecated=False):
 
     return [
         var.name
-        for var in nc.get_variables_by_attributes(
+        for var in get_variables_by_attributes(
+            nc,
             standard_name=match_modifier_variables,
         )
     ]
@@ -934,7 +942,7 @@ def get_grid_mapping_variables(nc):
     :param netCDF4.Dataset nc: An open netCDF4 Dataset
     """
     grid_mapping_variables = set()
-    for ncvar in nc.get_variables_by_attributes(grid_mapping=lambda x: x is not None):
+    for ncvar in get_variables_by_attributes(nc, grid_mapping=lambda x: x is not None):
         if ncvar.grid_mapping in nc.variables:
             grid_mapping_variables.add(ncvar.grid_mapping)
     return grid_mapping_variables
@@ -1072,7 +1080,7 @@ def is_dataset_valid_ragged_array_repr_featureType(nc, feature_type: str):
     # feature_type as we'll have to search for one with profile_id
     # regardless; if single feature type, cf_role must match that
     # featureType
-    cf_role_vars = nc.get_variables_by_attributes(cf_role=lambda x: x is not None)
+    cf_role_vars = get_variables_by_attributes(nc, cf_role=lambda x: x is not None)
     is_compound = False
     if feature_type.lower() in {"timeseriesprofile", "trajectoryprofile"}:
         is_compound = True
@@ -1084,7 +1092,7 @@ def is_dataset_valid_ragged_array_repr_featureType(nc, feature_type: str):
         if len(cf_role_vars) > 1 or not ftype:
             return False
 
-    cf_role_var = nc.get_variables_by_attributes(cf_role=f"{ftype}_id")[0]
+    cf_role_var = get_variables_by_attributes(nc, cf_role=f"{ftype}_id")[0]
     # if cf_role_var returns None, this should raise an error?
     if cf_role_var.cf_role.split("_id")[0].lower() != ftype:
         return False
@@ -1101,10 +1109,12 @@ def is_dataset_valid_ragged_array_repr_featureType(nc, feature_type: str):
     # are valid representations of the ragged array structures. Instead,
     # if the index/count variable is present, we check that only one of
     # each is present and that their dimensions are correct
-    index_vars = nc.get_variables_by_attributes(
+    index_vars = get_variables_by_attributes(
+        nc,
         instance_dimension=lambda x: x is not None,
     )
-    count_vars = nc.get_variables_by_attributes(
+    count_vars = get_variables_by_attributes(
+        nc,
         sample_dimension=lambda x: x is not None,
     )
 
@@ -1148,7 +1158,7 @@ def is_dataset_valid_ragged_array_repr_featureType(nc, feature_type: str):
         if len(index_vars) > 1 or len(count_vars) > 1:
             return False
 
-        profile_cf_role_vars = nc.get_variables_by_attributes(cf_role="profile_id")
+        profile_cf_role_vars = get_variables_by_attributes(nc, cf_role="profile_id")
         if len(profile_cf_role_vars) > 1:
             return False
         profile_cf_role_var = profile_cf_role_vars[0]
@@ -1184,13 +1194,15 @@ def is_dataset_valid_ragged_array_repr_featureType(nc, feature_type: str):
 
 def resolve_ragged_array_dimension(ds: Dataset):
     # TODO: put in loop?
-    ragged_variable = ds.get_variables_by_attributes(
+    ragged_variable = get_variables_by_attributes(
+        ds,
         sample_dimension=lambda s: isinstance(s, str),
     )
     if ragged_variable:
         ragged_type = "sample_dimension"
     else:
-        ragged_variable = ds.get_variables_by_attributes(
+        ragged_variable = get_variables_by_attributes(
+            ds,
             instance_dimension=lambda s: isinstance(s, str),
         )
         ragged_type = "instance_dimension"
@@ -1276,7 +1288,7 @@ def is_point(nc, variable):
         return False
     # Point is indistinguishable from trajectories where the instance dimension
     # is implied (scalar)
-    traj_ids = nc.get_variables_by_attributes(cf_role="trajectory_id")
+    traj_ids = get_variables_by_attributes(nc, cf_role="trajectory_id")
     if traj_ids:
         return False
 
@@ -1464,7 +1476,7 @@ def is_single_trajectory(nc, variable):
             return False
     if dims != cmatrix["t"]:
         return False
-    traj_ids = nc.get_variables_by_attributes(cf_role="trajectory_id")
+    traj_ids = get_variables_by_attributes(nc, cf_role="trajectory_id")
     if len(traj_ids) != 1:
         return False
     return True
@@ -2,6 +2,7 @@
 # esgf-qc/compliance_checker/checks/attribute_checks/check_attribute_suite.py
 
 from compliance_checker.base import BaseCheck, Result, TestCtx
+from compliance_checker.dataset_index import get_global_attrs, get_variable_attrs
 import numpy as np
 from esgvoc import api as voc
 import re
@@ -41,11 +42,11 @@ def check_attribute_suite(
                 existence_ctx.add_failure(f"Cannot check attribute '{attribute_name}' because variable '{var_name}' does not exist.")
                 all_results.append(existence_ctx.to_result())
                 return all_results
-            attr_value = ds.variables[var_name].getncattr(attribute_name)
+            attr_value = get_variable_attrs(ds, var_name)[attribute_name]
         else:
-            attr_value = ds.getncattr(attribute_name)
+            attr_value = get_global_attrs(ds)[attribute_name]
         existence_ctx.add_pass()
-    except AttributeError:
+    except KeyError:
         existence_ctx.add_failure(f"Attribute '{attribute_name}' is missing.")
     all_results.append(existence_ctx.to_result())
 
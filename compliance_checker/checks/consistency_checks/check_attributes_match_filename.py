@@ -5,6 +5,7 @@
 import os
 import re
 from compliance_checker.base import TestCtx
+from compliance_checker.dataset_index import get_global_attrs
 
 def _parse_filename_components(filename):
     """
@@ -51,6 +52,7 @@ def check_filename_vs_global_attrs(ds, severity):
         return [ctx.to_result()]
 
     failures = []
+    global_attrs = get_global_attrs(ds)
     # Define which filename components should match which global attributes
     keys_to_compare = [
         "variable_id", "table_id", "source_id", "experiment_id",
@@ -60,8 +62,8 @@ def check_filename_vs_global_attrs(ds, severity):
     for key in keys_to_compare:
         filename_value = filename_facets.get(key)
         
-        if key in ds.ncattrs():
-            attr_value = str(ds.getncattr(key))
+        if key in global_attrs:
+            attr_value = str(global_attrs[key])
             if filename_value != attr_value:
                 failures.append(f"Inconsistency for '{key}': filename has '{filename_value}', global attribute has '{attr_value}'.")
         else:
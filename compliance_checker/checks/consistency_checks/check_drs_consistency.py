@@ -5,6 +5,7 @@
 import os
 import re
 from compliance_checker.base import TestCtx
+from compliance_checker.dataset_index import get_global_attrs
 
 def _get_drs_facets(filepath, project_id="CMIP6"):
     """
@@ -67,10 +68,11 @@ def check_attributes_match_directory_structure(ds, severity, project_id="cmip6")
         return [ctx.to_result()]
 
     failures = []
+    global_attrs = get_global_attrs(ds)
     for drs_key, drs_value in dir_facets.items():
         if drs_key == "version": continue
-        if drs_key in ds.ncattrs():
-            attr_value = str(ds.getncattr(drs_key))
+        if drs_key in global_attrs:
+            attr_value = str(global_attrs[drs_key])
             if drs_value != attr_value:
                 failures.append(f"DRS path component '{drs_key}' ('{drs_value}') does not match global attribute ('{attr_value}').")
         else:
@@ -9,6 +9,7 @@ bounds (*time_bnds*) and that shapes are consistent.
 
 import numpy as np
 from compliance_checker.base import BaseCheck, TestCtx
+from compliance_checker.reduction import slab_rows
 
 
 def check_time_bounds(ds, severity=BaseCheck.MEDIUM):
@@ -40,20 +41,26 @@ def check_time_bounds(ds, severity=BaseCheck.MEDIUM):
         )
         return [ctx.to_result()]
 
-    # Numerical consistency
-    time_vals  = time_var[:].compressed()
-    lower, upper = bnds_var[:, 0], bnds_var[:, 1]
+    # Numerical consistency, read slab by slab
+    examples = []
+    for row in slab_rows(time_var):
+        time_vals = time_var[row]
+        bounds = bnds_var[row]
+        lower, upper = bounds[:, 0], bounds[:, 1]
 
-    outside = np.logical_or(time_vals < lower, time_vals > upper)
+        outside = np.ma.filled(
+            np.logical_or(time_vals < lower, time_vals > upper), False
+        )
+        # show only first offenders
+        for i in np.where(outside)[0][: 5 - len(examples)]:
+            examples.append(f"{row.start + i}/{time_vals[i]}∉[{lower[i]}, {upper[i]}]")
+        if len(examples) == 5:
+            break
 
-    if outside.any():
-        idx = np.where(outside)[0][:5]   # show only first offenders
+    if examples:
         ctx.add_failure(
-            f"{len(idx)} time value(s) lie outside declared bounds, "
-            f"example index/val/bnds: "
-            + ", ".join(
-                f"{i}/{time_vals[i]}∉[{lower[i]}, {upper[i]}]" for i in idx
-            )
+            f"{len(examples)} time value(s) lie outside declared bounds, "
+            f"example index/val/bnds: " + ", ".join(examples)
         )
     else:
         ctx.add_pass()
@@ -1,6 +1,7 @@
 import os
 from compliance_checker.base import BaseCheck, TestCtx
 from netCDF4 import num2date
+from compliance_checker.reduction import variable_stats
 from ..consistency_checks.check_attributes_match_filename import _parse_filename_components
 
 def check_time_range_vs_filename(ds, severity=BaseCheck.MEDIUM):
@@ -12,18 +13,17 @@ def check_time_range_vs_filename(ds, severity=BaseCheck.MEDIUM):
         return [ctx.to_result()]
 
     time_var = ds.variables["time"]
-    time_vals = time_var[:]
-    if hasattr(time_vals, "compressed"):
-        time_vals = time_vals.compressed()
+    # only the first and last unmasked values are converted
+    stats = variable_stats(ds, time_var)
 
-    if time_vals.size == 0:
+    if stats.first is None:
         ctx.add_failure("The 'time' variable is empty.")
         return [ctx.to_result()]
 
     try:
         units = time_var.units
         calendar = getattr(time_var, "calendar", "standard")
-        time_dates = num2date(time_vals, units=units, calendar=calendar)
+        time_dates = num2date([stats.first, stats.last], units=units, calendar=calendar)
     except Exception as e:
         ctx.add_failure(f"Error converting time values to datetime: {e}")
         return [ctx.to_result()]
@@ -1,4 +1,6 @@
 from compliance_checker.base import BaseCheck, TestCtx
+from compliance_checker.reduction import slab_rows
+from compliance_checker.sampling import sample_rows, sampled_message
 import numpy as np
 
 def check_bounds_value_consistency(ds, var_name, severity=BaseCheck.MEDIUM):
@@ -34,21 +36,33 @@ def check_bounds_value_consistency(ds, var_name, severity=BaseCheck.MEDIUM):
         return [ctx.to_result()]
 
     try:
-        values = var[:].compressed() if hasattr(var[:], "compressed") else var[:]
-        bounds = bnds_var[:]
-        lower, upper = bounds[:, 0], bounds[:, 1]
-
-        outside = np.logical_or(values < lower, values > upper)
-        if outside.any():
-            idx = np.where(outside)[0][:5]  
-            examples = ", ".join(
-                f"{i}/{values[i]}∉[{lower[i]}, {upper[i]}]" for i in idx
-            )
+        # the same rows of the variable and of its bounds are read, slab by
+        # slab, also when sampling
+        rows = sample_rows(ds, var)
+        coverage = 1.0
+        if rows is not None:
+            coverage = sum(row.stop - row.start for row in rows) / var.shape[0]
+
+        examples = []
+        for row in slab_rows(var, rows):
+            values = var[row]
+            bounds = bnds_var[row]
+            lower, upper = bounds[:, 0], bounds[:, 1]
+            # masked values are not compared
+            outside = np.ma.filled(np.logical_or(values < lower, values > upper), False)
+            for i in np.where(outside)[0][: 5 - len(examples)]:
+                examples.append(f"{row.start + i}/{values[i]}∉[{lower[i]}, {upper[i]}]")
+            if len(examples) == 5:
+                break
+
+        if examples:
             ctx.add_failure(
-                f"{len(idx)} value(s) lie outside declared bounds. Example(s): {examples}"
+                f"{len(examples)} value(s) lie outside declared bounds. Example(s): {', '.join(examples)}"
             )
         else:
             ctx.add_pass()
+        if coverage < 1:
+            ctx.messages.append(sampled_message(var_name, coverage))
     except Exception as e:
         ctx.add_failure(f"Error checking bounds for '{var_name}': {e}")
 
@@ -0,0 +1,221 @@
+"""
+compliance_checker/crawler.py
+
+Lazy discovery of datasets below directory trees, such as ESGF DRS trees,
+and in file manifests, such as ESGF mapfiles
+"""
+
+import os
+import sys
+from fnmatch import fnmatch
+
+from compliance_checker.protocols import netcdf, zarr
+
+
+def _matches_any(name, rel_path, patterns):
+    """
+    Returns True if either the entry name or its path relative to the
+    crawled root matches one of the glob patterns
+    """
+    return any(fnmatch(name, pat) or fnmatch(rel_path, pat) for pat in patterns)
+
+
+def iter_datasets(
+    root,
+    include=None,
+    exclude=None,
+    max_depth=None,
+    extensions=(".nc",),
+    match_magic=False,
+):
+    """
+    Walks a directory tree with os.scandir and yields the paths of candidate
+    dataset files as they are found, so checking can start before the whole
+    tree has been listed.  Entries are visited in name order, files of a
+    directory before its subdirectories.  Symbolic links to directories are
+    not followed, which avoids visiting the same DRS version twice through
+    "latest" links.
+
+    :param str root: Directory to crawl
+    :param list include: Glob patterns, matched against the file name or the
+                         path relative to `root`.  If given, only matching
+                         files are yielded.
+    :param list exclude: Glob patterns for files and directories to skip.
+                         Excluded directories are not descended into.
+    :param int max_depth: Maximum number of directory levels to descend
+                          below `root`.  None means unlimited and 0 only
+                          yields the files directly in `root`.
+    :param tuple extensions: File name suffixes accepted when `match_magic`
+                             is False.  An empty value accepts any file.
+    :param bool match_magic: Select files with netcdf.is_netcdf, which also
+                             recognises netCDF/HDF5 files from their magic
+                             bytes, instead of by extension
+    :rtype: generator
+    """
+    root = os.fspath(root)
+    extensions = tuple(extensions or ())
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            # unreadable directories are skipped, as with os.walk
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.relpath(entry.path, root)
+            if exclude and _matches_any(entry.name, rel_path, exclude):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if max_depth is None or depth < max_depth:
+                    subdirs.append((entry.path, depth + 1))
+                continue
+            if not entry.is_file():
+                continue
+            if include and not _matches_any(entry.name, rel_path, include):
+                continue
+            if match_magic:
+                if not netcdf.is_netcdf(entry.path):
+                    continue
+            elif extensions and not entry.name.endswith(extensions):
+                continue
+            yield entry.path
+
+        # reversed so that the stack pops subdirectories in name order
+        stack.extend(reversed(subdirs))
+
+
+def expand_locations(locations, **kwargs):
+    """
+    Yields dataset locations, replacing local directories by the datasets
+    found below them with iter_datasets.  Directories which are themselves
+    Zarr datasets, and any other location, are passed through unchanged.
+
+    :param iterable locations: Dataset locations, i.e. from the command line
+    :param kwargs: Keyword arguments passed on to iter_datasets
+    :rtype: generator
+    """
+    for loc in locations:
+        if os.path.isdir(loc) and not zarr.is_zarr(loc):
+            yield from iter_datasets(loc, **kwargs)
+        else:
+            yield loc
+
+
+class ManifestEntry(str):
+    """
+    Dataset location read from a manifest.  Behaves as the path itself and
+    remembers the manifest and line it was read from and, for ESGF mapfiles,
+    the dataset, size and checksum listed for the file.
+    """
+
+    def __new__(
+        cls,
+        path,
+        line_number,
+        dataset_id=None,
+        size=None,
+        checksum=None,
+        checksum_type=None,
+        manifest=None,
+    ):
+        entry = super().__new__(cls, path)
+        entry.line_number = line_number
+        entry.manifest = manifest
+        entry.dataset_id = dataset_id
+        entry.size = size
+        entry.checksum = checksum
+        entry.checksum_type = checksum_type
+        return entry
+
+    def __reduce__(self):
+        return (
+            ManifestEntry,
+            (
+                str(self),
+                self.line_number,
+                self.dataset_id,
+                self.size,
+                self.checksum,
+                self.checksum_type,
+                self.manifest,
+            ),
+        )
+
+
+def parse_manifest_line(line, line_number, manifest=None):
+    """
+    Parses a manifest line into a ManifestEntry, or returns None for blank
+    lines and comments starting with "#".  `manifest` names the manifest the
+    line was read from.
+
+    A line is either a single path, or an ESGF mapfile line of "|" separated
+    columns:
+
+        dataset_id#version | path | size | mod_time=... | checksum=... | checksum_type=...
+
+    Raises ValueError for mapfile lines without a path or with a size which
+    is not an integer.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if "|" not in line:
+        return ManifestEntry(line, line_number, manifest=manifest)
+
+    columns = [column.strip() for column in line.split("|")]
+    if len(columns) < 2 or not columns[1]:
+        raise ValueError(f"Line {line_number}: mapfile line has no file path")
+    size = None
+    if len(columns) > 2 and columns[2]:
+        try:
+            size = int(columns[2])
+        except ValueError:
+            raise ValueError(
+                f"Line {line_number}: mapfile file size '{columns[2]}' is not an integer",
+            ) from None
+    fields = dict(column.split("=", 1) for column in columns[3:] if "=" in column)
+    return ManifestEntry(
+        columns[1],
+        line_number,
+        dataset_id=columns[0] or None,
+        size=size,
+        checksum=fields.get("checksum"),
+        checksum_type=fields.get("checksum_type"),
+        manifest=manifest,
+    )
+
+
+def iter_manifest(lines, manifest=None):
+    """
+    Yields a ManifestEntry for each dataset listed in an iterable of
+    manifest lines, e.g. an open file or sys.stdin, reading one line at a
+    time so that manifests of any length use constant memory
+
+    :param iterable lines: Lines of a plain file list or an ESGF mapfile
+    :param str manifest: Name of the manifest recorded in the entries
+    :rtype: generator
+    """
+    for line_number, line in enumerate(lines, 1):
+        entry = parse_manifest_line(line, line_number, manifest)
+        if entry is not None:
+            yield entry
+
+
+def iter_manifest_file(path):
+    """
+    Yields the entries of a manifest file with iter_manifest, "-" reads the
+    manifest from the standard input, named "<stdin>" in the entries.  The
+    file is only opened once the first entry is requested.
+
+    :param str path: Path of the manifest
+    :rtype: generator
+    """
+    if path == "-":
+        yield from iter_manifest(sys.stdin, "<stdin>")
+        return
+    with open(path, encoding="utf-8") as f:
+        yield from iter_manifest(f, path)
@@ -0,0 +1,154 @@
+"""
+compliance_checker/dataset_index.py
+
+Snapshot of the metadata of a netCDF dataset, taken once per dataset by
+CheckSuite.run_all and shared by every checker while the dataset is checked.
+
+netCDF4 goes back to the netCDF/HDF5 library for every attribute read, and
+Dataset.get_variables_by_attributes reads the attributes of every variable
+again on each call.  The index reads all global and variable attributes,
+dimensions, shapes and data types once into plain Python objects and answers
+the same queries from them.
+
+Checks do not receive the index as an argument, they look it up from the
+dataset with get_index(ds), or use the module level helpers which fall back
+to querying the dataset directly when no index is active, e.g. when a check
+method is called on its own in the tests.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+
+from netCDF4 import Dataset
+
+VariableMetadata = namedtuple(
+    "VariableMetadata",
+    ["attrs", "dimensions", "shape", "dtype"],
+)
+
+# id of the dataset -> DatasetIndex, for the datasets being checked
+_active_indexes = {}
+
+
+class DatasetIndex:
+    """
+    Attributes, dimensions, shapes and data types of the variables of the
+    root group of a netCDF dataset
+    """
+
+    def __init__(self, ds):
+        """
+        :param netCDF4.Dataset ds: An open netCDF dataset
+        """
+        self._ds_variables = ds.variables
+        # Dataset.__dict__ and Variable.__dict__ read all the attributes in
+        # one pass, without creating the attribute names list first
+        self.global_attrs = ds.__dict__
+        self.dimensions = {
+            name: (len(dim), dim.isunlimited()) for name, dim in ds.dimensions.items()
+        }
+        self.variables = {
+            name: VariableMetadata(var.__dict__, var.dimensions, var.shape, var.dtype)
+            for name, var in ds.variables.items()
+        }
+
+    def get_attr(self, var_name, attr_name, default=None):
+        """
+        Returns an attribute of a variable, or a global attribute when
+        var_name is None, and default if it is not defined
+        """
+        if var_name is None:
+            return self.global_attrs.get(attr_name, default)
+        return self.variables[var_name].attrs.get(attr_name, default)
+
+    def variable_names_by_attributes(self, **kwargs):
+        """
+        Returns the names of the variables matched by the same keyword
+        arguments as netCDF4.Dataset.get_variables_by_attributes.
+        """
+        names = []
+        for name, metadata in self.variables.items():
+            attrs = metadata.attrs
+            # mirrors the matching in netCDF4, including that a callable
+            # must return True, not just a truthy value
+            has_value_flag = False
+            for attr_name, value in kwargs.items():
+                if callable(value):
+                    has_value_flag = value(attrs.get(attr_name))
+                    if has_value_flag is False:
+                        break
+                elif attr_name in attrs and attrs[attr_name] == value:
+                    has_value_flag = True
+                else:
+                    has_value_flag = False
+                    break
+            if has_value_flag is True:
+                names.append(name)
+        return names
+
+    def get_variables_by_attributes(self, **kwargs):
+        """
+        Drop-in replacement for netCDF4.Dataset.get_variables_by_attributes
+        which matches the snapshotted attributes and returns the variables
+        of the dataset
+        """
+        return [
+            self._ds_variables[name]
+            for name in self.variable_names_by_attributes(**kwargs)
+        ]
+
+
+@contextmanager
+def indexed(ds):
+    """
+    Builds the index of a netCDF dataset and makes it available through
+    get_index(ds) until the block exits.  Other dataset types, and datasets
+    which are already indexed, are left as they are.
+    """
+    if not isinstance(ds, Dataset) or ds.variables is None or id(ds) in _active_indexes:
+        yield _active_indexes.get(id(ds))
+        return
+    index = _active_indexes[id(ds)] = DatasetIndex(ds)
+    try:
+        yield index
+    finally:
+        del _active_indexes[id(ds)]
+
+
+def get_index(ds):
+    """
+    Returns the DatasetIndex of a dataset being checked, or None
+    """
+    return _active_indexes.get(id(ds))
+
+
+def get_variables_by_attributes(ds, **kwargs):
+    """
+    Same as ds.get_variables_by_attributes(**kwargs), answered from the
+    dataset's index when one is active
+    """
+    index = _active_indexes.get(id(ds))
+    if index is None:
+        return ds.get_variables_by_attributes(**kwargs)
+    return index.get_variables_by_attributes(**kwargs)
+
+
+def get_global_attrs(ds):
+    """
+    Returns a dict of the global attributes of a dataset
+    """
+    index = _active_indexes.get(id(ds))
+    if index is None:
+        return ds.__dict__
+    return index.global_attrs
+
+
+def get_variable_attrs(ds, var_name):
+    """
+    Returns a dict of the attributes of a variable of a dataset.  Raises
+    KeyError if the variable does not exist.
+    """
+    index = _active_indexes.get(id(ds))
+    if index is None:
+        return ds.variables[var_name].__dict__
+    return index.variables[var_name].attrs
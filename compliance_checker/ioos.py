@@ -23,6 +23,7 @@ from compliance_checker.base import (
     check_has,
 )
 from compliance_checker.cf.cf import CF1_6Check, CF1_7Check
+from compliance_checker.dataset_index import get_variables_by_attributes
 
 
 class IOOSBaseCheck(BaseCheck):
@@ -128,6 +129,7 @@ class IOOSNCCheck(BaseNCCheck, IOOSBaseCheck):
 
 class IOOS0_1Check(IOOSNCCheck):
     _cc_spec_version = "0.1"
+    _cc_reusable = True
     _cc_description = "IOOS Inventory Metadata"
     register_checker = True
 
@@ -260,6 +262,7 @@ class IOOS1_1Check(IOOSNCCheck):
     """
 
     _cc_spec_version = "1.1"
+    _cc_reusable = True
     _cc_description = "IOOS Metadata Profile, Version 1.1"
     _cc_url = "https://ioos.github.io/ioos-metadata/ioos-metadata-profile-v1-1.html#ioos-netcdf-metadata-profile-attributes"
     register_checker = True
@@ -459,6 +462,7 @@ class IOOS1_2Check(IOOSNCCheck):
     """
 
     _cc_spec_version = "1.2"
+    _cc_reusable = True
     _cc_description = "IOOS Metadata Profile, Version 1.2"
     _cc_url = "https://ioos.github.io/ioos-metadata/ioos-metadata-profile-v1-2.html"
     register_checker = True
@@ -606,6 +610,11 @@ class IOOS1_2Check(IOOSNCCheck):
             "instrument_vocabulary",
         ]
 
+    def reset(self):
+        super().reset()
+        self.acdd1_6.reset()
+        self.cf1_7.reset()
+
     def setup(self, ds):
         self.platform_vars = self._find_platform_vars(ds)
 
@@ -624,7 +633,8 @@ class IOOS1_2Check(IOOSNCCheck):
         set of netCDF4.Variable
             Set of variables which are platform variables.
         """
-        plat_vars = ds.get_variables_by_attributes(
+        plat_vars = get_variables_by_attributes(
+            ds,
             platform=lambda p: isinstance(p, str),
         )
         return {
@@ -979,7 +989,7 @@ class IOOS1_2Check(IOOSNCCheck):
         )
 
         # looking for cf_role=timeseries_id
-        cf_role_vars = ds.get_variables_by_attributes(cf_role="timeseries_id")
+        cf_role_vars = get_variables_by_attributes(ds, cf_role="timeseries_id")
         if (not cf_role_vars) or (len(cf_role_vars) > 1):
             _val = False
             msgs = [
@@ -1025,8 +1035,8 @@ class IOOS1_2Check(IOOSNCCheck):
 
         # looking for cf_roles timeseries_id and profile_id
         cf_role_vars = []  # extend in specific order for easier checking
-        cf_role_vars.extend(ds.get_variables_by_attributes(cf_role="timeseries_id"))
-        cf_role_vars.extend(ds.get_variables_by_attributes(cf_role="profile_id"))
+        cf_role_vars.extend(get_variables_by_attributes(ds, cf_role="timeseries_id"))
+        cf_role_vars.extend(get_variables_by_attributes(ds, cf_role="profile_id"))
 
         if len(cf_role_vars) != 2:
             _val = False
@@ -1075,7 +1085,7 @@ class IOOS1_2Check(IOOSNCCheck):
             "datasets to a single platform (i.e. trajectory) per dataset."
         )
 
-        cf_role_vars = ds.get_variables_by_attributes(cf_role="trajectory_id")
+        cf_role_vars = get_variables_by_attributes(ds, cf_role="trajectory_id")
 
         if len(cf_role_vars) != 1:
             _val = False
@@ -1117,8 +1127,8 @@ class IOOS1_2Check(IOOSNCCheck):
 
         # looking for cf_roles trajectory_id and profile_id
         cf_role_vars = []  # extend in specific order for easier checking
-        cf_role_vars.extend(ds.get_variables_by_attributes(cf_role="trajectory_id"))
-        cf_role_vars.extend(ds.get_variables_by_attributes(cf_role="profile_id"))
+        cf_role_vars.extend(get_variables_by_attributes(ds, cf_role="trajectory_id"))
+        cf_role_vars.extend(get_variables_by_attributes(ds, cf_role="profile_id"))
 
         if len(cf_role_vars) != 2:
             _val = False
@@ -1169,7 +1179,7 @@ class IOOS1_2Check(IOOSNCCheck):
         )
 
         # looking for cf_role=profile_id
-        cf_role_vars = ds.get_variables_by_attributes(cf_role="profile_id")
+        cf_role_vars = get_variables_by_attributes(ds, cf_role="profile_id")
         if (not cf_role_vars) or (len(cf_role_vars) > 1):
             _val = False
             msgs = [
@@ -1280,7 +1290,7 @@ class IOOS1_2Check(IOOSNCCheck):
         glb_platform = getattr(ds, "platform", None)
 
         platform_set = set()
-        for v in ds.get_variables_by_attributes(platform=lambda x: x is not None):
+        for v in get_variables_by_attributes(ds, platform=lambda x: x is not None):
             platform_set.add(v.getncattr("platform"))
 
         num_platforms = len(platform_set)
@@ -1521,7 +1531,7 @@ class IOOS1_2Check(IOOSNCCheck):
         )
 
         var_passed_ingest_reqs = set()
-        for v in ds.get_variables_by_attributes(gts_ingest=lambda x: x == "true"):
+        for v in get_variables_by_attributes(ds, gts_ingest=lambda x: x == "true"):
             var_passed_ingest_reqs.add(
                 (v.name, self._var_qualifies_for_gts_ingest(ds, v)),
             )
@@ -1623,7 +1633,8 @@ class IOOS1_2Check(IOOSNCCheck):
 
         results = []
         # get qartod variables
-        for v in ds.get_variables_by_attributes(
+        for v in get_variables_by_attributes(
+            ds,
             standard_name=lambda x: x in self._qartod_std_names,
         ):
             missing_msg = "flag_{} not present on {}"
@@ -1677,7 +1688,8 @@ class IOOS1_2Check(IOOSNCCheck):
         """
 
         results = []
-        for v in ds.get_variables_by_attributes(
+        for v in get_variables_by_attributes(
+            ds,
             standard_name=lambda x: x in self._qartod_std_names,
         ):
             attval = getattr(v, "references", None)
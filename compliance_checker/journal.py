@@ -0,0 +1,180 @@
+"""
+compliance_checker/journal.py
+
+Checkpoint journal of the datasets checked by a batch run, so that an
+interrupted run can be resumed
+"""
+
+import pickle
+import sqlite3
+from collections import deque
+
+from compliance_checker.cache import run_key
+
+
+class CheckJournal:
+    """
+    SQLite backed journal of the results of a batch run, committed as soon
+    as each dataset has been checked.  A run resumed from the journal
+    replays the recorded results instead of checking those datasets again,
+    so that its report is the same as that of an uninterrupted run, and
+    only the remaining datasets cost any work.
+
+    Results are keyed on the dataset location as given, whether a local
+    path or a URL, along with the cache.run_key of the checkers, checks and
+    options, so a run with other settings does not reuse them.  Unlike
+    ResultCache entries, journal entries are not invalidated when a file
+    changes, and results with errors are recorded too.
+    """
+
+    def __init__(self, path):
+        """
+        :param str path: Location of the SQLite database
+        """
+        self.path = path
+        self._conn = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS checked ("
+                "location TEXT NOT NULL, run_key TEXT NOT NULL, data BLOB, "
+                "PRIMARY KEY (location, run_key))",
+            )
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def clear(self):
+        """
+        Removes all recorded results, for a run which starts over, and
+        returns how many there were
+        """
+        with self.conn:
+            return self.conn.execute("DELETE FROM checked").rowcount
+
+    def get(self, location, key):
+        """
+        Returns the recorded (score_groups, check_profile) of a location for
+        a run key, or None if it was not checked yet
+        """
+        row = self.conn.execute(
+            "SELECT data FROM checked WHERE location = ? AND run_key = ?",
+            (str(location), key),
+        ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def _recorded(self, location, key):
+        """
+        Returns whether results of a location are recorded for a run key
+        """
+        row = self.conn.execute(
+            "SELECT 1 FROM checked WHERE location = ? AND run_key = ?",
+            (str(location), key),
+        ).fetchone()
+        return row is not None
+
+    def record(self, location, key, score_groups, check_profile):
+        """
+        Records the results of checking a location and commits them
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO checked VALUES (?, ?, ?)",
+                (
+                    str(location),
+                    key,
+                    pickle.dumps(
+                        (score_groups, check_profile),
+                        pickle.HIGHEST_PROTOCOL,
+                    ),
+                ),
+            )
+
+    def resume(self, suite, locs, checker_names, include_checks, skip_checks, check):
+        """
+        Generator yielding (location, score_groups, check_profile) tuples in
+        input order, replaying the recorded results and passing the other
+        locations to `check`, whose results are recorded as they come.
+        Recorded results are yielded as soon as the locations before them
+        have been, and are only loaded then, so that long runs of recorded
+        locations are neither delayed nor held in memory.
+
+        :param CheckSuite suite: The suite running the checks
+        :param iterable locs: Dataset locations, may be lazy
+        :param list checker_names: Names of the checkers to run
+        :param list include_checks: Names of checks to include
+        :param list skip_checks: Names of checks to skip
+        :param callable check: Called with an iterable of the locations left
+                               to check, returning an iterable of
+                               (location, score_groups, check_profile)
+                               tuples in the same order
+        :rtype: generator
+        """
+        key = run_key(suite, checker_names, include_checks, skip_checks)
+        locs = iter(locs)
+        # locations read since the last one yielded, along with whether their
+        # results were recorded
+        order = deque()
+        # number of locations in `order` which are checked
+        in_flight = 0
+        # locations read here, to be passed to `check` next
+        ahead = deque()
+
+        def remaining():
+            nonlocal in_flight
+            while True:
+                if ahead:
+                    yield ahead.popleft()
+                    continue
+                loc = next(locs, None)
+                if loc is None:
+                    return
+                recorded = self._recorded(loc, key)
+                order.append((loc, recorded))
+                if not recorded:
+                    in_flight += 1
+                    yield loc
+
+        checked = check(remaining())
+        try:
+            while True:
+                if not in_flight:
+                    # no location before them is being checked
+                    for loc, _recorded in order:
+                        yield (loc, *self.get(loc, key))
+                    order.clear()
+                    loc = next(locs, None)
+                    if loc is None:
+                        return
+                    recorded = self.get(loc, key)
+                    if recorded is not None:
+                        yield (loc, *recorded)
+                        continue
+                    order.append((loc, False))
+                    in_flight += 1
+                    ahead.append(loc)
+
+                loc, score_groups, check_profile = next(checked)
+                while order[0][1]:
+                    recorded_loc, _recorded = order.popleft()
+                    yield (recorded_loc, *self.get(recorded_loc, key))
+                order.popleft()
+                in_flight -= 1
+                self.record(loc, key, score_groups, check_profile)
+                yield loc, score_groups, check_profile
+        finally:
+            checked.close()
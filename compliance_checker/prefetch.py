@@ -0,0 +1,174 @@
+"""
+compliance_checker/prefetch.py
+
+Prefetching of the datasets to check, so that their I/O overlaps with the
+checks.  Remote datasets are probed and downloaded concurrently, up to a
+limit per host, and the results are handed to the serial run or to the
+worker processes of a parallel run, so that the throughput of a batch of
+remote datasets grows with the number of datasets prefetched rather than
+being bound by the latency of each request.
+
+The netCDF library is not thread safe, so background threads never open a
+dataset.  They only do the I/O which does not go through it: probing the
+protocol of remote datasets, which the main thread then finds cached, see
+compliance_checker.protocols.resolver, downloading remote netCDF files which
+cannot be read with range requests, and reading the first bytes of local
+files, where the file header lies, into the operating system's page cache,
+which on network file systems such as GPFS or Lustre saves the round trips
+of opening the file.  Downloads go through the same path as without
+prefetching, see compliance_checker.protocols.netcdf.download_netcdf, so
+large files are spooled to a temporary file rather than held in memory.
+The dataset is then opened from the download or the warm cache.
+
+Remote files read with range requests and OPeNDAP endpoints are only
+probed, since the netCDF library reads them once the dataset is opened.
+"""
+
+from collections import Counter, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+from compliance_checker.protocols import netcdf, resolver
+
+# bytes read from the start of local files to warm the header
+HEADER_BYTES = 1024 * 1024
+
+# download is the netcdf.Download of a remote netCDF file, or None, protocol
+# the resolver.Protocol of a remote dataset, or None
+Prefetched = namedtuple(
+    "Prefetched",
+    ["location", "download", "protocol"],
+    defaults=(None,),
+)
+
+
+def prefetch_location(
+    location,
+    header_bytes=HEADER_BYTES,
+    spool_bytes=netcdf.SPOOL_BYTES,
+):
+    """
+    Does the I/O of loading a dataset which does not go through the netCDF
+    library, and may thus run in a background thread
+
+    :param str location: Dataset location, as given to CheckSuite.load_dataset
+    :param int header_bytes: Bytes read from the start of local files
+    :param int spool_bytes: Size up to which a downloaded file is kept in
+                            memory, see netcdf.download_netcdf
+    :rtype: Prefetched
+    """
+    location = str(location)
+    parsed = urlparse(location)
+    if parsed.netloc:
+        # files which are read with range requests are not downloaded
+        protocol = resolver.resolve(location)
+        if protocol.name == resolver.NETCDF and (
+            parsed.query or not protocol.byte_ranges
+        ):
+            download = netcdf.download_netcdf(location, spool_bytes)
+            return Prefetched(location, download, protocol)
+        return Prefetched(location, None, protocol)
+
+    try:
+        with open(location, "rb", buffering=0) as f:
+            f.read(header_bytes)
+    except OSError:
+        # directories such as Zarr stores, or missing files which are
+        # reported when the dataset is loaded
+        pass
+    return Prefetched(location, None)
+
+
+def discard(prefetched):
+    """
+    Removes the temporary file of a prefetched dataset which will not be
+    loaded
+
+    :param Prefetched prefetched: Result of prefetch_location, or None
+    """
+    if isinstance(prefetched, Prefetched) and prefetched.download is not None:
+        netcdf.discard_download(prefetched.download)
+
+
+def _running(future):
+    return future is not None and not future.done()
+
+
+def _discard_result(future):
+    if not future.cancelled() and future.exception() is None:
+        discard(future.result())
+
+
+def iter_prefetched(locations, depth, fetch=prefetch_location, host_limit=0):
+    """
+    Yields (location, prefetched) tuples in input order, where prefetched is
+    the result of fetch(location), run in background threads for up to
+    `depth` locations ahead of the one yielded.  prefetched is None when
+    depth is 0 or fetch raised, in which case the dataset is loaded as
+    usual and any error is reported then.
+
+    :param iterable locations: Dataset locations, may be lazy
+    :param int depth: Number of locations prefetched ahead
+    :param callable fetch: Function prefetching a single location
+    :param int host_limit: Maximum number of locations of the same host
+                           fetched at once, or 0 for no limit.  Local files
+                           are not limited.  The fetches of a host at its
+                           limit are submitted once one of its fetches is
+                           done, the locations of other hosts meanwhile.
+    :rtype: generator
+    """
+    if depth <= 0:
+        for location in locations:
+            yield location, None
+        return
+
+    executor = ThreadPoolExecutor(max_workers=depth, thread_name_prefix="prefetch")
+
+    def host(location):
+        return urlparse(str(location)).netloc if host_limit > 0 else ""
+
+    try:
+        # [location, host, future] of the location yielded next and `depth`
+        # locations after it, the future is None until the fetch is submitted
+        pending = deque()
+        locations = iter(locations)
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) <= depth:
+                try:
+                    location = next(locations)
+                except StopIteration:
+                    exhausted = True
+                else:
+                    pending.append([location, host(location), None])
+            if not pending:
+                break
+
+            while True:
+                # fetches are submitted in input order, except those of hosts
+                # at their limit, which wait without holding up other hosts
+                running = [entry for entry in pending if _running(entry[2])]
+                fetching = Counter(entry[1] for entry in running)
+                for entry in pending:
+                    if entry[2] is None and (
+                        not entry[1] or fetching[entry[1]] < host_limit
+                    ):
+                        entry[2] = executor.submit(fetch, entry[0])
+                        fetching[entry[1]] += 1
+                        running.append(entry)
+                if pending[0][2] is not None and pending[0][2].done():
+                    break
+                wait([entry[2] for entry in running], return_when=FIRST_COMPLETED)
+
+            location, _host, future = pending.popleft()
+            try:
+                prefetched = future.result()
+            except Exception:
+                prefetched = None
+            yield location, prefetched
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        # downloads in flight when the run stops are not loaded
+        for _location, _host, future in pending:
+            if future is not None:
+                future.add_done_callback(_discard_result)
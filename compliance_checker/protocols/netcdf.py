@@ -5,9 +5,29 @@ compliance_checker/protocols/netcdf.py
 Functions to assist in determining if the URL points to a netCDF file
 """
 
+import os
+import posixpath
+import tempfile
 import warnings
+import weakref
+from collections import namedtuple
+from urllib.parse import urlparse
 
 import requests
+from netCDF4 import Dataset
+
+from compliance_checker.protocols.remote import session
+
+# bytes of a downloaded file held in memory before spooling it to disk
+SPOOL_BYTES = 64 * 1024**2
+
+# size of the blocks a file is downloaded in
+DOWNLOAD_BLOCK_BYTES = 1024**2
+
+# url_path is the path of the URL a netCDF file was downloaded from, content
+# the file held in memory, or None when it was spooled to the temporary file
+# at path
+Download = namedtuple("Download", ["url_path", "content", "path"])
 
 
 def is_netcdf(url):
@@ -88,7 +108,7 @@ def is_remote_netcdf(ds_str):
     # Some datasets do not support HEAD requests!  The vast majority will,
     # however, support GET requests
     try:
-        head_req = requests.head(ds_str, allow_redirects=True, timeout=10)
+        head_req = session().head(ds_str, allow_redirects=True, timeout=10)
         head_req.raise_for_status()
     except requests.exceptions.RequestException as e:
         warnings.warn(
@@ -106,3 +126,190 @@ def is_remote_netcdf(ds_str):
     # or a netCDF file (not OPeNDAP) we can open this into a Dataset
     # Add support for application/x-netcdf;ver=4
     return content_type.split(";")[0] == "application/x-netcdf"
+
+
+class ByteRangeDataset(Dataset):
+    """
+    Remote netCDF dataset read with HTTP range requests.  Its filepath is the
+    path of its URL, as for a dataset downloaded into memory, so that checks
+    of the file name and the DRS directories see the same path either way.
+    """
+
+    def filepath(self, encoding=None):
+        return urlparse(Dataset.filepath(self, encoding)).path
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class SpooledDataset(Dataset):
+    """
+    Remote netCDF dataset downloaded into a temporary file, which is removed
+    once the dataset is closed, or garbage collected.  Its filepath is the
+    path of its URL, as for ByteRangeDataset.
+    """
+
+    def __init__(self, path, url_path):
+        # without reference cycles between the dataset and its variables,
+        # a subclass still alive at exit makes netCDF4 fail to free it
+        super().__init__(path, keepweakref=True)
+        # netCDF4 would store other attributes in the file
+        self.__dict__["_url_path"] = url_path
+        self.__dict__["_remove"] = weakref.finalize(self, _remove_file, path)
+
+    def filepath(self, encoding=None):
+        return self._url_path
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            # files cannot be removed while open on Windows
+            self._remove()
+
+
+def supports_byte_ranges(url):
+    """
+    Returns True if the server of a remote netCDF file answers a range
+    request for its first bytes, and these hold the magic number of a classic
+    netCDF or a netCDF-4/HDF5 file
+
+    :param str url: URL of the remote file
+    """
+    try:
+        with session().get(
+            url,
+            headers={"Range": "bytes=0-3"},
+            allow_redirects=True,
+            timeout=10,
+            stream=True,
+        ) as response:
+            # servers which ignore the range send the whole file, which is
+            # not read
+            if response.status_code != 206:
+                return False
+            magic_number = response.content[:4]
+    except requests.exceptions.RequestException:
+        return False
+    return is_classic_netcdf(magic_number) or is_hdf5(magic_number)
+
+
+def spool_file(url_path):
+    """
+    Creates an empty temporary file for a file downloaded from a URL, named
+    after the file of the URL, and returns its path
+
+    :param str url_path: Path of the URL
+    :rtype: str
+    """
+    name = os.path.basename(posixpath.basename(url_path)) or "remote.nc"
+    fd, path = tempfile.mkstemp(prefix="compliance-checker_", suffix=f"_{name}")
+    os.close(fd)
+    return path
+
+
+def download_netcdf(url, spool_bytes=SPOOL_BYTES):
+    """
+    Downloads a remote netCDF file in blocks, into memory for files of up to
+    `spool_bytes` and into a temporary file beyond.  The file is not opened,
+    so that downloads may run in background threads, see open_download.
+
+    :param str url: URL of the remote file
+    :param int spool_bytes: Size up to which a downloaded file is kept in
+                            memory
+    :rtype: Download
+    """
+    with session().get(url, allow_redirects=True, timeout=60, stream=True) as response:
+        url_path = urlparse(response.url).path
+        blocks = response.iter_content(DOWNLOAD_BLOCK_BYTES)
+        content = bytearray()
+        for block in blocks:
+            content += block
+            if len(content) > spool_bytes:
+                break
+        else:
+            return Download(url_path, content, None)
+
+        path = spool_file(url_path)
+        try:
+            with open(path, "wb") as f:
+                f.write(content)
+                del content
+                for block in blocks:
+                    f.write(block)
+        except BaseException:
+            _remove_file(path)
+            raise
+        return Download(url_path, None, path)
+
+
+def open_download(download):
+    """
+    Opens a netCDF file downloaded by download_netcdf.  A file held in memory
+    is spooled to a temporary file when the netCDF C library was built
+    without in-memory support.  Temporary files are removed once the dataset
+    is closed, or when it could not be opened.
+
+    :param Download download: The downloaded file
+    :rtype: netCDF4.Dataset
+    """
+    path = download.path
+    if path is None:
+        try:
+            return Dataset(download.url_path, memory=download.content)
+        except OSError:
+            # the library was built without in-memory support
+            path = spool_file(download.url_path)
+            with open(path, "wb") as f:
+                f.write(download.content)
+    try:
+        return SpooledDataset(path, download.url_path)
+    except BaseException:
+        _remove_file(path)
+        raise
+
+
+def discard_download(download):
+    """
+    Removes the temporary file of a download which will not be opened
+    """
+    if download.path is not None:
+        _remove_file(download.path)
+
+
+def open_remote_netcdf(url, spool_bytes=SPOOL_BYTES, byte_ranges=None):
+    """
+    Opens a remote netCDF file served over HTTP(S).
+
+    When the server supports range requests and the netCDF C library was
+    built with byte-range support, the file is opened in place and only its
+    header and the data read by the checks are fetched.  Otherwise the file
+    is downloaded with download_netcdf and opened with open_download.  URLs
+    with a query, such as ERDDAP or THREDDS subset requests, are always
+    downloaded, since the server would run the query again for every range.
+
+    :param str url: URL of the remote file
+    :param int spool_bytes: Size up to which a downloaded file is kept in
+                            memory
+    :param bool byte_ranges: Whether the server supports range requests for
+                             the file, e.g. as found by resolver.probe, or
+                             None to find out with supports_byte_ranges
+    :rtype: netCDF4.Dataset
+    """
+    parsed = urlparse(url)
+    if not parsed.query and not parsed.fragment and byte_ranges is None:
+        byte_ranges = supports_byte_ranges(url)
+    if not parsed.query and not parsed.fragment and byte_ranges:
+        try:
+            # without reference cycles between the dataset and its variables,
+            # a subclass still alive at exit makes netCDF4 fail to free it
+            return ByteRangeDataset(f"{url}#mode=bytes", keepweakref=True)
+        except OSError:
+            # the library was built without byte-range support
+            pass
+
+    return open_download(download_netcdf(url, spool_bytes))
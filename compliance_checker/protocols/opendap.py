@@ -5,10 +5,11 @@ compliance_checker/protocols/opendap.py
 Functions to assist in determining if the URL is an OPeNDAP endpoint
 """
 import urllib.parse
-import urllib.request
 
 import requests
 
+from compliance_checker.protocols.remote import session
+
 
 def create_DAP_variable_str(url):
     """
@@ -25,8 +26,9 @@ def create_DAP_variable_str(url):
     """
 
     # get dds
-    with urllib.request.urlopen(f"{url}.dds") as resp:
-        _str = resp.read().decode()[8:]
+    resp = session().get(f"{url}.dds", allow_redirects=True, timeout=60)
+    resp.raise_for_status()
+    _str = resp.content.decode()[8:]
 
     # remove beginning and ending braces, split on newlines
     no_braces_newlines = list(
@@ -57,7 +59,7 @@ def is_opendap(url):
         das_url = url + ".das"
 
     try:
-        response = requests.get(das_url, allow_redirects=True)
+        response = session().get(das_url, allow_redirects=True, timeout=10)
 
         if "xdods-server" in response.headers:
             return True
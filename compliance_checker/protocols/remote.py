@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+compliance_checker/protocols/remote.py
+
+HTTP session shared by the requests made to load remote datasets
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# number of hosts whose connections are kept alive
+POOL_HOSTS = 32
+
+# connections kept alive per host, e.g. for prefetching threads
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """
+    Returns the requests Session shared by all requests made to load remote
+    datasets, which keeps connections alive and pools them per host, so that
+    the probes and downloads for datasets on the same server reuse a
+    connection rather than each opening a new one.  The session is created
+    on first use and may be used from several threads.
+
+    :rtype: requests.Session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+"""
+compliance_checker/protocols/resolver.py
+
+Detection of the protocol of remote datasets from a single request
+"""
+
+import posixpath
+import warnings
+from collections import namedtuple
+from urllib.parse import urlparse
+
+import requests
+
+from compliance_checker.protocols import netcdf, opendap
+from compliance_checker.protocols.remote import session
+
+NETCDF = "netcdf"
+OPENDAP = "opendap"
+
+# leading directories of a URL path which name the service serving it, e.g.
+# /thredds/dodsC or /erddap/tabledap
+SERVICE_SEGMENTS = 2
+
+# timeout of the probe request, in seconds
+PROBE_TIMEOUT = 10
+
+# name is NETCDF, OPENDAP or None when the protocol is unknown, byte_ranges
+# is True for netCDF files which can be read with range requests
+Protocol = namedtuple("Protocol", ["name", "byte_ranges"])
+
+UNKNOWN = Protocol(None, False)
+
+
+def url_pattern(url):
+    """
+    Returns the key under which the protocol of a URL is cached: its host,
+    the leading directories of its path, the extension of the file it
+    points to and whether it has a query.  The datasets of a THREDDS or
+    ERDDAP service share a pattern, e.g. all the .nc files below
+    /thredds/fileServer on a host.
+
+    :param str url: URL of a remote dataset
+    :rtype: tuple
+    """
+    parsed = urlparse(url)
+    directory, name = posixpath.split(parsed.path)
+    service = "/".join(directory.split("/")[1 : SERVICE_SEGMENTS + 1])
+    return (
+        parsed.scheme,
+        parsed.netloc,
+        service,
+        posixpath.splitext(name)[1],
+        bool(parsed.query),
+        parsed.fragment,
+    )
+
+
+def probe(url):
+    """
+    Classifies a remote dataset from a single request.
+
+    URLs without a query are probed with a GET of their first four bytes, so
+    that netCDF files are recognized from their magic number together with
+    the server's support of range requests.  URLs with a query, such as
+    ERDDAP or THREDDS subset requests, are probed with a HEAD request, since
+    the server would start running the query for a GET.  A response with
+    the application/x-netcdf content type is a netCDF file, one carrying an
+    XDODS-Server header an OPeNDAP endpoint.  Otherwise the URL is probed
+    once more for an OPeNDAP Data Attribute Structure, see
+    opendap.is_opendap.
+
+    :param str url: URL of a remote dataset
+    :rtype: Protocol
+    """
+    magic_number = b""
+    try:
+        if urlparse(url).query:
+            response = session().head(url, allow_redirects=True, timeout=PROBE_TIMEOUT)
+        else:
+            with session().get(
+                url,
+                headers={"Range": "bytes=0-3"},
+                allow_redirects=True,
+                timeout=PROBE_TIMEOUT,
+                stream=True,
+            ) as response:
+                # servers which ignore the range send the whole file, which
+                # is not read, other responses are read in full to release
+                # the connection for the next request
+                if response.status_code != 200:
+                    content = response.content
+                    if response.status_code == 206:
+                        magic_number = content[:4]
+    except requests.exceptions.RequestException as e:
+        warnings.warn(
+            f"Received exception when making probe request to {url}: {e}",
+            stacklevel=2,
+        )
+        return UNKNOWN
+
+    if netcdf.is_classic_netcdf(magic_number) or netcdf.is_hdf5(magic_number):
+        return Protocol(NETCDF, True)
+    content_type = response.headers.get("content-type", "")
+    # Add support for application/x-netcdf;ver=4
+    if response.ok and content_type.split(";")[0] == "application/x-netcdf":
+        return Protocol(NETCDF, False)
+    # OPeNDAP servers may redirect a dataset URL to its HTML form
+    if any("xdods-server" in r.headers for r in (*response.history, response)):
+        return Protocol(OPENDAP, False)
+    if opendap.is_opendap(url):
+        return Protocol(OPENDAP, False)
+    return UNKNOWN
+
+
+class ProtocolResolver:
+    """
+    Classifies remote datasets with probe, caching the protocol found for
+    each url_pattern, so that checking many datasets of the same service
+    costs a single probe rather than several requests each.  Unknown
+    protocols are not cached, since they may come from transient errors.
+    """
+
+    def __init__(self):
+        # url_pattern -> Protocol, updated from prefetching threads too,
+        # which dict assignment is safe for
+        self._protocols = {}
+
+    def clear(self):
+        self._protocols.clear()
+
+    def resolve(self, url):
+        """
+        Returns the Protocol of a remote dataset, probing it only if no
+        dataset with the same url_pattern was classified before
+
+        :param str url: URL of a remote dataset
+        :rtype: Protocol
+        """
+        key = url_pattern(url)
+        protocol = self._protocols.get(key)
+        if protocol is None:
+            protocol = probe(url)
+            if protocol.name is not None:
+                self._protocols[key] = protocol
+        return protocol
+
+
+# resolver shared by the suite and the prefetching threads
+resolver = ProtocolResolver()
+
+
+def resolve(url):
+    """
+    Returns the Protocol of a remote dataset, see ProtocolResolver.resolve
+    """
+    return resolver.resolve(url)
@@ -0,0 +1,284 @@
+"""
+compliance_checker/reduction.py
+
+Single pass reductions of variable data for the checks which read it.
+
+Variables are read in slabs of consecutive rows along their first dimension,
+which start on the boundaries of the variable's HDF5 chunks and span whole
+chunks, so that every chunk read is read in full and only once, and memory
+use is bounded by the slab size rather than the variable size.  The minimum,
+maximum, NaN and masked value counts and the monotonicity of a variable are
+computed in the same pass, along with its first and last values:
+
+    stats = variable_stats(ds, ds.variables["lat"])
+    if stats.valid_count:
+        lat_min, lat_max = stats.nanmin, stats.nanmax
+
+CheckSuite.run_all keeps the statistics computed for a dataset until all of
+its checkers have run, so each variable is read once however many checks and
+checkers reduce it.  Checks which are called on their own, e.g. in the
+tests, compute them on every call.  reduce_values reduces the rows selected
+by the sampling policy active for the dataset, see
+compliance_checker.sampling, and slab_rows yields the slabs of a variable for
+checks which compare the values of several variables row by row, such as a
+variable and its bounds.
+"""
+
+import math
+from contextlib import contextmanager
+
+import numpy as np
+
+from compliance_checker.sampling import chunk_rows, sample_rows
+
+# target size of the slabs read, a slab spans at least one chunk
+SLAB_BYTES = 32 * 1024**2
+
+# id of the dataset -> {(id of the variable, rows): VariableStats}, for the
+# datasets being checked
+_active_stats = {}
+
+
+def slab_rows(variable, rows=None, slab_bytes=None):
+    """
+    Yields slices of the first dimension of a variable, in order, each
+    spanning whole chunks and about `slab_bytes` of data
+
+    :param netCDF4.Variable variable: Variable to read
+    :param list rows: Slices of the first dimension to read, as returned by
+                      sampling.sample_rows, or None for all rows
+    :param int slab_bytes: Target size of a slab, defaults to SLAB_BYTES
+    """
+    if slab_bytes is None:
+        slab_bytes = SLAB_BYTES
+    nrows = variable.shape[0]
+    itemsize = getattr(variable.dtype, "itemsize", 0)
+    row_bytes = max(itemsize * math.prod(variable.shape[1:]), 1)
+    block = chunk_rows(variable) or 1
+    slab = max(slab_bytes // row_bytes // block, 1) * block
+
+    for row in rows or [slice(0, nrows)]:
+        start, stop, _ = row.indices(nrows)
+        while start < stop:
+            # up to the next slab boundary, which is also a chunk boundary
+            end = min((start // slab + 1) * slab, stop)
+            yield slice(start, end)
+            start = end
+
+
+def iter_slabs(variable, rows=None, slab_bytes=None):
+    """
+    Yields the data of a variable in slabs of consecutive rows, see
+    slab_rows.  The data of a scalar variable is yielded whole.
+    """
+    if not variable.shape:
+        yield variable[...]
+        return
+    for row in slab_rows(variable, rows, slab_bytes):
+        yield variable[row]
+
+
+class VariableStats:
+    """
+    Reductions of the values of a variable, updated slab by slab.
+
+    Masked values are the fill and missing values, and those outside of the
+    valid range.  min and max follow numpy: they are NaN if any unmasked
+    value is NaN, while nanmin and nanmax ignore NaN values.  Both are None
+    when there is no unmasked, non NaN value, or for non numeric data.
+    first and last are the first and last unmasked values, in storage
+    order, or None.  The monotonicity
+    attributes compare successive unmasked values of 1-D variables and are
+    None for other variables, as np.diff would, a masked value masks both
+    of its differences.
+    """
+
+    def __init__(self, ndim=1):
+        self.count = 0
+        self.masked_count = 0
+        self.nan_count = 0
+        self.inf_count = 0
+        self.first = None
+        self.last = None
+        self.nanmin = None
+        self.nanmax = None
+        self._dtype = None
+        # fraction of the rows read, see sampling.read_values
+        self.coverage = 1.0
+        self._monotonic = ndim == 1
+        self._last = None
+        self._diffs = 0
+        self._valid_diffs = 0
+        self._not_increasing = False
+        self._not_decreasing = False
+        self._descending = False
+
+    @property
+    def valid_count(self):
+        """
+        Number of unmasked values which are not NaN
+        """
+        return self.count - self.masked_count - self.nan_count
+
+    @property
+    def finite_count(self):
+        """
+        Number of unmasked values which are neither NaN nor infinite
+        """
+        return self.valid_count - self.inf_count
+
+    @property
+    def min(self):
+        if self.nan_count:
+            return self._dtype.type(np.nan)
+        return self.nanmin
+
+    @property
+    def max(self):
+        if self.nan_count:
+            return self._dtype.type(np.nan)
+        return self.nanmax
+
+    @property
+    def increasing(self):
+        """
+        Whether the values are strictly increasing
+        """
+        return self._monotonicity(self._not_increasing)
+
+    @property
+    def decreasing(self):
+        """
+        Whether the values are strictly decreasing
+        """
+        return self._monotonicity(self._not_decreasing)
+
+    @property
+    def sorted(self):
+        """
+        Whether the values are in ascending order, allowing repeated values
+        """
+        return self._monotonicity(self._descending)
+
+    def _monotonicity(self, violated):
+        if not self._monotonic:
+            return None
+        if not self._diffs:
+            return True
+        # np.all of differences which are all masked is masked, i.e. falsy
+        return bool(self._valid_diffs) and not violated
+
+    def update(self, values):
+        """
+        Adds the values of the next slab of the variable
+        """
+        values = np.ma.asanyarray(values)
+        mask = np.ma.getmaskarray(values)
+        data = np.ma.getdata(values)
+        self._dtype = data.dtype
+        self.count += data.size
+        self.masked_count += int(mask.sum())
+
+        unmasked = data[~mask]
+        if unmasked.size:
+            if self.first is None:
+                self.first = unmasked[0]
+            self.last = unmasked[-1]
+
+        if data.dtype.kind in "iufb":
+            valid = unmasked
+            if data.dtype.kind == "f":
+                nan = np.isnan(valid)
+                self.nan_count += int(nan.sum())
+                valid = valid[~nan]
+                self.inf_count += int(np.isinf(valid).sum())
+            if valid.size:
+                slab_min, slab_max = valid.min(), valid.max()
+                if self.nanmin is None:
+                    self.nanmin, self.nanmax = slab_min, slab_max
+                else:
+                    self.nanmin = min(self.nanmin, slab_min)
+                    self.nanmax = max(self.nanmax, slab_max)
+
+        if self._monotonic and values.ndim == 1 and values.size:
+            if self._last is not None:
+                values = np.ma.concatenate([self._last, values])
+            self._last = values[-1:]
+            diffs = np.diff(values)
+            self._diffs += diffs.size
+            self._valid_diffs += int(np.ma.count(diffs))
+            # comparisons with NaN are false, so NaN breaks monotonicity
+            self._not_increasing |= bool(np.ma.filled(~(diffs > 0), False).any())
+            self._not_decreasing |= bool(np.ma.filled(~(diffs < 0), False).any())
+            self._descending |= bool(np.ma.filled(~(diffs >= 0), False).any())
+
+
+def reduce_variable(variable, rows=None, slab_bytes=None):
+    """
+    Returns the VariableStats of the data of a variable, read in slabs
+
+    :param netCDF4.Variable variable: Variable to read
+    :param list rows: Slices of the first dimension to read, or None for all
+                      rows
+    :param int slab_bytes: Target size of the slabs read
+    :rtype: VariableStats
+    """
+    stats = VariableStats(len(variable.shape))
+    for values in iter_slabs(variable, rows, slab_bytes):
+        stats.update(values)
+    if rows is not None and variable.shape:
+        read = sum(len(range(*row.indices(variable.shape[0]))) for row in rows)
+        stats.coverage = read / variable.shape[0]
+    return stats
+
+
+@contextmanager
+def cached_stats(ds):
+    """
+    Keeps the statistics computed by variable_stats for a dataset until the
+    block exits.  Statistics already kept for the dataset are left as they
+    are.
+    """
+    if id(ds) in _active_stats:
+        yield
+        return
+    _active_stats[id(ds)] = {}
+    try:
+        yield
+    finally:
+        del _active_stats[id(ds)]
+
+
+def variable_stats(ds, variable, rows=None):
+    """
+    Returns the VariableStats of the data of a variable, computed on the
+    first request while the dataset is being checked
+
+    :param netCDF4.Dataset ds: Dataset the variable belongs to
+    :param netCDF4.Variable variable: Variable to reduce
+    :param list rows: Slices of the first dimension to read, or None for all
+                      rows
+    :rtype: VariableStats
+    """
+    cache = _active_stats.get(id(ds))
+    if cache is None:
+        return reduce_variable(variable, rows)
+    key = (
+        id(variable),
+        None if rows is None else tuple((row.start, row.stop) for row in rows),
+    )
+    stats = cache.get(key)
+    if stats is None:
+        stats = cache[key] = reduce_variable(variable, rows)
+    return stats
+
+
+def reduce_values(ds, variable, rows=None):
+    """
+    Returns the VariableStats of the data of a variable, or of a sample of
+    it when a sampling policy is active for the dataset, see
+    sampling.read_values
+    """
+    if rows is None:
+        rows = sample_rows(ds, variable)
+    return variable_stats(ds, variable, rows)
@@ -1,11 +1,31 @@
+import functools
 import json
 import os
+import pickle
+import signal
 import sys
 import traceback
-from collections import OrderedDict
+from collections import Counter, OrderedDict, defaultdict, deque, namedtuple
+from concurrent import futures
 from contextlib import contextmanager
 
-from compliance_checker.suite import CheckSuite
+from compliance_checker.prefetch import discard, iter_prefetched, prefetch_location
+from compliance_checker.suite import CheckSuite, CheckTimeoutError
+
+# CheckSuite instance owned by a process pool worker, see _init_worker
+_worker_suite = None
+
+# minimum result weight reported for each --criteria strictness level
+CRITERIA_LIMITS = {"strict": 1, "normal": 2, "lenient": 3}
+
+# seconds a pool worker may take beyond the time budget of the checks, set by
+# the "dataset_timeout" and "check_timeout" options, to open the dataset and
+# return its results before it is considered stuck and replaced
+DATASET_TIMEOUT_GRACE = 60
+
+# worker process of a parallel run, in a pool of its own so that it can be
+# replaced alone, and the future of its process id
+Worker = namedtuple("Worker", ["executor", "pid"])
 
 
 # Py 3.4+ has contextlib.redirect_stdout to redirect stdout to a different
@@ -21,6 +41,74 @@ def stdout_redirector(stream):
         sys.stdout = old_stdout
 
 
+def _init_worker(options, checkers, cache):
+    """
+    Process pool initializer.  Registers the parent's checker classes and
+    creates the CheckSuite used by every dataset checked in this worker.
+
+    @param options   Checker options dict passed to the CheckSuite
+    @param checkers  Mapping of checker names to checker classes
+    @param cache     ResultCache shared with the parent, or None
+    """
+    global _worker_suite
+    CheckSuite.checkers.update(checkers)
+    _worker_suite = CheckSuite(options=options, cache=cache)
+
+
+def _picklable_errors(errs):
+    """
+    Converts the errors returned by CheckSuite.run_all into a form which can
+    be sent back from a worker process.  Tracebacks cannot be pickled, so
+    they are formatted into strings here, skipping the same runner frames as
+    ComplianceChecker.check_errors does.
+
+    @param errs  Dict of check method name -> (exception, traceback)
+    """
+    ret_val = {}
+    for check_name, (exc, tb) in errs.items():
+        try:
+            pickle.loads(pickle.dumps(exc))
+        except Exception:
+            exc = RuntimeError(str(exc))
+        # checks skipped for lack of time budget have no traceback
+        if tb is None:
+            ret_val[check_name] = (exc, "")
+        else:
+            ret_val[check_name] = (
+                exc,
+                "".join(traceback.format_tb(tb.tb_next.tb_next)),
+            )
+    return ret_val
+
+
+def _succeeded(future):
+    """
+    Returns whether a future has completed with a result
+    """
+    return future.done() and not future.cancelled() and future.exception() is None
+
+
+def _check_dataset(loc, checker_names, include_checks, skip_checks, prefetched=None):
+    """
+    Loads and checks a single dataset inside a process pool worker.  The
+    worker opens its own dataset handle, from the content prefetched by the
+    parent if any, and returns the grouped scores with picklable errors,
+    along with the check timings if profiling.
+    """
+    score_groups = _worker_suite.check_location(
+        loc,
+        checker_names,
+        include_checks,
+        skip_checks,
+        prefetched,
+    )
+
+    return {
+        checker: (groups, _picklable_errors(errs))
+        for checker, (groups, errs) in score_groups.items()
+    }, _worker_suite.check_profile
+
+
 class ComplianceChecker:
     """
     Compliance Checker runner class.
@@ -42,6 +130,12 @@ class ComplianceChecker:
         output_filename="-",
         output_format="text",
         options=None,
+        jobs=1,
+        cache=None,
+        profile_top=20,
+        prefetch=0,
+        journal=None,
+        host_limit=0,
     ):
         """
         Static check runner.
@@ -54,14 +148,33 @@ class ComplianceChecker:
         @param  skip_checks     Names of checks to skip
         @param  include_checks  Names of checks to include
         @param  output_format   Format of the output(s)
+        @param  jobs            Number of worker processes used to check
+                                datasets in parallel (1 runs serially, 0
+                                uses one process per CPU)
+        @param  cache           Optional ResultCache consulted before
+                                opening each local dataset
+        @param  profile_top     Number of slowest checks listed on stderr
+                                when the "profile" option is set
+        @param  prefetch        Number of datasets prefetched ahead of the
+                                ones being checked, see
+                                compliance_checker.prefetch
+        @param  journal         Optional CheckJournal recording the results
+                                of each dataset, whose recorded results are
+                                replayed instead of checking again
+        @param  host_limit      Maximum number of datasets prefetched at once
+                                from the same host, 0 for no limit
 
         @returns                If the tests failed (based on the criteria)
         """
-        all_groups = []
-        cs = CheckSuite(options=options or {})
+        cs = CheckSuite(options=options or {}, cache=cache)
         # using OrderedDict is important here to preserve the order
         # of multiple datasets which may be passed in
         score_dict = OrderedDict()
+        # per dataset check timings and their totals over the batch, only
+        # recorded when profiling
+        profiling = bool(cs.options.get("profile"))
+        profile_dict = OrderedDict()
+        profile_totals = {}
         if not isinstance(ds_loc, str):
             locs = ds_loc
         # if single dataset, put in list
@@ -72,33 +185,75 @@ class ComplianceChecker:
         if isinstance(output_format, str):
             output_format = [output_format]
 
-        for loc in locs:  # loop through each dataset and run specified checks
-            ds = cs.load_dataset(loc)
+        # define a score limit to truncate the output to the strictness level
+        # specified by the user
+        limit = CRITERIA_LIMITS[criteria]
+
+        # streamed output is written as soon as each dataset has been checked,
+        # so results only need to be retained for the remaining formats
+        batch_formats = [out_fmt for out_fmt in output_format if out_fmt != "jsonl"]
+        stream = None
+        if "jsonl" in output_format:
+            if output_filename == "-":
+                stream = sys.stdout
+            else:
+                stream_filename = output_filename
+                # Update file name if needed
+                if len(output_format) > 1:
+                    stream_filename = f"{os.path.splitext(output_filename)[0]}.jsonl"
+                stream = open(stream_filename, "w", encoding="utf8")
 
-            score_groups = cs.run_all(ds, checker_names, include_checks, skip_checks)
-            for group in score_groups.values():
-                all_groups.append(group[0])
-            # TODO: consider wrapping in a proper context manager instead
-            if hasattr(ds, "close"):
-                ds.close()
+        passed = True
+        errors_occurred = False
+        try:
+            # loop through each dataset and run specified checks
+            for loc, score_groups, profile in cls._iter_score_groups(
+                cs,
+                locs,
+                checker_names,
+                include_checks,
+                skip_checks,
+                jobs,
+                prefetch,
+                journal,
+                host_limit,
+            ):
+                if not score_groups:
+                    raise ValueError(
+                        "No checks found, please check the name of the checker(s) and that they are installed",
+                    )
 
-            if not score_groups:
-                raise ValueError(
-                    "No checks found, please check the name of the checker(s) and that they are installed",
+                # a dataset whose worker was stopped has no results to pass
+                passed = (
+                    passed
+                    and not cls._timed_out(score_groups)
+                    and all(
+                        cs.passtree(groups, limit)
+                        for groups, _errors in score_groups.values()
+                    )
                 )
-            else:
-                score_dict[loc] = score_groups
-
-        # define a score limit to truncate the output to the strictness level
-        # specified by the user
-        if criteria == "normal":
-            limit = 2
-        elif criteria == "strict":
-            limit = 1
-        elif criteria == "lenient":
-            limit = 3
-
-        for out_fmt in output_format:
+                if profiling:
+                    cls._add_profile_totals(profile_totals, profile)
+                else:
+                    profile = None
+                if stream is not None:
+                    cls.jsonl_output(cs, loc, score_groups, stream, limit, profile)
+                    errors_occurred = (
+                        cls.check_errors(score_groups, verbose) or errors_occurred
+                    )
+                if batch_formats:
+                    score_dict[loc] = score_groups
+                    if profiling:
+                        profile_dict[loc] = profile
+        finally:
+            if stream is not None and stream is not sys.stdout:
+                stream.close()
+
+        # locs may be a lazily crawled iterable which turned out to be empty
+        if batch_formats and not score_dict:
+            raise ValueError("No datasets found to check")
+
+        for out_fmt in batch_formats:
             if out_fmt == "text":
                 if output_filename == "-":
                     cls.stdout_output(cs, score_dict, verbose, limit)
@@ -122,18 +277,280 @@ class ComplianceChecker:
                 # Update file name if needed
                 if len(output_format) > 1 and output_filename != "-":
                     output_filename = f"{os.path.splitext(output_filename)[0]}.json"
-                cls.json_output(cs, score_dict, output_filename, ds_loc, limit, out_fmt)
+                cls.json_output(
+                    cs,
+                    score_dict,
+                    output_filename,
+                    ds_loc,
+                    limit,
+                    out_fmt,
+                    profile_dict if profiling else None,
+                )
 
             else:
                 raise TypeError(f"Invalid format {out_fmt}")
 
-            errors_occurred = cls.check_errors(score_groups, verbose)
+        # errors were already reported per dataset while streaming
+        if stream is None:
+            for score_groups in score_dict.values():
+                errors_occurred = (
+                    cls.check_errors(score_groups, verbose) or errors_occurred
+                )
+
+        if profiling:
+            cls.profile_output(profile_totals, profile_top)
+
+        return passed, errors_occurred
+
+    @classmethod
+    def _iter_score_groups(
+        cls,
+        cs,
+        locs,
+        checker_names,
+        include_checks,
+        skip_checks,
+        jobs=1,
+        prefetch=0,
+        journal=None,
+        host_limit=0,
+    ):
+        """
+        Generator yielding (location, score_groups, check_profile) tuples in
+        input order, where check_profile holds the check timings recorded
+        when profiling.
+
+        With more than one job, datasets are fanned out over worker processes.
+        Only a bounded number of datasets are in flight at any time, so
+        `locs` may be a lazy iterable of arbitrary length.  Up to `prefetch`
+        datasets are prefetched ahead in background threads, and handed to
+        the workers in parallel runs.  With a journal, the datasets it
+        recorded are not checked again.
+
+        @param cs              Compliance Checker Suite
+        @param locs            Iterable of dataset locations
+        @param checker_names   List of string names to run
+        @param include_checks  Names of checks to include
+        @param skip_checks     Names of checks to skip
+        @param jobs            Number of worker processes
+        @param prefetch        Number of datasets prefetched ahead
+        @param journal         Optional CheckJournal
+        @param host_limit      Maximum number of datasets prefetched at once
+                               from the same host, 0 for no limit
+        """
+        if journal is not None:
+            yield from journal.resume(
+                cs,
+                locs,
+                checker_names,
+                include_checks,
+                skip_checks,
+                lambda remaining: cls._iter_score_groups(
+                    cs,
+                    remaining,
+                    checker_names,
+                    include_checks,
+                    skip_checks,
+                    jobs,
+                    prefetch,
+                    host_limit=host_limit,
+                ),
+            )
+            return
+
+        if jobs == 0:
+            jobs = os.cpu_count() or 1
+
+        fetch = prefetch_location
+        if jobs > 1:
+            # downloads are handed to the workers as temporary files, which
+            # they open, rather than pickled along with the dataset location
+            fetch = functools.partial(prefetch_location, spool_bytes=0)
+        prefetched_locs = iter_prefetched(
+            locs,
+            prefetch,
+            fetch,
+            host_limit=host_limit,
+        )
+        if jobs <= 1:
+            for loc, prefetched in prefetched_locs:
+                score_groups = cs.check_location(
+                    loc,
+                    checker_names,
+                    include_checks,
+                    skip_checks,
+                    prefetched,
+                )
+                yield loc, score_groups, cs.check_profile
+            return
+
+        wait = cls._worker_wait(cs, checker_names, include_checks, skip_checks)
+
+        def submit(index, loc, prefetched):
+            future = workers[index].executor.submit(
+                _check_dataset,
+                loc,
+                checker_names,
+                include_checks,
+                skip_checks,
+                prefetched,
+            )
+            return loc, prefetched, index, future
+
+        workers = [cls._start_worker(cs) for _ in range(jobs)]
+        try:
+            # (location, prefetched, worker index, future) in input order
+            pending = deque()
+            exhausted = False
+            while True:
+                # keep every worker busy without queueing the whole input
+                while not exhausted and len(pending) < 2 * jobs:
+                    try:
+                        loc, prefetched = next(prefetched_locs)
+                    except StopIteration:
+                        exhausted = True
+                    else:
+                        busy = Counter(
+                            index
+                            for _loc, _prefetched, index, future in pending
+                            if not future.done()
+                        )
+                        index = min(range(jobs), key=busy.__getitem__)
+                        pending.append(submit(index, loc, prefetched))
+                if not pending:
+                    break
+
+                loc, prefetched, index, future = pending.popleft()
+                try:
+                    result = future.result(timeout=wait)
+                except futures.TimeoutError:
+                    # the worker could not interrupt the check itself, e.g.
+                    # while blocked in C code, so replace it and resubmit the
+                    # other datasets it was given, fetched again rather than
+                    # reusing the files handed to the stopped worker
+                    cls._stop_worker(workers[index])
+                    workers[index] = cls._start_worker(cs)
+                    discard(prefetched)
+                    pending = deque(
+                        (
+                            submit(
+                                index,
+                                other_loc,
+                                cls._refetch(fetch, other_loc, other_prefetched),
+                            )
+                            if other_index == index and not _succeeded(other)
+                            else (other_loc, other_prefetched, other_index, other)
+                        )
+                        for other_loc, other_prefetched, other_index, other in pending
+                    )
+                    result = cls._timed_out_result(
+                        cs,
+                        checker_names,
+                        f"Dataset was not checked within {wait}s, the worker "
+                        "was stopped",
+                    )
+                yield (loc, *result)
+        finally:
+            for worker in workers:
+                worker.executor.shutdown(cancel_futures=True)
+            # the datasets of cancelled checks were not loaded
+            for _loc, prefetched, _index, _future in pending:
+                discard(prefetched)
+            prefetched_locs.close()
+
+    @classmethod
+    def _start_worker(cls, cs):
+        """
+        Starts a worker process which checks datasets with the same
+        checkers, options and cache as `cs`
+        """
+        executor = futures.ProcessPoolExecutor(
+            max_workers=1,
+            initializer=_init_worker,
+            initargs=(cs.options, dict(cs.checkers), cs.cache),
+        )
+        return Worker(executor, executor.submit(os.getpid))
+
+    @classmethod
+    def _stop_worker(cls, worker):
+        """
+        Terminates a worker process, even one stuck in a check, and shuts
+        down its pool without waiting
+        """
+        # the process id is known once the worker has run its first task
+        if _succeeded(worker.pid):
+            try:
+                os.kill(worker.pid.result(), signal.SIGTERM)
+            except OSError:
+                # the worker has exited already
+                pass
+        worker.executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def _refetch(cls, fetch, loc, prefetched):
+        """
+        Discards the prefetched files of a dataset and fetches it again, or
+        returns None if it was not prefetched or cannot be fetched, in which
+        case the worker loads it itself
+        """
+        if prefetched is None:
+            return None
+        discard(prefetched)
+        try:
+            return fetch(loc)
+        except Exception:
+            return None
+
+    @classmethod
+    def _worker_wait(cls, cs, checker_names, include_checks, skip_checks):
+        """
+        Returns the seconds a pool worker may take to check a dataset before
+        it is considered stuck, or None without time budgets.  Without a
+        "dataset_timeout", or when it is the larger one, the budget of the
+        checks is the "check_timeout" of each check method run.
+        """
+        dataset_timeout = cs.options.get("dataset_timeout")
+        check_timeout = cs.options.get("check_timeout")
+        budget = dataset_timeout
+        if check_timeout:
+            if skip_checks is not None:
+                skip_check_dict = CheckSuite._process_skip_checks(skip_checks)
+            else:
+                skip_check_dict = defaultdict(lambda: None)
+            include_dict = dict.fromkeys(include_checks, 0) if include_checks else {}
+            check_count = sum(
+                len(cs._get_checks(cs.checkers[name], include_dict, skip_check_dict))
+                for name in (checker_names or cs.checkers)
+                if name in cs.checkers
+            )
+            checks_budget = check_timeout * max(check_count, 1)
+            budget = min(budget, checks_budget) if budget else checks_budget
+        return budget + DATASET_TIMEOUT_GRACE if budget else None
 
-        return (
-            all(cs.passtree(groups, limit) for groups in all_groups),
-            errors_occurred,
+    @classmethod
+    def _timed_out(cls, score_groups):
+        """
+        Returns whether the score_groups are those of a dataset whose worker
+        was stopped, see _timed_out_result
+        """
+        return any(
+            isinstance(errors.get("dataset", (None,))[0], CheckTimeoutError)
+            for _groups, errors in score_groups.values()
         )
 
+    @classmethod
+    def _timed_out_result(cls, cs, checker_names, message):
+        """
+        Returns the (score_groups, check_profile) of a dataset whose worker
+        was stopped, with a CheckTimeoutError as the only error of each
+        checker
+        """
+        score_groups = {
+            checker: ([], {"dataset": (CheckTimeoutError(message), "")})
+            for checker in (checker_names or cs.checkers)
+        }
+        return score_groups, {}
+
     @classmethod
     def stdout_output(cls, cs, score_dict, verbose, limit):
         """
@@ -198,6 +615,7 @@ class ComplianceChecker:
         ds_loc,
         limit,
         output_type="json",
+        profile_dict=None,
     ):
         """
         Generates JSON output for the ocmpliance score(s)
@@ -209,7 +627,10 @@ class ComplianceChecker:
                                and going up from there.
         @param output_type     Either 'json' or 'json_new'. json_new is the new
                                json output format that supports multiple datasets
+        @param profile_dict    Optional dict of dataset locations to check
+                               timings, added to each checker's results
         """
+        profile_dict = profile_dict or {}
         results = {}
         # json output keys out at the top level by
         if len(score_dict) > 1 and output_type != "json_new":
@@ -226,13 +647,20 @@ class ComplianceChecker:
                         groups,
                         ds,
                         limit,
+                        profile_dict.get(ds, {}).get(checker),
                     )
         elif output_type == "json_new":
             for ds, score_groups in score_dict.items():
                 results[ds] = {}
                 for checker, rpair in score_groups.items():
                     groups, errors = rpair
-                    results[ds][checker] = cs.dict_output(checker, groups, ds, limit)
+                    results[ds][checker] = cs.dict_output(
+                        checker,
+                        groups,
+                        ds,
+                        limit,
+                        profile_dict.get(ds, {}).get(checker),
+                    )
         json_results = json.dumps(results, indent=2, ensure_ascii=False)
 
         if output_filename == "-":
@@ -243,6 +671,83 @@ class ComplianceChecker:
 
         return groups
 
+    @classmethod
+    def jsonl_output(cls, cs, ds, score_groups, stream, limit, profile=None):
+        """
+        Writes the JSON results for a single dataset as one line to an open
+        stream and flushes it, so that consumers can read results while the
+        run continues.  Each line has the same structure as a single dataset
+        entry of the 'json_new' format.
+        @param cs              Compliance Checker Suite
+        @param ds              Source dataset location
+        @param score_groups    Dict of checker names to (groups, errors)
+        @param stream          File-like object to write the line to
+        @param limit           The degree of strictness, 1 being the strictest,
+                               and going up from there.
+        @param profile         Optional check timings of the dataset
+        """
+        profile = profile or {}
+        results = {
+            str(ds): {
+                checker: cs.dict_output(
+                    checker,
+                    groups,
+                    ds,
+                    limit,
+                    profile.get(checker),
+                )
+                for checker, (groups, _errors) in score_groups.items()
+            },
+        }
+        stream.write(json.dumps(results, ensure_ascii=False) + "\n")
+        stream.flush()
+
+    @classmethod
+    def _add_profile_totals(cls, totals, profile):
+        """
+        Adds the check timings of one dataset to the totals over a batch
+
+        @param totals   Dict of (checker, check name) -> totals, updated in place
+        @param profile  Check timings of a dataset, as recorded by run_all
+        """
+        for checker, checks in profile.items():
+            for check_name, record in checks.items():
+                total = totals.setdefault(
+                    (checker, check_name),
+                    {"calls": 0, "wall_time": 0.0, "cpu_time": 0.0, "peak_memory": 0},
+                )
+                total["calls"] += 1
+                total["wall_time"] += record["wall_time"]
+                total["cpu_time"] += record["cpu_time"]
+                total["peak_memory"] = max(total["peak_memory"], record["peak_memory"])
+
+    @classmethod
+    def profile_output(cls, totals, top=20):
+        """
+        Prints a table of the checks with the largest total wall time over a
+        batch to stderr, so it does not mix with results written to stdout
+
+        @param totals  Totals as accumulated by _add_profile_totals
+        @param top     Number of checks to list
+        """
+        ranked = sorted(totals.items(), key=lambda item: -item[1]["wall_time"])
+        print(
+            f"\nSlowest checks (top {min(top, len(ranked))} of {len(ranked)}):",
+            file=sys.stderr,
+        )
+        print(
+            f"{'check':<50} {'calls':>6} {'wall (s)':>10} {'cpu (s)':>10} "
+            f"{'peak (MiB)':>11}",
+            file=sys.stderr,
+        )
+        for (checker, check_name), total in ranked[:top]:
+            print(
+                f"{checker + '.' + check_name:<50} {total['calls']:>6} "
+                f"{total['wall_time']:>10.3f} {total['cpu_time']:>10.3f} "
+                f"{total['peak_memory'] / 2**20:>11.2f}",
+                file=sys.stderr,
+            )
+
     @classmethod
     def check_errors(cls, score_groups, verbose):
         """
@@ -268,9 +773,13 @@ class ComplianceChecker:
                     )
 
                     if verbose > 0:
-                        traceback.print_tb(
-                            epair[1].tb_next.tb_next,
-                        )  # skip first two as they are noise from the running itself @TODO search for check_name
+                        # tracebacks from pool workers arrive pre-formatted
+                        if isinstance(epair[1], str):
+                            print(epair[1], end="", file=sys.stderr)
+                        elif epair[1] is not None:
+                            traceback.print_tb(
+                                epair[1].tb_next.tb_next,
+                            )  # skip first two as they are noise from the running itself @TODO search for check_name
                         print(file=sys.stderr)
 
         return errors_occurred
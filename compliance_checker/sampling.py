@@ -0,0 +1,207 @@
+"""
+compliance_checker/sampling.py
+
+Opt-in sampling of variable data for the checks which read it, so that
+triaging an archive costs a bounded amount of I/O per file.
+
+A SamplingPolicy selects blocks of rows along the first dimension of a
+variable, which is the time dimension of most ESGF data, spread evenly from
+the first to the last row.  The amount read is set by one of:
+
+    fraction:F   a fraction F of the rows, e.g. fraction:0.05
+    bytes:N      at most N bytes, with an optional K, M or G suffix, e.g. bytes:64M
+    chunks:N     N whole HDF5 chunks along the first dimension
+
+Blocks start on chunk boundaries and span whole chunks for chunked
+variables, so that no chunk is decompressed only in part.
+
+CheckSuite.run_all activates the policy of the "sample" option for each
+dataset, and checks read their data with read_values(ds, variable), which
+returns the full data when no policy is active or the variable is small
+enough, along with the fraction of the rows read, or reduce it slab by slab
+with compliance_checker.reduction.reduce_values.  Checks report a result
+obtained from a sample with sampled_message.
+"""
+
+import math
+from contextlib import contextmanager
+
+import numpy as np
+
+# blocks read from variables without chunks, e.g. netCDF3 variables
+DEFAULT_BLOCKS = 16
+
+_BYTE_SUFFIXES = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+# id of the dataset -> SamplingPolicy, for the datasets being checked
+_active_policies = {}
+
+
+class SamplingPolicy:
+    """
+    Selects the rows of a variable's first dimension read by data checks
+    """
+
+    def __init__(self, fraction=None, max_bytes=None, chunks=None):
+        """
+        Exactly one of the limits must be set.
+
+        :param float fraction: Fraction of the rows to read, in (0, 1]
+        :param int max_bytes: Maximum number of bytes to read per variable
+        :param int chunks: Number of chunks to read along the first dimension
+        """
+        if sum(limit is not None for limit in (fraction, max_bytes, chunks)) != 1:
+            raise ValueError("Exactly one of fraction, max_bytes or chunks must be set")
+        if fraction is not None and not 0 < fraction <= 1:
+            raise ValueError(f"Sample fraction {fraction} is not in (0, 1]")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError(f"Sample size {max_bytes} must be positive")
+        if chunks is not None and chunks <= 0:
+            raise ValueError(f"Sample chunk count {chunks} must be positive")
+        self.fraction = fraction
+        self.max_bytes = max_bytes
+        self.chunks = chunks
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Returns the policy of a "fraction:F", "bytes:N[K|M|G]" or "chunks:N"
+        specification.  Raises ValueError for other specifications.
+        """
+        kind, _, value = spec.partition(":")
+        kind = kind.strip().lower()
+        value = value.strip()
+        try:
+            if kind == "fraction":
+                return cls(fraction=float(value))
+            if kind == "bytes":
+                suffix = value[-1:].upper() if value[-1:].isalpha() else ""
+                number = value[: len(value) - len(suffix)]
+                return cls(max_bytes=int(float(number) * _BYTE_SUFFIXES[suffix]))
+            if kind == "chunks":
+                return cls(chunks=int(value))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"Invalid sampling specification '{spec}': {e}") from None
+        raise ValueError(
+            f"Invalid sampling specification '{spec}', expected fraction:F, "
+            "bytes:N[K|M|G] or chunks:N",
+        )
+
+    def select_rows(self, variable):
+        """
+        Returns a list of slices of the first dimension of a variable to
+        read, or None if the whole variable should be read
+
+        :param netCDF4.Variable variable: Variable to sample
+        """
+        shape = variable.shape
+        if not shape or shape[0] <= 1:
+            return None
+        nrows = shape[0]
+        block = chunk_rows(variable)
+
+        if self.fraction is not None:
+            target = math.ceil(nrows * self.fraction)
+        elif self.max_bytes is not None:
+            row_bytes = variable.dtype.itemsize * math.prod(shape[1:])
+            # the first and last row are always read
+            target = max(self.max_bytes // max(row_bytes, 1), 2)
+        else:
+            target = self.chunks * (block or 1)
+        if target >= nrows:
+            return None
+
+        if block is None:
+            nblocks = min(DEFAULT_BLOCKS, target)
+            block = math.ceil(target / nblocks)
+            starts = np.linspace(0, nrows - block, nblocks).round().astype(int)
+        else:
+            # whole chunks, aligned on the chunk boundaries
+            nblocks = max(target // block, 1)
+            nchunks = math.ceil(nrows / block)
+            starts = np.linspace(0, nchunks - 1, nblocks).round().astype(int) * block
+
+        rows = []
+        for start in sorted(set(starts.tolist())):
+            stop = min(start + block, nrows)
+            if rows and start <= rows[-1].stop:
+                rows[-1] = slice(rows[-1].start, stop)
+            else:
+                rows.append(slice(start, stop))
+        return rows
+
+
+def chunk_rows(variable):
+    """
+    Returns the chunk size of the first dimension of a chunked variable, or
+    None if the variable is contiguous or its chunking is not known
+    """
+    try:
+        chunking = variable.chunking()
+    except (AttributeError, RuntimeError):
+        return None
+    if not isinstance(chunking, list) or not chunking:
+        return None
+    return chunking[0]
+
+
+@contextmanager
+def sampled(ds, policy):
+    """
+    Makes a sampling policy apply to the data reads of the checks on a
+    dataset until the block exits.  Does nothing when policy is None.
+    """
+    if policy is None:
+        yield
+        return
+    _active_policies[id(ds)] = policy
+    try:
+        yield
+    finally:
+        _active_policies.pop(id(ds), None)
+
+
+def get_policy(ds):
+    """
+    Returns the SamplingPolicy active for a dataset, or None
+    """
+    return _active_policies.get(id(ds))
+
+
+def sample_rows(ds, variable):
+    """
+    Returns the slices of the first dimension of a variable to read under
+    the policy active for the dataset, or None to read the whole variable
+    """
+    policy = _active_policies.get(id(ds))
+    if policy is None:
+        return None
+    return policy.select_rows(variable)
+
+
+def read_values(ds, variable, rows=None):
+    """
+    Reads the data of a variable, or a sample of it when a sampling policy
+    is active for the dataset.
+
+    :param netCDF4.Dataset ds: Dataset the variable belongs to
+    :param netCDF4.Variable variable: Variable to read
+    :param list rows: Slices of the first dimension to read, as returned by
+                      sample_rows, e.g. to read the same rows of a variable
+                      and of its bounds.  Selected for the variable if None.
+    :rtype: tuple
+    :return: The values read and the fraction of the rows they cover
+    """
+    if rows is None:
+        rows = sample_rows(ds, variable)
+    if rows is None:
+        return variable[:], 1.0
+    values = np.ma.concatenate([variable[row] for row in rows])
+    return values, len(values) / variable.shape[0]
+
+
+def sampled_message(var_name, coverage):
+    """
+    Returns the message reporting that the data of a variable was sampled
+    """
+    return f"sampled: checked {coverage:.1%} of the values of '{var_name}'"
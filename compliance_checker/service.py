@@ -0,0 +1,389 @@
+"""
+compliance_checker/service.py
+
+Long running checker service which keeps the checkers and their resources
+loaded between requests, and a thin client to submit datasets to it.
+
+Requests are plain HTTP, either on a localhost TCP port or on a Unix domain
+socket:
+
+    POST /check   {"datasets": [...], "tests": [...], "criteria": "normal",
+                   "skip_checks": [...], "include_checks": [...]}
+    GET /health
+
+A successful check returns the 'json_new' structure, i.e. the dataset
+locations as keys and the per-checker results as values.  Whether all
+checks passed and whether any check raised an exception is reported in the
+X-Checks-Passed and X-Check-Errors response headers.
+
+The service has no access control of its own, so it only listens on a
+loopback address or a Unix socket unless a token is configured, which
+clients then send as an "Authorization: Bearer <token>" header.
+
+This module only imports the standard library at module level, so that the
+client starts quickly.
+"""
+
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import sys
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import UnixStreamServer
+
+from compliance_checker import __version__
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8642
+
+# environment variable holding the token of the service, for the server and
+# the client
+TOKEN_ENV = "CC_SERVICE_TOKEN"
+
+
+class CheckRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles check requests for a CheckServer or UnixCheckServer
+    """
+
+    server_version = f"ComplianceChecker/{__version__}"
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix-socket"
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _authorized(self):
+        """
+        Returns True if the request carries the server's token, if any, and
+        otherwise answers it with 401
+        """
+        token = self.server.token
+        if not token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            return True
+        self._send_json(401, {"error": "Missing or invalid token"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._send_json(
+            200,
+            {
+                "status": "ok",
+                "version": __version__,
+                "checkers": sorted(self.server.check_suite.checkers),
+            },
+        )
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != "/check":
+            self._send_json(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = parse_check_request(self.rfile.read(length))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            results, passed, errors_occurred = self.server.run_check(request)
+        except ValueError as e:
+            # unknown checkers, or datasets which cannot be loaded
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        self._send_json(
+            200,
+            results,
+            {
+                "X-Checks-Passed": str(passed).lower(),
+                "X-Check-Errors": str(errors_occurred).lower(),
+            },
+        )
+
+
+def parse_check_request(body):
+    """
+    Validates the JSON body of a check request and fills in defaults.
+    Raises ValueError for malformed requests.
+
+    :param bytes body: Raw request body
+    :rtype: dict
+    """
+    try:
+        request = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Request body is not valid JSON: {e}") from e
+    if not isinstance(request, dict):
+        raise ValueError("Request body must be a JSON object")
+
+    datasets = request.get("datasets")
+    if isinstance(datasets, str):
+        datasets = [datasets]
+    if not datasets or not all(isinstance(d, str) for d in datasets):
+        raise ValueError("'datasets' must be a non-empty list of locations")
+
+    criteria = request.get("criteria", "normal")
+    if not isinstance(criteria, str) or criteria not in ("lenient", "normal", "strict"):
+        raise ValueError(f"Unknown criteria '{criteria}'")
+
+    return {
+        "datasets": datasets,
+        "tests": _name_list(request, "tests") or ["acdd"],
+        "criteria": criteria,
+        "skip_checks": _name_list(request, "skip_checks") or None,
+        "include_checks": _name_list(request, "include_checks") or None,
+    }
+
+
+def _name_list(request, key):
+    """
+    Returns the list of names of a request field, which may be given as a
+    single string, or an empty list if it is missing or null
+    """
+    names = request.get(key)
+    if names is None:
+        return []
+    if isinstance(names, str):
+        return [names]
+    if not isinstance(names, list) or not all(isinstance(n, str) for n in names):
+        raise ValueError(f"'{key}' must be a list of names")
+    return names
+
+
+def is_loopback(host):
+    """
+    Returns True if every address a host name resolves to is a loopback
+    address
+    """
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except (OSError, UnicodeError):
+        return False
+    return bool(infos) and all(
+        ipaddress.ip_address(info[4][0].split("%")[0]).is_loopback for info in infos
+    )
+
+
+class _CheckServerMixin:
+    """
+    Holds the warm CheckSuite shared by all requests to a server, and the
+    token requests must carry, if any.  Requests are handled one at a time
+    since the netCDF/HDF5 libraries are not thread safe.
+    """
+
+    token = None
+
+    def run_check(self, request):
+        """
+        Checks the datasets of a request parsed by parse_check_request.
+
+        Returns a tuple of the 'json_new' structure, whether all checks
+        passed and whether any check raised an exception.  Raises ValueError
+        for unknown checkers and datasets which cannot be loaded.
+        """
+        from compliance_checker.runner import CRITERIA_LIMITS, ComplianceChecker
+
+        cs = self.check_suite
+        limit = CRITERIA_LIMITS[request["criteria"]]
+        results = {}
+        passed = True
+        errors_occurred = False
+        for loc in request["datasets"]:
+            try:
+                score_groups = cs.check_location(
+                    loc,
+                    request["tests"],
+                    request["include_checks"],
+                    request["skip_checks"],
+                )
+            except SystemExit:
+                # CheckSuite.generate_dataset exits when ncgen cannot
+                # convert a CDL file, which must not stop the service
+                raise ValueError(f"Dataset '{loc}' could not be loaded") from None
+            if not score_groups:
+                raise ValueError(
+                    "No checks found, please check the name of the checker(s) and that they are installed",
+                )
+            results[loc] = {
+                checker: cs.dict_output(checker, groups, loc, limit)
+                for checker, (groups, _errors) in score_groups.items()
+            }
+            passed = passed and all(
+                cs.passtree(groups, limit) for groups, _errors in score_groups.values()
+            )
+            errors_occurred = (
+                ComplianceChecker.check_errors(score_groups, 0) or errors_occurred
+            )
+        return results, passed, errors_occurred
+
+
+class CheckServer(_CheckServerMixin, HTTPServer):
+    """
+    Check service listening on a TCP address, normally on localhost.
+    Listening on other addresses requires a token.
+    """
+
+    def __init__(self, address, check_suite, token=None):
+        if not token and not is_loopback(address[0]):
+            raise ValueError(
+                f"Refusing to listen on non-loopback host '{address[0]}' "
+                f"without a token, set one with --token or {TOKEN_ENV}",
+            )
+        self.check_suite = check_suite
+        self.token = token
+        super().__init__(address, CheckRequestHandler)
+
+
+class UnixCheckServer(_CheckServerMixin, UnixStreamServer):
+    """
+    Check service listening on a Unix domain socket
+    """
+
+    def __init__(self, socket_path, check_suite, token=None):
+        self.check_suite = check_suite
+        self.token = token
+        # remove a stale socket left behind by a previous server
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, CheckRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def serve(
+    check_suite,
+    socket_path=None,
+    host=DEFAULT_HOST,
+    port=DEFAULT_PORT,
+    token=None,
+):
+    """
+    Runs a check service until interrupted
+
+    :param CheckSuite check_suite: Suite with checkers loaded, used for all
+                                   requests
+    :param str socket_path: Listen on this Unix socket instead of TCP
+    :param str host: Host to listen on for TCP, which must be a loopback
+                     address unless a token is given
+    :param int port: Port to listen on for TCP
+    :param str token: Token required from clients, if any
+    """
+    if socket_path:
+        server = UnixCheckServer(socket_path, check_suite, token)
+        where = socket_path
+    else:
+        server = CheckServer((host, port), check_suite, token)
+        where = "http://{}:{}".format(*server.server_address[:2])
+    print(f"Compliance checker service listening on {where}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """
+    HTTPConnection over a Unix domain socket
+    """
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def submit(
+    datasets,
+    tests=None,
+    criteria="normal",
+    skip_checks=None,
+    include_checks=None,
+    socket_path=None,
+    host=DEFAULT_HOST,
+    port=DEFAULT_PORT,
+    timeout=None,
+    token=None,
+):
+    """
+    Submits datasets to a running check service, with the service's token
+    if it requires one.
+
+    Returns a tuple of the decoded JSON response, whether all checks passed
+    and whether any check raised an exception.  Raises RuntimeError if the
+    service reported an error.
+    """
+    if socket_path:
+        conn = UnixHTTPConnection(socket_path, timeout=timeout)
+    else:
+        conn = HTTPConnection(host, port, timeout=timeout)
+    body = json.dumps(
+        {
+            "datasets": list(datasets),
+            "tests": tests or [],
+            "criteria": criteria,
+            "skip_checks": skip_checks or [],
+            "include_checks": include_checks or [],
+        },
+    )
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    try:
+        conn.request(
+            "POST",
+            "/check",
+            body=body,
+            headers=headers,
+        )
+        response = conn.getresponse()
+        result = json.loads(response.read())
+    finally:
+        conn.close()
+
+    if response.status != 200:
+        raise RuntimeError(
+            f"Check service returned {response.status}: {result.get('error')}",
+        )
+    return (
+        result,
+        response.getheader("X-Checks-Passed") == "true",
+        response.getheader("X-Check-Errors") == "true",
+    )
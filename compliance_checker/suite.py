@@ -7,27 +7,42 @@ import inspect
 import itertools
 import os
 import re
+import signal
 import subprocess
 import sys
 import textwrap
+import threading
+import time
+import tracemalloc
 import warnings
 from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from importlib.metadata import entry_points
 from operator import itemgetter
 from pathlib import Path
 from urllib.parse import urlparse
 
-import requests
 from lxml import etree as ET
 from netCDF4 import Dataset
 from owslib.sos import SensorObservationService
 from owslib.swe.sensor.sml import SensorML
 from packaging.version import parse
 
-from compliance_checker import __version__, tempnc
-from compliance_checker.base import BaseCheck, GenericFile, Result, fix_return_value
-from compliance_checker.protocols import cdl, netcdf, opendap, zarr
+from compliance_checker import __version__
+from compliance_checker.base import (
+    BaseCheck,
+    GenericFile,
+    Result,
+    check_cost,
+    check_reads_data,
+    fix_return_value,
+)
+from compliance_checker.dataset_index import indexed
+from compliance_checker.protocols import cdl, netcdf, opendap, resolver, zarr
+from compliance_checker.protocols.remote import session
+from compliance_checker.reduction import cached_stats
+from compliance_checker.sampling import SamplingPolicy, sampled
 
 # Ensure output is encoded as Unicode when checker output is redirected or piped
 if sys.stdout.encoding is None:
@@ -55,15 +70,99 @@ def extract_docstring_summary(docstring):
     )
 
 
+class CheckTimeoutError(BaseException):
+    """
+    Recorded in place of the results of a check which exceeded its time
+    budget, or which was not run because the dataset's budget was used up.
+    Like KeyboardInterrupt, it is not an Exception, so that the checks which
+    catch any Exception to report it as a failure do not swallow it.
+    """
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raises CheckTimeoutError in the enclosed block once `seconds` have
+    passed.  The limit is implemented with SIGALRM, so it only applies in the
+    main thread on platforms which provide setitimer; elsewhere the block
+    runs unlimited.  Code blocked in a C extension, such as a large netCDF
+    read, is interrupted once it returns to Python.  A block which swallows
+    the CheckTimeoutError and runs to completion raises it on exit.
+    :param seconds: Time budget in seconds, or None for no limit
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    message = f"Exceeded the time budget of {seconds:.3g}s"
+    expired = []
+
+    def handle_alarm(signum, frame):
+        expired.append(True)
+        raise CheckTimeoutError(message)
+
+    previous_handler = signal.signal(signal.SIGALRM, handle_alarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+    if expired:
+        raise CheckTimeoutError(message)
+
+
+@contextmanager
+def profile_block(records, name):
+    """
+    Records the wall time, CPU time and peak memory allocated, as traced by
+    tracemalloc, while running the enclosed block in records[name].
+    Tracing is started on first use and slows down the checks, so this is
+    only used when profiling is enabled.
+    :param records: dict to add the record to
+    :param name: Key for the record, i.e. the check method name
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    mem_start = tracemalloc.get_traced_memory()[0]
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        records[name] = {
+            "wall_time": time.perf_counter() - wall_start,
+            "cpu_time": time.process_time() - cpu_start,
+            "peak_memory": max(tracemalloc.get_traced_memory()[1] - mem_start, 0),
+        }
+
+
 class CheckSuite:
     checkers = (
         {}
     )  # Base dict of checker names to BaseCheck derived types, override this in your CheckSuite implementation
     templates_root = "compliance_checker"  # modify to load alternative Jinja2 templates
+    # entry points of the installed checkers by spec name, registered without
+    # importing the checker classes
+    checker_entry_points = {}
+    _loaded_entry_points = set()
 
-    def __init__(self, options=None):
+    def __init__(self, options=None, cache=None):
         self.col_width = 40
         self.options = options or {}
+        # optional compliance_checker.cache.ResultCache
+        self.cache = cache
+        # checker name -> check method name -> timings of the last run_all
+        # call, filled in when the "profile" option is set
+        self.check_profile = {}
+        # checker class -> (options, instance) of the reusable checkers
+        # instantiated by run_all
+        self._checker_instances = {}
 
     @classmethod
     def _get_generator_plugins(cls):
@@ -89,15 +188,54 @@ class CheckSuite:
         :param verbose: Integer indicating whether to print verbose output
         :type verbose: int
         """
-        for checker in sorted(self.checkers.keys()):
-            version = getattr(self.checkers[checker], "_cc_checker_version", "???")
+        suites = self._list_suites()
+        for checker in sorted(suites):
             if verbose > 0:
-                print(f" - {checker} (v{version})")
+                print(f" - {checker} (v{suites[checker]})")
             elif ":" in checker and not checker.endswith(
                 ":latest",
             ):  # Skip the "latest" output
                 print(f" - {checker}")
 
+    @classmethod
+    def _list_suites(cls):
+        """
+        Returns a dict of the names of the loaded checkers and of the
+        registered checkers which have not been loaded yet to their versions.
+        Checkers which have not been loaded are listed from their entry point
+        names, which carry their spec version, e.g. "cf-1.6", so listing does
+        not import them.  They are listed with the checker version of
+        BaseCheck, which a checker class may override.  Only the checkers
+        registered under a name without a version, as some plugins are, are
+        imported to learn their spec version.
+        """
+        cls._load_registered_checkers(
+            ep
+            for eps in cls.checker_entry_points.values()
+            for ep in eps
+            if cls._entry_point_spec(ep.name)[1] is None
+        )
+        suites = {
+            name: getattr(checker, "_cc_checker_version", "???")
+            for name, checker in cls.checkers.items()
+        }
+        for spec, eps in cls.checker_entry_points.items():
+            spec_versions = {}
+            for ep in eps:
+                if ep.name in cls._loaded_entry_points:
+                    continue
+                _, spec_version = cls._entry_point_spec(ep.name)
+                version = BaseCheck._cc_checker_version
+                suites.setdefault(f"{spec}:{spec_version}", version)
+                spec_versions[spec_version] = version
+            if spec_versions and spec not in suites:
+                try:
+                    latest = max(spec_versions, key=parse)
+                except ValueError:
+                    latest = max(spec_versions)
+                suites[spec] = suites[f"{spec}:latest"] = spec_versions[latest]
+        return suites
+
     def _print_checker(self, checker_obj):
         """
         Prints each available check and a description with an abridged
@@ -108,7 +246,12 @@ class CheckSuite:
 
         check_functions = self._get_checks(checker_obj, {}, defaultdict(lambda: None))
         for c, _ in check_functions:
-            print(f"- {c.__name__}")
+            if check_reads_data(c):
+                print(f"- {c.__name__} (reads variable data)")
+            elif check_cost(c) == 0:
+                print(f"- {c.__name__} (path only)")
+            else:
+                print(f"- {c.__name__}")
             if c.__doc__ is not None:
                 u_doc = c.__doc__
                 print(f"\n{extract_docstring_summary(u_doc)}\n")
@@ -132,15 +275,75 @@ class CheckSuite:
             checkers = gen.get_checkers(args)
             cls.checkers.update(checkers)
 
+    @staticmethod
+    def _entry_point_spec(ep_name):
+        """
+        Splits a checker entry point name such as "cf-1.6" into the spec name
+        and version, i.e. ("cf", "1.6").  The version is None for names
+        without one, such as "wcrp_cmip6".
+        """
+        spec, sep, version = ep_name.rpartition("-")
+        if sep and spec and version[:1].isdigit():
+            return spec, version
+        return ep_name, None
+
+    @classmethod
+    def register_available_checkers(cls):
+        """
+        Registers the installed checkers from their entry point metadata
+        without importing them.  Checkers are then imported on demand by
+        load_checkers.
+        """
+        cls.checker_entry_points = {}
+        for ep in entry_points(group="compliance_checker.suites"):
+            spec, _ = cls._entry_point_spec(ep.name)
+            cls.checker_entry_points.setdefault(spec, []).append(ep)
+
     @classmethod
     def load_all_available_checkers(cls):
         """
         Helper method to retrieve all sub checker classes derived from various
-        base classes.
+        base classes.  All entry points are loaded again, since the checkers
+        dict may have been cleared since they were first loaded.
         """
-        cls._load_checkers(
-            entry_points(group="compliance_checker.suites"),
-        )
+        cls.register_available_checkers()
+        eps = list(itertools.chain.from_iterable(cls.checker_entry_points.values()))
+        cls._load_checkers(eps)
+        cls._loaded_entry_points.update(ep.name for ep in eps)
+
+    @classmethod
+    def load_checkers(cls, checker_names):
+        """
+        Imports only the registered checkers needed for the given checker
+        names, e.g. "cf" or "cf:1.6" load all versions of the CF checker so
+        that "latest" can be resolved.  Names which cannot be matched to an
+        entry point cause all remaining checkers to be loaded.
+        :param checker_names: Checker names, as passed to `-t`
+        """
+        if not cls.checker_entry_points:
+            cls.register_available_checkers()
+        selected = []
+        for name in checker_names:
+            spec = name.split(":", 1)[0]
+            if spec in cls.checker_entry_points:
+                selected.extend(cls.checker_entry_points[spec])
+            elif name not in cls.checkers:
+                selected = itertools.chain.from_iterable(
+                    cls.checker_entry_points.values(),
+                )
+                break
+        cls._load_registered_checkers(selected)
+
+    @classmethod
+    def _load_registered_checkers(cls, eps):
+        """
+        Loads the entry points which have not been loaded before
+        """
+        eps = {ep.name: ep for ep in eps if ep.name not in cls._loaded_entry_points}
+        if eps:
+            eps = list(eps.values())
+            cls._load_checkers(eps)
+            cls._loaded_entry_points.update(ep.name for ep in eps)
 
     @classmethod
     def _load_checkers(cls, checkers):
@@ -201,7 +404,9 @@ class CheckSuite:
     def _get_checks(self, checkclass, include_checks, skip_checks):
         """
         Helper method to retrieve check methods from a Checker class.  Excludes
-        any checks in `skip_checks`.
+        any checks in `skip_checks`, and checks which read variable data if the
+        "metadata_only" option is set.  If the "fail_fast" option is set, the
+        checks are ordered cheapest first, see check_cost.
 
         The name of the methods in the Checker class should start with "check_"
         for this method to find them.
@@ -214,6 +419,8 @@ class CheckSuite:
                                include the checks specified (False).
         """
         meths = inspect.getmembers(checkclass, inspect.isroutine)
+        if self.options.get("metadata_only"):
+            meths = [(name, fn) for name, fn in meths if not check_reads_data(fn)]
         # return all check methods not among the skipped checks
         returned_checks = []
         if include_checks:
@@ -228,6 +435,8 @@ class CheckSuite:
                 ):
                     returned_checks.append((fn_obj, skip_checks[fn_name]))
 
+        if self.options.get("fail_fast"):
+            returned_checks.sort(key=lambda check: check_cost(check[0]))
         return returned_checks
 
     def _run_check(self, check_method, ds, max_level):
@@ -316,8 +525,9 @@ class CheckSuite:
         while len(checker_queue):
             name, a = checker_queue.pop()
             # is the current dataset type in the supported filetypes
-            # for the checker class?
-            if type(ds) in a().supported_ds:
+            # for the checker class?  Subclasses such as the datasets read
+            # with range requests are supported too
+            if isinstance(ds, tuple(a().supported_ds)):
                 valid.append((name, a))
 
             # add subclasses of SOS checks
@@ -367,14 +577,73 @@ class CheckSuite:
         )
         return self.run_all(ds, checker_names, skip_checks=skip_checks)
 
+    def _get_checker_instance(self, checker_class, checker_opts):
+        """
+        Returns a checker instance ready for setup(ds).  Checkers with
+        `_cc_reusable` set are instantiated once per options and reset for
+        every further dataset, so that resources loaded in their constructor,
+        like the CF standard name table, are kept for the whole batch.
+        Other checkers get a new instance each time.  The flag is not
+        inherited, since a subclass may keep state which the reset() of its
+        parent does not clear.
+        """
+        reusable = vars(checker_class).get("_cc_reusable", False)
+        if reusable:
+            cached = self._checker_instances.get(checker_class)
+            if cached is not None and cached[0] == checker_opts:
+                checker = cached[1]
+                checker.reset()
+                return checker
+
+        # instantiate a Checker object
+        try:
+            checker = checker_class(options=checker_opts)
+        # hacky fix for no options in constructor
+        except TypeError:
+            checker = checker_class()
+        if reusable:
+            self._checker_instances[checker_class] = (dict(checker_opts), checker)
+        return checker
+
     def run_all(self, ds, checker_names, include_checks=None, skip_checks=None):
         """
         Runs this CheckSuite on the dataset with all the passed Checker instances.
 
         Returns a dictionary mapping checker names to a 2-tuple of their grouped scores and errors/exceptions while running checks.
+
+        If the "profile" option is set, the wall time, CPU time and peak
+        memory allocation of the setup and of each check method are recorded
+        in `check_profile`.
+
+        The "check_timeout" and "dataset_timeout" options set time budgets in
+        seconds for each check method and for all checks on the dataset.  A
+        check exceeding its budget, or left to run once the dataset's budget
+        is used up, is recorded in the errors as a CheckTimeoutError.
+
+        While the checkers run, the metadata of a netCDF dataset is available
+        to them from a DatasetIndex, see compliance_checker.dataset_index.
+
+        The "fail_fast" option holds a weight limit, as given by the criteria.
+        When set, the checks run cheapest first and the run stops after the
+        first check with a failed result of at least that weight, so that
+        only the checkers run so far are returned, with the results obtained
+        until then.  Such a dataset fails the criteria all the same.
+
+        The "sample" option holds a SamplingPolicy, or its specification such
+        as "fraction:0.01", which limits the data read by the checks which
+        read variable data, see compliance_checker.sampling.
         """
 
         ret_val = {}
+        profiling = bool(self.options.get("profile"))
+        self.check_profile = {}
+        check_timeout = self.options.get("check_timeout")
+        dataset_timeout = self.options.get("dataset_timeout")
+        deadline = time.monotonic() + dataset_timeout if dataset_timeout else None
+        fail_fast = self.options.get("fail_fast")
+        sampling_policy = self.options.get("sample")
+        if isinstance(sampling_policy, str):
+            sampling_policy = SamplingPolicy.from_spec(sampling_policy)
         checkers = self._get_valid_checkers(ds, checker_names)
 
         if skip_checks is not None:
@@ -394,44 +663,142 @@ class CheckSuite:
                 ),
             )
 
-        for checker_name, checker_class in checkers:
-            # TODO: maybe this a little more reliable than depending on
-            #       a string to determine the type of the checker -- perhaps
-            #       use some kind of checker object with checker type and
-            #       version baked in
-            checker_type_name = checker_name.split(":")[0]
-            checker_opts = self.options.get(checker_type_name, {})
-
-            # instantiate a Checker object
-            try:
-                checker = checker_class(options=checker_opts)
-            # hacky fix for no options in constructor
-            except TypeError:
-                checker = checker_class()
-            # TODO? : Why is setup(ds) called at all instead of just moving the
-            #         checker setup into the constructor?
-            # setup method to prep
-            checker.setup(ds)
-
-            checks = self._get_checks(checker, include_dict, skip_check_dict)
-            vals = []
-            errs = {}  # check method name -> (exc, traceback)
-
-            for c, max_level in checks:
-                try:
-                    vals.extend(self._run_check(c, ds, max_level))
-                except Exception as e:
-                    errs[c.__func__.__name__] = (e, sys.exc_info()[2])
+        # attributes, dimensions and shapes, and the statistics of the
+        # variables reduced by data checks, are read once for all checkers
+        with indexed(ds), sampled(ds, sampling_policy), cached_stats(ds):
+            for checker_name, checker_class in checkers:
+                # TODO: maybe this a little more reliable than depending on
+                #       a string to determine the type of the checker -- perhaps
+                #       use some kind of checker object with checker type and
+                #       version baked in
+                checker_type_name = checker_name.split(":")[0]
+                checker_opts = self.options.get(checker_type_name, {})
+
+                checker = self._get_checker_instance(checker_class, checker_opts)
+                profile = {}
+                if profiling:
+                    self.check_profile[checker_name] = profile
+                # TODO? : Why is setup(ds) called at all instead of just moving the
+                #         checker setup into the constructor?
+                # setup method to prep
+                if profiling:
+                    with profile_block(profile, "setup"):
+                        checker.setup(ds)
+                else:
+                    checker.setup(ds)
+
+                checks = self._get_checks(checker, include_dict, skip_check_dict)
+                vals = []
+                errs = {}  # check method name -> (exc, traceback)
+                blocked = False
+
+                for c, max_level in checks:
+                    check_name = c.__func__.__name__
+                    budget = check_timeout
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            errs[check_name] = (
+                                CheckTimeoutError(
+                                    f"Not run, the dataset time budget of "
+                                    f"{dataset_timeout}s was used up",
+                                ),
+                                None,
+                            )
+                            continue
+                        budget = min(budget or remaining, remaining)
+                    try:
+                        with time_limit(budget):
+                            if profiling:
+                                with profile_block(profile, check_name):
+                                    check_vals = self._run_check(c, ds, max_level)
+                            else:
+                                check_vals = self._run_check(c, ds, max_level)
+                    except (Exception, CheckTimeoutError) as e:
+                        errs[check_name] = (e, sys.exc_info()[2])
+                        continue
+                    vals.extend(check_vals)
+                    if fail_fast and self._has_blocking_failure(check_vals, fail_fast):
+                        blocked = True
+                        break
+
+                # score the results we got back
+                groups = self.scores(vals)
+
+                # invoke finalizer explicitly, reused checkers stay alive in
+                # _checker_instances
+                del checker
+
+                ret_val[checker_name] = groups, errs
+                if blocked:
+                    break
 
-            # score the results we got back
-            groups = self.scores(vals)
+        return ret_val
 
-            # invoke finalizer explicitly
-            del checker
+    def _has_blocking_failure(self, results, limit):
+        """
+        Returns True if any of the raw results failed with a weight of at
+        least limit, which makes the dataset fail passtree at that limit
+        """
+        for r in results:
+            value = self._translate_value(r.value)
+            if r.weight >= limit and value[0] != value[1]:
+                return True
+        return False
+
+    def check_location(
+        self,
+        ds_loc,
+        checker_names,
+        include_checks=None,
+        skip_checks=None,
+        prefetched=None,
+    ):
+        """
+        Loads the dataset at a location, runs the checkers on it with run_all
+        and closes it again.  If a result cache is set and holds results for
+        an unchanged local file, they are returned without opening the
+        dataset.  Results with errors are not cached since the errors may be
+        transient.  The cache is bypassed when profiling.
 
-            ret_val[checker_name] = groups, errs
+        `prefetched` is the optional result of prefetching the location, see
+        compliance_checker.prefetch.
 
-        return ret_val
+        Returns the same structure as run_all.
+        """
+        cache_key = None
+        if self.cache is not None and not self.options.get("profile"):
+            cache_key = self.cache.make_key(
+                self,
+                ds_loc,
+                checker_names,
+                include_checks,
+                skip_checks,
+            )
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        ds = self.load_dataset(ds_loc, prefetched)
+        try:
+            score_groups = self.run_all(
+                ds,
+                checker_names,
+                include_checks,
+                skip_checks,
+            )
+        finally:
+            if hasattr(ds, "close"):
+                ds.close()
+
+        if (
+            cache_key is not None
+            and score_groups
+            and not any(errs for _groups, errs in score_groups.values())
+        ):
+            self.cache.put(cache_key, score_groups)
+        return score_groups
 
     @classmethod
     def passtree(cls, groups, limit):
@@ -530,7 +897,7 @@ class CheckSuite:
         aggregates["cc_version"] = __version__
         return aggregates
 
-    def dict_output(self, check_name, groups, source_name, limit):
+    def dict_output(self, check_name, groups, source_name, limit, profile=None):
         """
         Builds the results into a JSON structure and writes it to the file buffer.
 
@@ -539,8 +906,17 @@ class CheckSuite:
         @param output_filename Path to file to save output
         @param source_name     Source of the dataset, used for title
         @param limit           Integer value for limiting output
+        @param profile         Optional per check timings recorded by run_all,
+                               added under the "check_profile" key
         """
         aggregates = self.build_structure(check_name, groups, source_name, limit)
+        # datasets read from a manifest can be traced back to their line
+        line_number = getattr(source_name, "line_number", None)
+        if line_number is not None:
+            aggregates["manifest"] = source_name.manifest
+            aggregates["manifest_line"] = line_number
+        if profile is not None:
+            aggregates["check_profile"] = profile
         return self.serialize(aggregates)
 
     def serialize(self, o):
@@ -800,12 +1176,14 @@ class CheckSuite:
                 sys.exit(1)
         return ds_str
 
-    def load_dataset(self, ds_str):
+    def load_dataset(self, ds_str, prefetched=None):
         """
         Returns an instantiated instance of either a netCDF file or an SOS
         mapped DS object.
 
         :param str ds_str: URL of the resource to load
+        :param Prefetched prefetched: Optional result of prefetching the
+                                      resource, see compliance_checker.prefetch
         """
         if isinstance(ds_str, Path):
             ds_str = str(ds_str)
@@ -814,61 +1192,71 @@ class CheckSuite:
         # as a local resource.
         pr = urlparse(ds_str)
         if pr.netloc:
-            return self.load_remote_dataset(ds_str)
+            if prefetched is None:
+                return self.load_remote_dataset(ds_str)
+            if prefetched.download is not None:
+                return netcdf.open_download(prefetched.download)
+            return self.load_remote_dataset(ds_str, prefetched.protocol)
         else:
             return self.load_local_dataset(ds_str)
 
     def check_remote_netcdf(self, ds_str):
-        if netcdf.is_remote_netcdf(ds_str):
-            response = requests.get(ds_str, allow_redirects=True, timeout=60)
-            try:
-                return Dataset(
-                    urlparse(response.url).path,
-                    memory=response.content,
-                )
-            except OSError:
-                # handle case when netCDF C libs weren't compiled with
-                # in-memory support by using tempfile
-                with tempnc(response.content) as _nc:
-                    return Dataset(_nc)
+        protocol = resolver.resolve(ds_str)
+        if protocol.name == resolver.NETCDF:
+            # read lazily with range requests where possible
+            return netcdf.open_remote_netcdf(
+                ds_str,
+                byte_ranges=protocol.byte_ranges,
+            )
+        return None
 
-    def load_remote_dataset(self, ds_str):
+    def load_remote_dataset(self, ds_str, protocol=None):
         """
         Returns a dataset instance for the remote resource, either OPeNDAP or SOS
 
+        The protocol of the resource is found with a single probe, or none
+        once another resource of the same service was classified, see
+        compliance_checker.protocols.resolver.
+
         :param str ds_str: URL to the remote resource
+        :param Protocol protocol: Optional protocol of the resource, already
+                                  resolved
         """
-
         url_parsed = urlparse(ds_str)
-        # ERDDAP TableDAP request
-
-        nc_remote_result = self.check_remote_netcdf(ds_str)
-        if nc_remote_result:
-            return nc_remote_result
+        if protocol is None:
+            protocol = resolver.resolve(ds_str)
 
         # if application/x-netcdf wasn't detected in the Content-Type headers
         # and this is some kind of erddap tabledap form, then try to get the
         # .ncCF file from ERDDAP
-        elif "tabledap" in ds_str and not url_parsed.query:
+        if (
+            protocol.name != resolver.NETCDF
+            and "tabledap" in ds_str
+            and not url_parsed.query
+        ):
             # modify ds_str to contain the full variable request
             variables_str = opendap.create_DAP_variable_str(ds_str)
 
             # join to create a URL to an .ncCF resource
             ds_str = f"{ds_str}.ncCF?{variables_str}"
+            protocol = resolver.resolve(ds_str)
 
-        nc_remote_result = self.check_remote_netcdf(ds_str)
-        if nc_remote_result:
-            return nc_remote_result
+        if protocol.name == resolver.NETCDF:
+            # read lazily with range requests where possible
+            return netcdf.open_remote_netcdf(
+                ds_str,
+                byte_ranges=protocol.byte_ranges,
+            )
 
         # if it's just an OPeNDAP endpoint, use that
-        elif opendap.is_opendap(ds_str):
+        elif protocol.name == resolver.OPENDAP:
             return Dataset(ds_str)
 
         # Check if the HTTP response is XML, if it is, it's likely SOS so
         # we'll attempt to parse the response as SOS.
         # Some SOS servers don't seem to support HEAD requests.
         # Issue GET instead if we reach here and can't get the response
-        response = requests.get(ds_str, allow_redirects=True, timeout=60)
+        response = session().get(ds_str, allow_redirects=True, timeout=60)
         content_type = response.headers.get("content-type")
         if content_type.split(";")[0] == "text/xml":
             return self.process_doc(response.content)
@@ -911,90 +1299,87 @@ class CheckSuite:
 
         return grouped
 
-    def _group_raw(self, raw_scores, cur=None, level=1):
+    def _group_raw(self, raw_scores):
         """
-        Internal recursive method to group raw scores into a cascading score summary.
-        Only top level items are tallied for scores.
+        Groups raw scores into a cascading score summary in a single pass.
+
+        The name of a raw result is the path of its group, e.g.
+        ("§2.6 Attributes", "title"), or a single group name.  The results
+        are put in a trie keyed by each element of their path together with
+        their weight, and each node of the trie becomes a Result with its
+        subnodes, sorted by name and weight, as children.  A leaf sums the
+        scores and joins the messages of its raw results, other nodes take
+        the maximum weight and the summed scores of their children.  Results
+        whose path ends at a node with subnodes are grouped under a child
+        named "".
         @param list raw_scores: list of raw scores (Result objects)
         """
-
-        def trim_groups(r):
-            if isinstance(r.name, tuple) or isinstance(r.name, list):
-                new_name = r.name[1:]
-            else:
-                new_name = []
-
-            return Result(r.weight, r.value, new_name, r.msgs)
-
-        # CHECK FOR TERMINAL CONDITION: all raw_scores.name are single length
-        # @TODO could have a problem here with scalar name, but probably still works
-        terminal = [len(x.name) for x in raw_scores]
-        if terminal == [0] * len(raw_scores):
+        # CHECK FOR TERMINAL CONDITION: all raw_scores.name are empty
+        if all(len(r.name) == 0 for r in raw_scores):
             return []
 
-        def group_func(r):
-            """
-            Takes a Result object and slices off the first element of its name
-            if its's a tuple. Otherwise, does nothing to the name. Returns the
-            Result's name and weight in a tuple to be used for sorting in that
-            order in a groupby function.
-            @param Result r
-            @return tuple (str, int)
-            """
-            if isinstance(r.name, tuple) or isinstance(r.name, list):
-                if len(r.name) == 0:
-                    retval = ""
-                else:
-                    retval = r.name[0:1][0]
+        # a trie node is a (subnodes, results) pair, where subnodes maps
+        # (name, weight) keys to nodes and results holds the (index, Result)
+        # of the raw results whose path ends at the node
+        root = {}
+        for i, r in enumerate(raw_scores):
+            if isinstance(r.name, (tuple, list)):
+                path = r.name or ("",)
             else:
-                retval = r.name
-            return retval, r.weight
-
-        # END INTERNAL FUNCS ##########################################
-
-        # NOTE until this point, *ALL* Results in raw_scores are
-        # individual Result objects.
-
-        # sort then group by name, then by priority weighting
-        grouped = itertools.groupby(sorted(raw_scores, key=group_func), key=group_func)
-
-        # NOTE: post-grouping, grouped looks something like
-        # [(('Global Attributes', 1), <itertools._grouper at 0x7f10982b5390>),
-        #  (('Global Attributes', 3), <itertools._grouper at 0x7f10982b5438>),
-        #  (('Not a Global Attr', 1), <itertools._grouper at 0x7f10982b5470>)]
-        #  (('Some Variable', 2),     <itertools._grouper at 0x7f10982b5400>),
-
-        ret_val = []
-
-        for k, v in grouped:  # iterate through the grouped tuples
-            k = k[0]  # slice ("name", weight_val) --> "name"
-            v = list(v)  # from itertools._grouper to list
-
-            cv = self._group_raw(list(map(trim_groups, v)), k, level + 1)
-            if len(cv):
-                # if this node has children, max weight of children + sum of all the scores
-                max_weight = max([x.weight for x in cv])
-                sum_scores = tuple(map(sum, list(zip(*([x.value for x in cv])))))
-                msgs = []
-
-            else:
-                max_weight = max([x.weight for x in v])
-                sum_scores = tuple(
-                    map(sum, list(zip(*([self._translate_value(x.value) for x in v])))),
-                )
-                msgs = sum([x.msgs for x in v], [])
-
-            ret_val.append(
-                Result(
-                    name=k,
-                    weight=max_weight,
-                    value=sum_scores,
-                    children=cv,
-                    msgs=msgs,
-                ),
-            )
+                path = (r.name,)
+            subnodes = root
+            for name in path:
+                key = (name, r.weight)
+                node = subnodes.get(key)
+                if node is None:
+                    node = subnodes[key] = ({}, [])
+                subnodes = node[0]
+            node[1].append((i, r))
+
+        return [self._group_node(key, root[key], []) for key in sorted(root)]
+
+    def _group_node(self, key, node, pushed_down):
+        """
+        Builds the Result of a trie node from _group_raw, with the raw
+        results pushed down from its parent ordered as they were checked
+        """
+        name, weight = key
+        subnodes, results = node
+        if pushed_down:
+            results = sorted(pushed_down + results, key=itemgetter(0))
+
+        if not subnodes:
+            score = out_of = 0
+            msgs = []
+            for _i, r in results:
+                value = self._translate_value(r.value)
+                score += value[0]
+                out_of += value[1]
+                msgs.extend(r.msgs)
+            return Result(name=name, weight=weight, value=(score, out_of), msgs=msgs)
+
+        if results:
+            subnodes = dict(subnodes)
+            empty_key = ("", weight)
+            subnodes.setdefault(empty_key, ({}, []))
+            pushed = {empty_key: results}
+        else:
+            pushed = {}
 
-        return ret_val
+        children = [
+            self._group_node(k, subnodes[k], pushed.get(k, []))
+            for k in sorted(subnodes)
+        ]
+        return Result(
+            name=name,
+            weight=max(child.weight for child in children),
+            value=(
+                sum(child.value[0] for child in children),
+                sum(child.value[1] for child in children),
+            ),
+            children=children,
+            msgs=[],
+        )
 
     def _translate_value(self, val):
         """
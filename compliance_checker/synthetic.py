@@ -0,0 +1,459 @@
+"""
+compliance_checker/synthetic.py
+
+Generator of synthetic CMIP6 datasets laid out in a DRS directory tree, for
+benchmarks and load tests which need realistic inputs at production scale
+without network access.
+
+Each dataset is a variable of a model, experiment and ensemble member,
+split into files of consecutive time periods, named and placed as in CMIP6:
+
+    CMIP6/<activity_id>/<institution_id>/<source_id>/<experiment_id>/
+        <member_id>/<table_id>/<variable_id>/<grid_label>/<version>/
+            <variable_id>_<table_id>_<source_id>_<experiment_id>_<member_id>_<grid_label>_<start>-<end>.nc
+
+The files hold the CMIP6 global attributes, time, latitude and longitude
+coordinates with their bounds and the data variable, with configurable
+chunking and compression.  A share of the files can be given a defect, such
+as a missing global attribute or a time value outside of its bounds.  The
+output only depends on the arguments, including the seed.
+
+The trees are written with `cchecker.py generate`, or from Python with
+iter_tree, which writes the files one at a time.
+"""
+
+import os
+from collections import namedtuple
+
+import numpy as np
+from netCDF4 import Dataset
+
+VERSION = "v20190101"
+CREATION_DATE = "2019-01-01T00:00:00Z"
+REFERENCE_YEAR = 1850
+
+# (institution_id, source_id, nominal_resolution)
+SOURCES = [
+    ("IPSL", "IPSL-CM6A-LR", "250 km"),
+    ("CNRM-CERFACS", "CNRM-CM6-1", "250 km"),
+    ("NCAR", "CESM2", "100 km"),
+    ("MOHC", "UKESM1-0-LL", "250 km"),
+]
+
+# (activity_id, experiment_id, experiment, start year, parent experiment_id)
+EXPERIMENTS = [
+    (
+        "CMIP",
+        "historical",
+        "all-forcing simulation of the recent past",
+        1850,
+        "piControl",
+    ),
+    ("ScenarioMIP", "ssp585", "update of RCP8.5 based on SSP5", 2015, "historical"),
+    ("CMIP", "piControl", "pre-industrial control", 1850, "no parent"),
+]
+
+# (table_id, frequency, realm, variable_id, standard_name, units, long_name,
+#  mean, spread)
+VARIABLES = [
+    (
+        "Amon",
+        "mon",
+        "atmos",
+        "tas",
+        "air_temperature",
+        "K",
+        "Near-Surface Air Temperature",
+        280.0,
+        20.0,
+    ),
+    (
+        "Amon",
+        "mon",
+        "atmos",
+        "pr",
+        "precipitation_flux",
+        "kg m-2 s-1",
+        "Precipitation",
+        3e-5,
+        1e-5,
+    ),
+    (
+        "Amon",
+        "mon",
+        "atmos",
+        "psl",
+        "air_pressure_at_mean_sea_level",
+        "Pa",
+        "Sea Level Pressure",
+        101325.0,
+        1000.0,
+    ),
+    (
+        "day",
+        "day",
+        "atmos",
+        "tas",
+        "air_temperature",
+        "K",
+        "Near-Surface Air Temperature",
+        280.0,
+        20.0,
+    ),
+    (
+        "day",
+        "day",
+        "atmos",
+        "pr",
+        "precipitation_flux",
+        "kg m-2 s-1",
+        "Precipitation",
+        3e-5,
+        1e-5,
+    ),
+    (
+        "Omon",
+        "mon",
+        "ocean",
+        "tos",
+        "sea_surface_temperature",
+        "degC",
+        "Sea Surface Temperature",
+        15.0,
+        10.0,
+    ),
+]
+
+DEFECTS = [
+    "missing_attribute",
+    "attribute_mismatch",
+    "bad_units",
+    "bounds_violation",
+    "time_gap",
+]
+
+# global attributes removed by the missing_attribute defect
+_REQUIRED_ATTRS = [
+    "institution_id",
+    "table_id",
+    "variant_label",
+    "frequency",
+    "grid_label",
+]
+
+# days before each month of the noleap calendar
+_MONTH_STARTS = np.cumsum([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+GeneratedFile = namedtuple("GeneratedFile", ["path", "dataset_id", "size", "defect"])
+
+
+def parse_size(text):
+    """
+    Returns the number of bytes of a size such as "512", "64K", "10M" or "1G"
+    """
+    text = text.strip().upper()
+    factor = {"K": 1024, "M": 1024**2, "G": 1024**3}.get(text[-1:], 1)
+    if factor != 1:
+        text = text[:-1]
+    return int(float(text) * factor)
+
+
+def _date(day):
+    """
+    Returns the (year, month, day) of a day of the noleap calendar counted
+    from REFERENCE_YEAR
+    """
+    year, day_of_year = divmod(int(day), 365)
+    month = int(np.searchsorted(_MONTH_STARTS, day_of_year, side="right"))
+    return REFERENCE_YEAR + year, month, day_of_year - _MONTH_STARTS[month - 1] + 1
+
+
+def _time_bounds(frequency, start_year, first_step, steps):
+    """
+    Returns the (steps, 2) time bounds in days since REFERENCE_YEAR of
+    consecutive monthly or daily time steps
+    """
+    index = np.arange(first_step, first_step + steps + 1)
+    if frequency == "mon":
+        years, months = np.divmod(index, 12)
+        edges = (years + start_year - REFERENCE_YEAR) * 365 + _MONTH_STARTS[months]
+    else:
+        edges = index + (start_year - REFERENCE_YEAR) * 365
+    edges = edges.astype("f8")
+    return np.stack([edges[:-1], edges[1:]], axis=1)
+
+
+def _period(frequency, bounds):
+    """
+    Returns the <start>-<end> part of a CMIP6 file name for the time bounds
+    """
+    first, last = _date(bounds[0, 0]), _date(bounds[-1, 0])
+    if frequency == "mon":
+        return "{:04d}{:02d}-{:04d}{:02d}".format(*first[:2], *last[:2])
+    return "{:04d}{:02d}{:02d}-{:04d}{:02d}{:02d}".format(*first, *last)
+
+
+def _dataset_specs(seed):
+    """
+    Returns the (source, experiment, variable) combinations in the order
+    datasets are generated for a seed
+    """
+    combos = [
+        (source, experiment, variable)
+        for source in SOURCES
+        for experiment in EXPERIMENTS
+        for variable in VARIABLES
+    ]
+    order = np.random.default_rng(seed).permutation(len(combos))
+    return [combos[i] for i in order]
+
+
+def iter_tree(
+    root,
+    files=10,
+    files_per_dataset=2,
+    time_steps=12,
+    grid=(36, 72),
+    chunk_time=0,
+    complevel=0,
+    defect_rate=0.0,
+    defects=DEFECTS,
+    seed=0,
+):
+    """
+    Writes a CMIP6 DRS tree of synthetic files below root, one file at a
+    time, and yields a GeneratedFile for each file written.
+
+    :param str root: Directory to write the CMIP6 tree in
+    :param int files: Number of files to write
+    :param int files_per_dataset: Number of consecutive time periods each
+                                  dataset is split into
+    :param int time_steps: Number of time steps per file
+    :param tuple grid: Number of latitudes and longitudes
+    :param int chunk_time: Length of the data chunks along time, 0 for the
+                           default chunking of the netCDF library
+    :param int complevel: zlib compression level of the data, 0 for none
+    :param float defect_rate: Share of the files given a defect
+    :param list defects: Kinds of defects to choose from, see DEFECTS
+    :param int seed: Seed of the choices and of the data
+    :rtype: generator
+    """
+    unknown = set(defects) - set(DEFECTS)
+    if unknown:
+        raise ValueError(
+            f"Unknown defects {sorted(unknown)}, expected some of {DEFECTS}"
+        )
+    specs = _dataset_specs(seed)
+    nlat, nlon = grid
+    for index in range(files):
+        dataset_index, part = divmod(index, files_per_dataset)
+        source, experiment, variable = specs[dataset_index % len(specs)]
+        # datasets beyond the combinations are further ensemble members
+        realization = dataset_index // len(specs) + 1
+        rng = np.random.default_rng([seed, index])
+        defect = None
+        if defects and rng.random() < defect_rate:
+            defect = defects[rng.integers(len(defects))]
+
+        institution_id, source_id, nominal_resolution = source
+        activity_id, experiment_id, experiment_name, start_year, parent = experiment
+        table_id, frequency, realm, variable_id = variable[:4]
+        member_id = f"r{realization}i1p1f1"
+        directory = os.path.join(
+            root,
+            "CMIP6",
+            activity_id,
+            institution_id,
+            source_id,
+            experiment_id,
+            member_id,
+            table_id,
+            variable_id,
+            "gn",
+            VERSION,
+        )
+        bounds = _time_bounds(frequency, start_year, part * time_steps, time_steps)
+        filename = "_".join(
+            (
+                variable_id,
+                table_id,
+                source_id,
+                experiment_id,
+                member_id,
+                "gn",
+                _period(frequency, bounds),
+            ),
+        )
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{filename}.nc")
+        global_attrs = {
+            "Conventions": "CF-1.7 CMIP-6.2",
+            "activity_id": activity_id,
+            "branch_method": "standard" if parent != "no parent" else "no parent",
+            "branch_time_in_child": 0.0,
+            "branch_time_in_parent": 0.0,
+            "contact": "esgf-qc@example.org",
+            "creation_date": CREATION_DATE,
+            "data_specs_version": "01.00.30",
+            "experiment": experiment_name,
+            "experiment_id": experiment_id,
+            "forcing_index": np.int32(1),
+            "frequency": frequency,
+            "further_info_url": (
+                f"https://furtherinfo.es-doc.org/CMIP6.{institution_id}.{source_id}."
+                f"{experiment_id}.none.{member_id}"
+            ),
+            "grid": "synthetic regular lat-lon grid",
+            "grid_label": "gn",
+            "initialization_index": np.int32(1),
+            "institution": f"{institution_id} (synthetic)",
+            "institution_id": institution_id,
+            "license": "CMIP6 model data produced by the compliance checker is licensed under a Creative Commons Attribution 4.0 International License",
+            "mip_era": "CMIP6",
+            "nominal_resolution": nominal_resolution,
+            "parent_activity_id": "CMIP" if parent != "no parent" else "no parent",
+            "parent_experiment_id": parent,
+            "physics_index": np.int32(1),
+            "product": "model-output",
+            "realization_index": np.int32(realization),
+            "realm": realm,
+            "source": f"{source_id} (synthetic)",
+            "source_id": source_id,
+            "source_type": "AOGCM",
+            "sub_experiment": "none",
+            "sub_experiment_id": "none",
+            "table_id": table_id,
+            "tracking_id": "hdl:21.14100/{:032x}".format(
+                int.from_bytes(rng.bytes(16), "big"),
+            ),
+            "variable_id": variable_id,
+            "variant_label": member_id,
+        }
+        _write_file(
+            path,
+            global_attrs,
+            variable,
+            bounds,
+            nlat,
+            nlon,
+            chunk_time,
+            complevel,
+            defect,
+            rng,
+        )
+        dataset_id = ".".join(
+            (
+                "CMIP6",
+                activity_id,
+                institution_id,
+                source_id,
+                experiment_id,
+                member_id,
+                table_id,
+                variable_id,
+                "gn",
+            ),
+        )
+        yield GeneratedFile(
+            path,
+            f"{dataset_id}#{VERSION[1:]}",
+            os.path.getsize(path),
+            defect,
+        )
+
+
+def _write_file(
+    path,
+    global_attrs,
+    variable,
+    bounds,
+    nlat,
+    nlon,
+    chunk_time,
+    complevel,
+    defect,
+    rng,
+):
+    """
+    Writes a single file of a dataset, with its defect if any
+    """
+    variable_id, standard_name, units, long_name, mean, spread = variable[3:]
+    if defect == "missing_attribute":
+        global_attrs.pop(_REQUIRED_ATTRS[rng.integers(len(_REQUIRED_ATTRS))])
+    elif defect == "attribute_mismatch":
+        # the attributes no longer match the file name and DRS path
+        global_attrs["experiment_id"] = "amip"
+        global_attrs["variable_id"] = "ts"
+    elif defect == "bad_units":
+        units = "degrees of " + units
+    elif defect == "time_gap":
+        # a time step is missing from the middle of the period
+        bounds = np.delete(bounds, len(bounds) // 2, axis=0)
+    time_steps = len(bounds)
+    times = bounds.mean(axis=1)
+    if defect == "bounds_violation":
+        times[time_steps // 2] = bounds[time_steps // 2, 1] + 1
+
+    with Dataset(path, "w", format="NETCDF4_CLASSIC") as nc:
+        nc.setncatts(global_attrs)
+        nc.createDimension("time", None)
+        nc.createDimension("lat", nlat)
+        nc.createDimension("lon", nlon)
+        nc.createDimension("bnds", 2)
+
+        time = nc.createVariable("time", "f8", ("time",))
+        time.setncatts(
+            {
+                "bounds": "time_bnds",
+                "units": f"days since {REFERENCE_YEAR}-01-01",
+                "calendar": "noleap",
+                "axis": "T",
+                "long_name": "time",
+                "standard_name": "time",
+            },
+        )
+        time[:] = times
+        nc.createVariable("time_bnds", "f8", ("time", "bnds"))[:] = bounds
+
+        for name, size, extent, std_name, axis_units, axis in (
+            ("lat", nlat, 180.0, "latitude", "degrees_north", "Y"),
+            ("lon", nlon, 360.0, "longitude", "degrees_east", "X"),
+        ):
+            edges = np.linspace(0, extent, size + 1) - (
+                extent / 2 if axis == "Y" else 0
+            )
+            coord = nc.createVariable(name, "f8", (name,))
+            coord.setncatts(
+                {
+                    "bounds": f"{name}_bnds",
+                    "units": axis_units,
+                    "axis": axis,
+                    "long_name": std_name,
+                    "standard_name": std_name,
+                },
+            )
+            coord[:] = (edges[:-1] + edges[1:]) / 2
+            coord_bnds = nc.createVariable(f"{name}_bnds", "f8", (name, "bnds"))
+            coord_bnds[:] = np.stack([edges[:-1], edges[1:]], axis=1)
+
+        chunk_kwargs = {"zlib": complevel > 0, "complevel": complevel or 4}
+        if chunk_time:
+            chunk_kwargs["chunksizes"] = (min(chunk_time, time_steps), nlat, nlon)
+        data = nc.createVariable(
+            variable_id,
+            "f4",
+            ("time", "lat", "lon"),
+            fill_value=np.float32(1e20),
+            **chunk_kwargs,
+        )
+        data.setncatts(
+            {
+                "standard_name": standard_name,
+                "long_name": long_name,
+                "units": units,
+                "cell_methods": "area: time: mean",
+                "missing_value": np.float32(1e20),
+            },
+        )
+        values = rng.standard_normal((time_steps, nlat, nlon), dtype="f4")
+        data[:] = mean + spread * values
@@ -1,5 +1,9 @@
 import os
+import re
 import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from importlib.resources import files
 from itertools import chain
 
@@ -7,6 +11,7 @@ import pytest
 from netCDF4 import Dataset
 
 from compliance_checker.cf import util
+from compliance_checker.protocols import resolver
 from compliance_checker.suite import CheckSuite
 
 datadir = files("compliance_checker").joinpath("tests/data").resolve()
@@ -113,3 +118,121 @@ def checksuite_setup():
     """For test_cli"""
     CheckSuite.checkers.clear()
     CheckSuite.load_all_available_checkers()
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """
+    Serves the files of the server's directory as application/x-netcdf,
+    answering range requests if the server's `ranges` is set.  Paths below
+    /dodsC/ are answered as by an OPeNDAP server.  The requests are recorded
+    in the server's `requests` as (method, path, client port) tuples, and
+    answered after the server's `delay`, as by a distant server, while
+    `max_active` records the most requests served at once.
+    """
+
+    # keeps connections alive
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send_headers(self, status, length, content_range=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-netcdf")
+        self.send_header("Content-Length", str(length))
+        if self.server.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.end_headers()
+
+    def _path(self):
+        return os.path.join(self.server.directory, self.path.split("?")[0].lstrip("/"))
+
+    def _handle_opendap(self):
+        if not self.path.startswith("/dodsC/"):
+            return False
+        body = b"Attributes {\n}\n" if self.path.endswith(".das") else b""
+        self.send_response(200 if body else 400)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("XDODS-Server", "opendap/3.7")
+        self.end_headers()
+        if self.command == "GET":
+            self.wfile.write(body)
+        return True
+
+    def _serve(self, handle):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.command, self.path, self.client_address[1]))
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            handle()
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def do_HEAD(self):
+        self._serve(self._head)
+
+    def do_GET(self):
+        self._serve(self._get)
+
+    def _head(self):
+        if self._handle_opendap():
+            return
+        if not os.path.isfile(self._path()):
+            self.send_error(404)
+            return
+        self._send_headers(200, os.path.getsize(self._path()))
+
+    def _get(self):
+        if self._handle_opendap():
+            return
+        if not os.path.isfile(self._path()):
+            self.send_error(404)
+            return
+        with open(self._path(), "rb") as f:
+            data = f.read()
+        match = re.match(r"bytes=(\d+)-(\d*)$", self.headers.get("Range", ""))
+        if self.server.ranges and match:
+            start = int(match[1])
+            end = min(int(match[2] or len(data) - 1), len(data) - 1)
+            body = data[start : end + 1]
+            self._send_headers(206, len(body), f"bytes {start}-{end}/{len(data)}")
+        else:
+            body = data
+            self._send_headers(200, len(body))
+        self.server.bytes_sent += len(body)
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            # the range probe closes the connection after the magic number
+            pass
+
+
+@pytest.fixture(params=[True, False], ids=["ranges", "no_ranges"])
+def http_server(request, tmp_path):
+    """
+    Local HTTP server of the files in tmp_path, with and without support
+    of range requests
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FileHandler)
+    server.directory = str(tmp_path)
+    server.ranges = request.param
+    server.bytes_sent = 0
+    server.requests = []
+    server.delay = 0
+    server.lock = threading.Lock()
+    server.active = 0
+    server.max_active = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # protocols cached for an earlier server on the same port
+    resolver.resolver.clear()
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -2,6 +2,7 @@
 """Tests for base compliance checker class"""
 
 import os
+import pickle
 
 from netCDF4 import Dataset
 
@@ -123,6 +124,29 @@ class TestBase:
             ]
         )
 
+    def test_compact_result(self):
+        ctx = base.TestCtx(base.BaseCheck.HIGH, "Compact", variable="temp")
+        ctx.assert_true(False, "temp is missing units")
+        result = base.fix_return_value(ctx.to_result(), "check_compact")
+        other = base.Result(base.BaseCheck.HIGH, (0, 1), "Compact")
+
+        assert result.value is other.value
+        assert result.children == ()
+        assert result.serialize() == {
+            "name": "Compact",
+            "weight": base.BaseCheck.HIGH,
+            "value": (0, 1),
+            "msgs": ["temp is missing units"],
+            "children": [],
+        }
+        unpickled = pickle.loads(pickle.dumps(result))
+        assert unpickled == result
+        assert unpickled.variable_name == "temp"
+
+        # checkers may still set attributes of their own
+        result.source = "third-party"
+        assert pickle.loads(pickle.dumps(result)).source == "third-party"
+
     def test_email_validation(self):
         test_attr_name = "test"
         validator = base.EmailValidator()
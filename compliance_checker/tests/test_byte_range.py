@@ -0,0 +1,88 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker.protocols import netcdf
+from compliance_checker.suite import CheckSuite
+
+
+def _url(http_server, name):
+    host, port = http_server.server_address[:2]
+    return f"http://{host}:{port}/CMIP6/{name}"
+
+
+@pytest.fixture
+def large_nc(tmp_path):
+    """
+    netCDF-4 file of about 8 MB, nearly all of it variable data
+    """
+    os.makedirs(tmp_path / "CMIP6")
+    path = tmp_path / "CMIP6" / "large.nc"
+    with Dataset(path, "w") as nc:
+        nc.title = "Byte range test"
+        nc.createDimension("time", 1000)
+        nc.createDimension("x", 1000)
+        var = nc.createVariable("data", "f8", ("time", "x"), chunksizes=(10, 1000))
+        var[:] = np.arange(1000 * 1000, dtype="f8").reshape(1000, 1000)
+    return path
+
+
+def test_open_remote_netcdf(http_server, large_nc):
+    url = _url(http_server, "large.nc")
+    assert netcdf.supports_byte_ranges(url) == http_server.ranges
+    http_server.bytes_sent = 0
+    with netcdf.open_remote_netcdf(url) as ds:
+        # the path of the URL either way, for the file name and DRS checks
+        assert ds.filepath() == "/CMIP6/large.nc"
+        assert ds.title == "Byte range test"
+        assert ds.variables["data"][999, 999] == 1000 * 1000 - 1
+        if http_server.ranges:
+            # the header and a single chunk
+            assert isinstance(ds, netcdf.ByteRangeDataset)
+            assert http_server.bytes_sent < os.path.getsize(large_nc) / 10
+        else:
+            assert http_server.bytes_sent >= os.path.getsize(large_nc)
+
+
+def test_spooled_download(http_server, large_nc, tmp_path, monkeypatch):
+    spool_dir = tmp_path / "spool"
+    spool_dir.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(spool_dir))
+    # URLs with a query are always downloaded
+    url = _url(http_server, "large.nc") + "?var=data"
+    with netcdf.open_remote_netcdf(url, spool_bytes=1024**2) as ds:
+        assert isinstance(ds, netcdf.SpooledDataset)
+        assert ds.filepath() == "/CMIP6/large.nc"
+        assert ds.variables["data"][999, 999] == 1000 * 1000 - 1
+        # a single temporary file, named after the file of the URL
+        (spooled,) = os.listdir(spool_dir)
+        assert spooled.endswith("_large.nc")
+    # removed once the dataset is closed
+    assert not os.listdir(spool_dir)
+
+    # the directories of the URL do not reach the temporary file
+    path = netcdf.spool_file("/../../CMIP6/large.nc")
+    assert os.path.dirname(path) == str(spool_dir)
+    os.remove(path)
+
+
+def test_not_netcdf(http_server, tmp_path):
+    os.makedirs(tmp_path / "CMIP6")
+    (tmp_path / "CMIP6" / "error.html").write_text("<html>Not found</html>")
+    url = _url(http_server, "error.html")
+    assert not netcdf.supports_byte_ranges(url)
+    with pytest.raises(OSError):
+        netcdf.open_remote_netcdf(url)
+
+
+def test_check_remote_dataset(http_server, large_nc):
+    CheckSuite.load_all_available_checkers()
+    cs = CheckSuite()
+    url = _url(http_server, "large.nc")
+    score_groups = cs.check_location(url, ["acdd"])
+    assert not score_groups["acdd"][1]
+    results = score_groups["acdd"][0]
+    assert results
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker.cache import ResultCache
+from compliance_checker.suite import CheckSuite
+
+
+@pytest.fixture
+def nc_path(tmp_path):
+    path = tmp_path / "example.nc"
+    with Dataset(path, "w") as nc:
+        nc.title = "Cache test"
+        nc.createDimension("time", 2)
+        nc.createVariable("time", "f8", ("time",))[:] = [0, 1]
+    return str(path)
+
+
+@pytest.fixture
+def cached_suite(tmp_path):
+    CheckSuite.load_all_available_checkers()
+    cs = CheckSuite(cache=ResultCache(str(tmp_path / "results.sqlite")))
+    yield cs
+    cs.cache.close()
+
+
+def _fail_load(ds_str):
+    raise AssertionError(f"{ds_str} should have been served from the cache")
+
+
+def test_cache_hit_skips_loading(cached_suite, nc_path):
+    first = cached_suite.check_location(nc_path, ["acdd"])
+    cached_suite.load_dataset = _fail_load
+    second = cached_suite.check_location(nc_path, ["acdd"])
+    assert first["acdd"][0] == second["acdd"][0]
+
+
+def test_cache_invalidation(cached_suite, nc_path):
+    cached_suite.check_location(nc_path, ["acdd"])
+    key = cached_suite.cache.make_key(cached_suite, nc_path, ["acdd"], None, None)
+    assert cached_suite.cache.get(key) is not None
+
+    # different checks requested
+    assert (
+        cached_suite.cache.make_key(
+            cached_suite,
+            nc_path,
+            ["acdd"],
+            None,
+            ["check_high"],
+        )[1]
+        != key[1]
+    )
+
+    # different checker options
+    cached_suite.options = {"acdd": {"some_option": "value"}}
+    assert (
+        cached_suite.cache.make_key(cached_suite, nc_path, ["acdd"], None, None)[1]
+        != key[1]
+    )
+    cached_suite.options = {}
+
+    # modified file
+    stat = os.stat(nc_path)
+    os.utime(nc_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    new_key = cached_suite.cache.make_key(cached_suite, nc_path, ["acdd"], None, None)
+    assert cached_suite.cache.get(new_key) is None
+
+
+def test_option_file_contents_in_key(cached_suite, nc_path, tmp_path):
+    config_path = tmp_path / "config.toml"
+    config_path.write_text("a = 1\n")
+    cached_suite.options = {"wcrp_cmip6": {"project_config_path": str(config_path)}}
+    key = cached_suite.cache.make_key(cached_suite, nc_path, ["acdd"], None, None)
+    config_path.write_text("a = 2\n")
+    assert (
+        cached_suite.cache.make_key(cached_suite, nc_path, ["acdd"], None, None) != key
+    )
+
+
+def test_remote_locations_not_cached(cached_suite):
+    assert (
+        cached_suite.cache.make_key(
+            cached_suite,
+            "https://example.com/data.nc",
+            ["acdd"],
+            None,
+            None,
+        )
+        is None
+    )
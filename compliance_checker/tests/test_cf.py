@@ -1416,7 +1416,7 @@ class TestCF1_6(BaseTestCase):
             # in time coordinate variable to test bad data handling
             # TEST CONFORMANCE 4.4.1 RECOMMENDED 4/4
             dataset.variables["time"][1:] = np.arange(-2, 497)
-            results = self.cf.check_calendar(dataset)
+            results = self.cf.check_calendar_crossover(dataset)
             scored, out_of, messages = get_results(results)
             assert messages[-1] == (
                 "Variable time has time values prior to "
@@ -1424,7 +1424,7 @@ class TestCF1_6(BaseTestCase):
                 "standard or Gregorian calendar"
             )
             dataset.variables["time"][:] = np.arange(0, 500)
-            results = self.cf.check_calendar(dataset)
+            results = self.cf.check_calendar_crossover(dataset)
             scored, out_of, messages = get_results(results)
             assert messages[-1] == (
                 "Variable time has standard or Gregorian "
@@ -3524,7 +3524,7 @@ class TestCF1_9(BaseTestCase):
         # TEST CONFORMANCE 4.4.1
         dataset = MockTimeSeries()
         dataset.variables["time"].units = "months since 0-1-1 23:00:60"
-        results = self.cf.check_calendar(dataset)
+        results = self.cf.check_calendar_crossover(dataset)
         scored, out_of, messages = get_results(results)
 
         # test greater than or equal to one zero year for Julian and Gregorian
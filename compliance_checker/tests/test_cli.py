@@ -8,26 +8,92 @@ import io
 import json
 import os
 import platform
+import signal
 import subprocess
 import sys
+import tempfile
+import time
 from argparse import Namespace
 from collections import defaultdict
 from importlib.machinery import SourceFileLoader
 
 import pytest
+from netCDF4 import Dataset
 
+from compliance_checker import runner
+from compliance_checker.base import BaseCheck, BaseNCCheck, Result
+from compliance_checker.protocols import resolver
 from compliance_checker.runner import CheckSuite, ComplianceChecker
 
 from .conftest import datadir, static_files
 
 on_windows = platform.system() == "Windows"
 
+
 if on_windows:
     ncconfig = ["sh", f"{os.environ['CONDA_PREFIX']}\\Library\\bin\\nc-config"]
 else:
     ncconfig = ["nc-config"]
 
 
+def _write_small_datasets(tmpdir, count):
+    """
+    Writes `count` minimal netCDF files to tmpdir and returns their paths
+    """
+    ds_locs = []
+    for i in range(count):
+        nc_path = os.path.join(tmpdir, f"dataset_{i}.nc")
+        with Dataset(nc_path, "w") as nc:
+            nc.title = f"Dataset {i}"
+            nc.createDimension("time", 3)
+            nc.createVariable("time", "f8", ("time",))[:] = [0, 1, 2]
+        ds_locs.append(nc_path)
+    return ds_locs
+
+
+class StuckCheck(BaseNCCheck, BaseCheck):
+    """
+    Checker whose check cannot be interrupted on the first dataset written
+    by _write_small_datasets, like a check blocked in C code
+    """
+
+    _cc_spec = "stuck"
+    _cc_spec_version = "1.0"
+    stuck_title = "Dataset 0"
+    # seconds taken by the check on the other datasets
+    check_seconds = 0
+
+    def check_stuck(self, ds):
+        # the titles of the datasets checked, across worker processes
+        log = os.environ.get("STUCK_CHECK_LOG")
+        if log:
+            with open(log, "a") as f:
+                f.write(f"{ds.title}\n")
+        if ds.title == self.stuck_title:
+            signal.signal(signal.SIGALRM, signal.SIG_IGN)
+            time.sleep(60)
+        time.sleep(self.check_seconds)
+        return Result(BaseCheck.HIGH, True, "stuck")
+
+
+class StuckMiddleCheck(StuckCheck):
+    """
+    StuckCheck blocked on the second dataset written by _write_small_datasets
+    """
+
+    _cc_spec = "stuck_middle"
+    stuck_title = "Dataset 1"
+
+
+class SlowStuckCheck(StuckCheck):
+    """
+    StuckCheck whose check takes a while on the other datasets
+    """
+
+    _cc_spec = "stuck_slow"
+    check_seconds = 0.6
+
+
 @pytest.mark.usefixtures("checksuite_setup")
 class TestCLI:
     """
@@ -119,6 +185,70 @@ class TestCLI:
             sys.stdout = saved
             fake_stdout.close()
 
+    def test_lazy_checker_loading(self, monkeypatch):
+        """
+        Tests that checkers are listed from their entry point metadata and
+        that only the selected checkers are imported
+        """
+        loaded = []
+
+        def mock_entry_point(name, spec, version):
+            def load():
+                loaded.append(name)
+                return Namespace(_cc_spec=spec, _cc_spec_version=version)
+
+            return Namespace(name=name, load=load, dist=Namespace(version="9.9"))
+
+        eps = [
+            mock_entry_point("checker_a-1.0", "checker_a", "1.0"),
+            mock_entry_point("checker_a-1.1", "checker_a", "1.1"),
+            mock_entry_point("checker_b", "checker_b", "2.0"),
+        ]
+        monkeypatch.setattr(CheckSuite, "checkers", {})
+        monkeypatch.setattr(CheckSuite, "_loaded_entry_points", set())
+        monkeypatch.setattr(
+            CheckSuite,
+            "checker_entry_points",
+            {"checker_a": eps[:2], "checker_b": eps[2:]},
+        )
+
+        cs = CheckSuite()
+        fake_stdout = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", fake_stdout)
+        cs._print_suites()
+        assert fake_stdout.getvalue() == (
+            " - checker_a:1.0\n - checker_a:1.1\n - checker_b:2.0\n"
+        )
+        # only checkers without a version in their entry point name are
+        # imported to be listed
+        assert loaded == ["checker_b"]
+        # and the others with the default checker version, rather than the
+        # version of the distribution registering them
+        fake_stdout = io.StringIO()
+        monkeypatch.setattr(sys, "stdout", fake_stdout)
+        cs._print_suites(verbose=1)
+        assert (
+            f" - checker_a:1.0 (v{BaseCheck._cc_checker_version})\n"
+            in fake_stdout.getvalue()
+        )
+
+        cs.load_checkers(["checker_a"])
+        assert loaded == ["checker_b", "checker_a-1.0", "checker_a-1.1"]
+        assert CheckSuite.checkers["checker_a"]._cc_spec_version == "1.1"
+        # already loaded checkers are not imported again
+        cs.load_checkers(["checker_a:1.0", "checker_b"])
+        assert loaded == ["checker_b", "checker_a-1.0", "checker_a-1.1"]
+        assert "checker_b:2.0" in CheckSuite.checkers
+
+    def test_reload_all_checkers(self, monkeypatch):
+        """
+        Tests that all checkers are loaded again once the checkers dict was
+        cleared, as by the checksuite_setup fixture
+        """
+        monkeypatch.setattr(CheckSuite, "checkers", {})
+        CheckSuite.load_all_available_checkers()
+        assert "acdd" in CheckSuite.checkers
+
     def test_multiple_json_output(self, tmp_txt_file):
         """
         Tests that a suite can produce JSON output to a file
@@ -227,6 +357,205 @@ class TestCLI:
         )
         assert not return_value
 
+    def test_parallel_jobs_json_new_output(self, tmpdir):
+        """
+        Tests that checking datasets over a process pool gives the same
+        results, in the same order, as checking them serially
+        """
+        ds_locs = _write_small_datasets(tmpdir, 3)
+
+        outputs = []
+        for jobs in (1, 2):
+            output_filename = os.path.join(tmpdir, f"output_{jobs}.json")
+            return_value, errors = ComplianceChecker.run_checker(
+                ds_loc=ds_locs,
+                verbose=0,
+                criteria="strict",
+                checker_names=["acdd"],
+                output_filename=output_filename,
+                output_format="json_new",
+                jobs=jobs,
+            )
+            assert not errors
+            with open(output_filename) as f:
+                r = json.load(f)
+            for checks in r.values():
+                checks["acdd"].pop("report_timestamp")
+            outputs.append(r)
+
+        assert list(outputs[1]) == ds_locs
+        assert outputs[0] == outputs[1]
+
+    @pytest.mark.skipif(on_windows, reason="time budgets use SIGALRM")
+    def test_parallel_stuck_worker_replaced(self, tmpdir, monkeypatch):
+        """
+        Tests that a pool worker which does not return within the dataset
+        time budget is replaced and the other datasets are still checked
+        """
+        monkeypatch.setitem(CheckSuite.checkers, "stuck", StuckCheck)
+        monkeypatch.setitem(CheckSuite.checkers, "stuck:1.0", StuckCheck)
+        monkeypatch.setattr(runner, "DATASET_TIMEOUT_GRACE", 0.5)
+        ds_locs = _write_small_datasets(tmpdir, 3)
+        output_filename = os.path.join(tmpdir, "output.jsonl")
+        start = time.monotonic()
+        return_value, errors = ComplianceChecker.run_checker(
+            ds_loc=ds_locs,
+            verbose=0,
+            criteria="strict",
+            checker_names=["stuck"],
+            output_filename=output_filename,
+            output_format="jsonl",
+            options={"dataset_timeout": 0.5},
+            jobs=2,
+        )
+        assert time.monotonic() - start < 30
+        assert errors
+        with open(output_filename) as f:
+            lines = [json.loads(line) for line in f]
+        assert [next(iter(line)) for line in lines] == ds_locs
+        assert lines[0][ds_locs[0]]["stuck"]["possible_points"] == 0
+        assert lines[1][ds_locs[1]]["stuck"]["scored_points"] == 1
+
+    @pytest.mark.skipif(on_windows, reason="time budgets use SIGALRM")
+    def test_parallel_stuck_worker_fails(self, tmpdir, monkeypatch):
+        """
+        Tests that a dataset whose worker was stopped fails the run, even
+        when the datasets checked after it pass, so that cchecker exits with
+        a non-zero status
+        """
+        monkeypatch.setitem(CheckSuite.checkers, "stuck_middle", StuckMiddleCheck)
+        monkeypatch.setitem(CheckSuite.checkers, "stuck_middle:1.0", StuckMiddleCheck)
+        monkeypatch.setattr(runner, "DATASET_TIMEOUT_GRACE", 0.5)
+        ds_locs = _write_small_datasets(tmpdir, 3)
+        output_filename = os.path.join(tmpdir, "output.json")
+        return_value, errors = ComplianceChecker.run_checker(
+            ds_loc=ds_locs,
+            verbose=0,
+            criteria="strict",
+            checker_names=["stuck_middle"],
+            output_filename=output_filename,
+            output_format="json_new",
+            options={"check_timeout": 0.5},
+            jobs=2,
+        )
+        assert not return_value
+        assert errors
+        with open(output_filename) as f:
+            r = json.load(f)
+        assert list(r) == ds_locs
+        assert r[ds_locs[1]]["stuck_middle"]["possible_points"] == 0
+        assert r[ds_locs[2]]["stuck_middle"]["scored_points"] == 1
+
+    @pytest.mark.skipif(on_windows, reason="time budgets use SIGALRM")
+    def test_parallel_stuck_worker_replaced_alone(self, tmpdir, monkeypatch):
+        """
+        Tests that only the stuck worker is replaced, so that the datasets
+        checked by the other workers are not checked again
+        """
+        monkeypatch.setitem(CheckSuite.checkers, "stuck_slow", SlowStuckCheck)
+        monkeypatch.setitem(CheckSuite.checkers, "stuck_slow:1.0", SlowStuckCheck)
+        monkeypatch.setattr(runner, "DATASET_TIMEOUT_GRACE", 0.5)
+        log = os.path.join(tmpdir, "checked.txt")
+        monkeypatch.setenv("STUCK_CHECK_LOG", log)
+        ds_locs = _write_small_datasets(tmpdir, 4)
+        output_filename = os.path.join(tmpdir, "output.json")
+        return_value, errors = ComplianceChecker.run_checker(
+            ds_loc=ds_locs,
+            verbose=0,
+            criteria="strict",
+            checker_names=["stuck_slow"],
+            output_filename=output_filename,
+            output_format="json_new",
+            options={"dataset_timeout": 1.0},
+            jobs=2,
+        )
+        with open(output_filename) as f:
+            r = json.load(f)
+        assert r[ds_locs[0]]["stuck_slow"]["possible_points"] == 0
+        for ds_loc in ds_locs[1:]:
+            assert r[ds_loc]["stuck_slow"]["scored_points"] == 1
+        with open(log) as f:
+            checked = f.read().splitlines()
+        assert sorted(checked) == [f"Dataset {i}" for i in range(4)]
+
+    @pytest.mark.skipif(on_windows, reason="time budgets use SIGALRM")
+    def test_parallel_stuck_worker_refetch(self, tmp_path, http_server, monkeypatch):
+        """
+        Tests that the prefetched datasets queued on a stuck worker are
+        fetched again for its replacement, and their downloads removed
+        """
+        monkeypatch.setitem(CheckSuite.checkers, "stuck_slow", SlowStuckCheck)
+        monkeypatch.setitem(CheckSuite.checkers, "stuck_slow:1.0", SlowStuckCheck)
+        monkeypatch.setattr(runner, "DATASET_TIMEOUT_GRACE", 0.5)
+        spool = tmp_path / "spool"
+        spool.mkdir()
+        monkeypatch.setattr(tempfile, "tempdir", str(spool))
+        base = "http://{}:{}".format(*http_server.server_address[:2])
+        ds_locs = [
+            f"{base}/{os.path.basename(path)}"
+            for path in _write_small_datasets(tmp_path, 4)
+        ]
+        # probed once beforehand, so that only downloads are requested
+        resolver.resolve(ds_locs[0])
+        http_server.requests.clear()
+        output_filename = os.path.join(tmp_path, "output.json")
+        ComplianceChecker.run_checker(
+            ds_loc=ds_locs,
+            verbose=0,
+            criteria="strict",
+            checker_names=["stuck_slow"],
+            output_filename=output_filename,
+            output_format="json_new",
+            options={"dataset_timeout": 1.0},
+            jobs=2,
+            prefetch=4,
+        )
+        with open(output_filename) as f:
+            r = json.load(f)
+        assert r[ds_locs[0]]["stuck_slow"]["possible_points"] == 0
+        for ds_loc in ds_locs[1:]:
+            assert r[ds_loc]["stuck_slow"]["scored_points"] == 1
+        assert not os.listdir(spool)
+        if not http_server.ranges:
+            paths = [path for _, path, _ in http_server.requests]
+            # the third dataset was queued behind the stuck one
+            assert paths.count("/dataset_2.nc") == 2
+            assert paths.count("/dataset_3.nc") == 1
+
+    def test_jsonl_streaming_output(self, tmpdir):
+        """
+        Tests that the 'jsonl' format writes one line per dataset, each
+        matching the corresponding 'json_new' dataset entry
+        """
+        ds_locs = _write_small_datasets(tmpdir, 3)
+        jsonl_filename = os.path.join(tmpdir, "output.jsonl")
+        json_filename = os.path.join(tmpdir, "output.json")
+        for output_filename, output_format in (
+            (jsonl_filename, "jsonl"),
+            (json_filename, "json_new"),
+        ):
+            return_value, errors = ComplianceChecker.run_checker(
+                ds_loc=ds_locs,
+                verbose=0,
+                criteria="strict",
+                checker_names=["acdd"],
+                output_filename=output_filename,
+                output_format=output_format,
+            )
+            assert not return_value
+
+        with open(json_filename) as f:
+            json_new = json.load(f)
+        with open(jsonl_filename) as f:
+            lines = [json.loads(line) for line in f]
+
+        assert [next(iter(line)) for line in lines] == ds_locs
+        for line in lines:
+            for ds, checks in line.items():
+                checks["acdd"].pop("report_timestamp")
+                json_new[ds]["acdd"].pop("report_timestamp")
+                assert checks == json_new[ds]
+
     def _check_libnetcdf_version():
         return (
             float(
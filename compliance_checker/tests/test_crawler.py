@@ -0,0 +1,163 @@
+import os
+import pickle
+
+import pytest
+
+from compliance_checker.crawler import (
+    ManifestEntry,
+    expand_locations,
+    iter_datasets,
+    iter_manifest,
+    iter_manifest_file,
+    parse_manifest_line,
+)
+
+
+@pytest.fixture
+def drs_tree(tmp_path):
+    """
+    Builds a small DRS-like directory tree:
+
+        CMIP6/CMIP/IPSL/v1/a.nc
+        CMIP6/CMIP/IPSL/v1/b.nc
+        CMIP6/CMIP/IPSL/v1/notes.txt
+        CMIP6/CMIP/IPSL/v1/noext     (HDF5 magic bytes, no extension)
+        CMIP6/ScenarioMIP/c.nc
+        CMIP6/top.nc
+    """
+    v1 = tmp_path / "CMIP6" / "CMIP" / "IPSL" / "v1"
+    v1.mkdir(parents=True)
+    scen = tmp_path / "CMIP6" / "ScenarioMIP"
+    scen.mkdir(parents=True)
+    for path in (
+        v1 / "a.nc",
+        v1 / "b.nc",
+        scen / "c.nc",
+        tmp_path / "CMIP6" / "top.nc",
+    ):
+        path.write_bytes(b"CDF\x01")
+    (v1 / "notes.txt").write_text("not a dataset")
+    (v1 / "noext").write_bytes(b"\x89HDF\r\n")
+    return tmp_path / "CMIP6"
+
+
+def _rel(paths, root):
+    return [os.path.relpath(p, root) for p in paths]
+
+
+def test_iter_datasets_extension(drs_tree):
+    found = iter_datasets(drs_tree)
+    # lazily evaluated
+    assert not isinstance(found, list)
+    assert _rel(found, drs_tree) == [
+        "top.nc",
+        os.path.join("CMIP", "IPSL", "v1", "a.nc"),
+        os.path.join("CMIP", "IPSL", "v1", "b.nc"),
+        os.path.join("ScenarioMIP", "c.nc"),
+    ]
+
+
+def test_iter_datasets_max_depth(drs_tree):
+    assert _rel(iter_datasets(drs_tree, max_depth=0), drs_tree) == ["top.nc"]
+    assert _rel(iter_datasets(drs_tree, max_depth=1), drs_tree) == [
+        "top.nc",
+        os.path.join("ScenarioMIP", "c.nc"),
+    ]
+
+
+def test_iter_datasets_include_exclude(drs_tree):
+    assert _rel(iter_datasets(drs_tree, include=["a.*"]), drs_tree) == [
+        os.path.join("CMIP", "IPSL", "v1", "a.nc"),
+    ]
+    # excluded directories are pruned
+    assert _rel(iter_datasets(drs_tree, exclude=["CMIP"]), drs_tree) == [
+        "top.nc",
+        os.path.join("ScenarioMIP", "c.nc"),
+    ]
+
+
+def test_iter_datasets_match_magic(drs_tree):
+    found = _rel(iter_datasets(drs_tree, match_magic=True), drs_tree)
+    assert os.path.join("CMIP", "IPSL", "v1", "noext") in found
+    assert os.path.join("CMIP", "IPSL", "v1", "notes.txt") not in found
+
+
+def test_expand_locations(drs_tree):
+    url = "https://example.com/data.nc"
+    locations = list(
+        expand_locations([str(drs_tree / "ScenarioMIP"), url], max_depth=0),
+    )
+    assert locations == [str(drs_tree / "ScenarioMIP" / "c.nc"), url]
+
+
+def test_parse_manifest_line():
+    assert parse_manifest_line("   \n", 1) is None
+    assert parse_manifest_line("# a comment\n", 2) is None
+
+    entry = parse_manifest_line(" /data/tas.nc\n", 3)
+    assert entry == "/data/tas.nc"
+    assert entry.line_number == 3
+    assert entry.dataset_id is None
+
+    entry = parse_manifest_line(
+        "CMIP6.CMIP.IPSL#20180803 | /data/tas.nc | 2048 | mod_time=1533290000.0"
+        " | checksum=abc123 | checksum_type=SHA256\n",
+        4,
+    )
+    assert entry == "/data/tas.nc"
+    assert entry.line_number == 4
+    assert entry.dataset_id == "CMIP6.CMIP.IPSL#20180803"
+    assert entry.size == 2048
+    assert entry.checksum == "abc123"
+    assert entry.checksum_type == "SHA256"
+
+    with pytest.raises(ValueError, match="Line 5"):
+        parse_manifest_line("CMIP6.CMIP.IPSL#20180803 |  | 2048", 5)
+    with pytest.raises(ValueError, match="Line 6"):
+        parse_manifest_line("CMIP6.CMIP.IPSL#20180803 | /data/tas.nc | big", 6)
+
+
+def test_iter_manifest_lazy():
+    def lines():
+        yield "# header\n"
+        yield "a.nc\n"
+        yield "\n"
+        yield "b.nc\n"
+        raise AssertionError("read past the requested entries")
+
+    entries = iter_manifest(lines())
+    assert (next(entries), next(entries)) == ("a.nc", "b.nc")
+    assert [e.line_number for e in iter_manifest(["a.nc", "", "b.nc"])] == [1, 3]
+
+
+def test_iter_manifest_file(tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("a.nc\nds#1 | b.nc | 10\n")
+    entries = list(iter_manifest_file(str(manifest)))
+    assert entries == ["a.nc", "b.nc"]
+    assert entries[1].size == 10
+    assert [e.manifest for e in entries] == [str(manifest), str(manifest)]
+
+    # the manifest is only opened once iterated
+    iter_manifest_file(str(tmp_path / "missing.txt"))
+
+
+def test_manifest_entry_pickle():
+    entry = ManifestEntry(
+        "tas.nc",
+        7,
+        dataset_id="ds#1",
+        size=10,
+        checksum="abc",
+        manifest="list.txt",
+    )
+    copy = pickle.loads(pickle.dumps(entry))
+    assert copy == entry
+    assert isinstance(copy, ManifestEntry)
+    assert (
+        copy.manifest,
+        copy.line_number,
+        copy.dataset_id,
+        copy.size,
+        copy.checksum,
+    ) == ("list.txt", 7, "ds#1", 10, "abc")
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker.base import GenericFile
+from compliance_checker.dataset_index import (
+    get_global_attrs,
+    get_index,
+    get_variable_attrs,
+    get_variables_by_attributes,
+    indexed,
+)
+
+
+@pytest.fixture
+def nc(tmp_path):
+    ds = Dataset(tmp_path / "example.nc", "w")
+    ds.title = "Index test"
+    ds.createDimension("time", None)
+    ds.createDimension("station", 2)
+    time = ds.createVariable("time", "f8", ("time",))
+    time.setncatts(
+        {"standard_name": "time", "axis": "T", "units": "days since 2000-01-01"}
+    )
+    time[:] = [0, 1, 2]
+    temp = ds.createVariable("temp", "f4", ("time", "station"))
+    temp.setncatts({"units": "K", "valid_range": np.array([200, 320], "f4")})
+    station = ds.createVariable("station_name", str, ("station",))
+    station.cf_role = "timeseries_id"
+    yield ds
+    ds.close()
+
+
+def test_snapshot(nc):
+    with indexed(nc) as index:
+        assert get_index(nc) is index
+        assert index.global_attrs == {"title": "Index test"}
+        assert index.dimensions == {"time": (3, True), "station": (2, False)}
+        assert index.variables["temp"].dimensions == ("time", "station")
+        assert index.variables["temp"].shape == (3, 2)
+        assert index.variables["temp"].dtype == np.dtype("f4")
+        assert index.variables["station_name"].dtype is str
+        assert index.get_attr("time", "axis") == "T"
+        assert index.get_attr(None, "title") == "Index test"
+        assert index.get_attr("temp", "missing", "default") == "default"
+    assert get_index(nc) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        {"standard_name": "time"},
+        {"units": "K"},
+        {"units": lambda u: u is not None},
+        {"units": lambda u: isinstance(u, str), "axis": "T"},
+        {"cf_role": lambda r: r is not None},
+        # truthy values other than True don't select a variable in netCDF4
+        {"units": lambda u: u},
+        {"missing": lambda v: v is None},
+        {"valid_range": lambda r: r is not None and len(r) == 2},
+    ],
+)
+def test_get_variables_by_attributes(nc, query):
+    expected = [v.name for v in nc.get_variables_by_attributes(**query)]
+    with indexed(nc):
+        found = get_variables_by_attributes(nc, **query)
+    assert [v.name for v in found] == expected
+    assert all(v is nc.variables[v.name] for v in found)
+
+
+def test_fallback_without_index(nc):
+    assert get_index(nc) is None
+    assert [v.name for v in get_variables_by_attributes(nc, axis="T")] == ["time"]
+    assert get_global_attrs(nc) == {"title": "Index test"}
+    assert get_variable_attrs(nc, "station_name") == {"cf_role": "timeseries_id"}
+    with pytest.raises(KeyError):
+        get_variable_attrs(nc, "missing")
+
+
+def test_other_datasets_not_indexed(tmp_path):
+    path = tmp_path / "example.txt"
+    path.write_text("not netCDF")
+    ds = GenericFile(str(path))
+    with indexed(ds) as index:
+        assert index is None
+        assert get_index(ds) is None
+
+
+def test_nested_indexed_keeps_index(nc):
+    with indexed(nc) as outer:
+        with indexed(nc) as inner:
+            assert inner is outer
+        assert get_index(nc) is outer
+    assert get_index(nc) is None
@@ -0,0 +1,107 @@
+import json
+from importlib.resources import files
+
+import pytest
+
+from compliance_checker.journal import CheckJournal
+from compliance_checker.runner import ComplianceChecker
+from compliance_checker.suite import CheckSuite
+
+DATA = files("compliance_checker") / "tests/data"
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = CheckJournal(str(tmp_path / "journal.sqlite"))
+    yield journal
+    journal.close()
+
+
+def _check(checked):
+    def check(locs):
+        for loc in locs:
+            checked.append(loc)
+            yield loc, {"acdd": ([], {loc: "error"})}, {}
+
+    return check
+
+
+def test_resume_order(journal):
+    CheckSuite.load_all_available_checkers()
+    cs = CheckSuite()
+    checked = []
+    first = list(
+        journal.resume(cs, ["a", "b", "c"], ["acdd"], None, None, _check(checked))
+    )
+    assert checked == ["a", "b", "c"]
+
+    # recorded locations are replayed in input order around the others
+    checked.clear()
+    second = list(
+        journal.resume(
+            cs, ["x", "a", "b", "y", "c", "z"], ["acdd"], None, None, _check(checked)
+        ),
+    )
+    assert checked == ["x", "y", "z"]
+    assert [loc for loc, _, _ in second] == ["x", "a", "b", "y", "c", "z"]
+    assert [result for result in second if result[0] in "abc"] == first
+
+    # recorded results are replayed before the next location is checked
+    checked.clear()
+    resumed = journal.resume(
+        cs, ["a", "b", "w", "c"], ["acdd"], None, None, _check(checked)
+    )
+    assert [next(resumed)[0], next(resumed)[0]] == ["a", "b"]
+    assert checked == []
+    assert [loc for loc, _, _ in resumed] == ["w", "c"]
+    assert checked == ["w"]
+
+    # other checks or a cleared journal check everything again
+    checked.clear()
+    list(
+        journal.resume(cs, ["a", "b"], ["acdd"], None, ["check_high"], _check(checked))
+    )
+    assert checked == ["a", "b"]
+    journal.clear()
+    checked.clear()
+    list(journal.resume(cs, ["a", "b"], ["acdd"], None, None, _check(checked)))
+    assert checked == ["a", "b"]
+
+
+def test_run_checker_resume(tmp_path, journal, monkeypatch):
+    CheckSuite.load_all_available_checkers()
+    locs = [
+        str(DATA / name)
+        for name in ("bad_region.nc", "bad_data_type.nc", "bad_units.nc")
+    ]
+    checked = []
+    check_location = CheckSuite.check_location
+
+    def counting_check_location(self, ds_loc, *args, **kwargs):
+        checked.append(ds_loc)
+        return check_location(self, ds_loc, *args, **kwargs)
+
+    monkeypatch.setattr(CheckSuite, "check_location", counting_check_location)
+
+    def run(locs, name, journal=None):
+        output = tmp_path / name
+        result = ComplianceChecker.run_checker(
+            locs,
+            ["acdd"],
+            0,
+            "normal",
+            output_filename=str(output),
+            output_format="json_new",
+            journal=journal,
+        )
+        results = json.loads(output.read_text())
+        for checks in results.values():
+            checks["acdd"].pop("report_timestamp")
+        return result, results
+
+    expected = run(locs, "full.json")
+    # a run interrupted after the first two datasets
+    run(locs[:2], "interrupted.json", journal)
+    checked.clear()
+    assert run(locs, "resumed.json", journal) == expected
+    assert checked == locs[2:]
@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+import time
+from importlib.resources import files
+
+import pytest
+
+from compliance_checker import prefetch
+from compliance_checker.prefetch import Prefetched, iter_prefetched, prefetch_location
+from compliance_checker.protocols import netcdf
+from compliance_checker.protocols.resolver import NETCDF, Protocol
+from compliance_checker.runner import ComplianceChecker
+from compliance_checker.suite import CheckSuite
+
+DATA = files("compliance_checker") / "tests/data"
+
+
+def test_iter_prefetched_order_and_depth():
+    consumed = []
+    fetched = []
+
+    def locations():
+        for i in range(6):
+            consumed.append(i)
+            yield i
+
+    def fetch(location):
+        fetched.append(threading.current_thread().name)
+        return location * 10
+
+    prefetched = iter_prefetched(locations(), 2, fetch)
+    assert next(prefetched) == (0, 0)
+    # the location yielded and two more are in flight
+    assert consumed == [0, 1, 2]
+    assert list(prefetched) == [(i, i * 10) for i in range(1, 6)]
+    assert all(name.startswith("prefetch") for name in fetched)
+
+
+def test_iter_prefetched_errors_and_disabled():
+    def fetch(location):
+        if location == "bad":
+            raise OSError("unreachable")
+        return location
+
+    assert list(iter_prefetched(["a", "bad", "c"], 1, fetch)) == [
+        ("a", "a"),
+        ("bad", None),
+        ("c", "c"),
+    ]
+    assert list(iter_prefetched(["a", "b"], 0, fetch)) == [("a", None), ("b", None)]
+
+
+def test_iter_prefetched_host_limit():
+    lock = threading.Lock()
+    active = {}
+    max_active = {}
+
+    def fetch(location):
+        host = location.split("/")[2] if "://" in location else ""
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            max_active[host] = max(max_active.get(host, 0), active[host])
+        time.sleep(0.05)
+        with lock:
+            active[host] -= 1
+        return location
+
+    locations = [
+        f"https://{host}/thredds/fileServer/{i}.nc"
+        for i in range(4)
+        for host in ("a", "b")
+    ] + [f"/data/{i}.nc" for i in range(4)]
+    prefetched = list(iter_prefetched(locations, 8, fetch, host_limit=2))
+    assert prefetched == [(location, location) for location in locations]
+    assert max_active["a"] == max_active["b"] == 2
+    # local files are not limited
+    assert max_active[""] > 2
+
+
+def test_iter_prefetched_host_limit_no_blocking():
+    started = {}
+    finished = {}
+
+    def fetch(location):
+        started[location] = time.monotonic()
+        if location.startswith("https://a/"):
+            time.sleep(0.2)
+        finished[location] = time.monotonic()
+        return location
+
+    locations = ["https://a/0.nc", "https://a/1.nc", "https://b/0.nc"]
+    prefetched = list(iter_prefetched(locations, 2, fetch, host_limit=1))
+    assert prefetched == [(location, location) for location in locations]
+    # the second location of host a waits for the first one without
+    # holding up host b
+    assert started["https://b/0.nc"] < finished["https://a/0.nc"]
+    assert started["https://a/1.nc"] >= finished["https://a/0.nc"]
+
+
+def test_prefetch_local(tmp_path):
+    path = str(DATA / "bad_region.nc")
+    assert prefetch_location(path) == Prefetched(path, None)
+    # errors are left to loading the dataset
+    missing = str(tmp_path / "missing.nc")
+    assert prefetch_location(missing) == Prefetched(missing, None)
+    assert prefetch_location(str(tmp_path)) == Prefetched(str(tmp_path), None)
+
+
+def test_prefetch_remote(http_server, tmp_path, monkeypatch):
+    os.makedirs(tmp_path / "thredds" / "fileServer")
+    content = (DATA / "bad_region.nc").read_bytes()
+    (tmp_path / "thredds" / "fileServer" / "bad_region.nc").write_bytes(content)
+    url = "http://{}:{}/thredds/fileServer/bad_region.nc".format(
+        *http_server.server_address[:2],
+    )
+
+    # files read with range requests are left to the main thread
+    monkeypatch.setattr(
+        prefetch.resolver, "resolve", lambda url: Protocol(NETCDF, True)
+    )
+    assert prefetch_location(url) == Prefetched(url, None, Protocol(NETCDF, True))
+    assert not http_server.requests
+    monkeypatch.setattr(
+        prefetch.resolver, "resolve", lambda url: Protocol(NETCDF, False)
+    )
+    prefetched = prefetch_location(url)
+    assert prefetched.download.url_path == "/thredds/fileServer/bad_region.nc"
+    assert prefetched.download.content == content
+
+    # loading the prefetched dataset makes no further request
+    requests = len(http_server.requests)
+    ds = CheckSuite().load_dataset(url, prefetched)
+    try:
+        assert "time" in ds.variables
+        assert ds.filepath() == "/thredds/fileServer/bad_region.nc"
+    finally:
+        ds.close()
+    assert len(http_server.requests) == requests
+
+
+def test_prefetch_spooled(http_server, tmp_path, monkeypatch):
+    os.makedirs(tmp_path / "thredds" / "fileServer")
+    (tmp_path / "thredds" / "fileServer" / "bad_region.nc").write_bytes(
+        (DATA / "bad_region.nc").read_bytes(),
+    )
+    url = "http://{}:{}/thredds/fileServer/bad_region.nc".format(
+        *http_server.server_address[:2],
+    )
+    monkeypatch.setattr(
+        prefetch.resolver, "resolve", lambda url: Protocol(NETCDF, False)
+    )
+    # larger files are spooled to a temporary file, as without prefetching
+    prefetched = prefetch_location(url, spool_bytes=1024)
+    assert prefetched.download.content is None
+    ds = CheckSuite().load_dataset(url, prefetched)
+    try:
+        assert isinstance(ds, netcdf.SpooledDataset)
+    finally:
+        ds.close()
+    assert not os.path.exists(prefetched.download.path)
+
+    # prefetched files which are not loaded are removed too
+    prefetched = prefetch_location(url, spool_bytes=1024)
+    prefetch.discard(prefetched)
+    assert not os.path.exists(prefetched.download.path)
+
+
+@pytest.mark.parametrize("depth", [1, 3])
+def test_run_checker_prefetch(tmp_path, depth):
+    locs = [
+        str(DATA / name)
+        for name in ("bad_region.nc", "bad_data_type.nc", "bad_units.nc")
+    ]
+    CheckSuite.load_all_available_checkers()
+    outputs = []
+    for prefetch_depth in (0, depth):
+        output = tmp_path / f"prefetch_{prefetch_depth}.json"
+        ComplianceChecker.run_checker(
+            locs,
+            ["acdd"],
+            0,
+            "normal",
+            output_filename=str(output),
+            output_format="json_new",
+            prefetch=prefetch_depth,
+        )
+        results = json.loads(output.read_text())
+        for checks in results.values():
+            checks["acdd"].pop("report_timestamp")
+        outputs.append(results)
+    assert list(outputs[1]) == locs
+    assert outputs[0] == outputs[1]
+
+
+def test_run_checker_remote(http_server, tmp_path):
+    os.makedirs(tmp_path / "thredds" / "fileServer")
+    base = "http://{}:{}/thredds/fileServer".format(*http_server.server_address[:2])
+    locs = []
+    for i in range(6):
+        (tmp_path / "thredds" / "fileServer" / f"{i}.nc").write_bytes(
+            (DATA / "bad_region.nc").read_bytes(),
+        )
+        locs.append(f"{base}/{i}.nc")
+    http_server.delay = 0.1
+    CheckSuite.load_all_available_checkers()
+
+    outputs = []
+    for jobs, prefetch_depth in ((1, 0), (2, 4)):
+        output = tmp_path / f"remote_{jobs}.json"
+        ComplianceChecker.run_checker(
+            locs,
+            ["acdd"],
+            0,
+            "normal",
+            output_filename=str(output),
+            output_format="json_new",
+            jobs=jobs,
+            prefetch=prefetch_depth,
+            host_limit=2,
+        )
+        results = json.loads(output.read_text())
+        for checks in results.values():
+            checks["acdd"].pop("report_timestamp")
+        outputs.append(results)
+    assert list(outputs[1]) == locs
+    assert outputs[0] == outputs[1]
+    if not http_server.ranges:
+        # the downloads, made by the prefetching threads
+        assert http_server.max_active == 2
@@ -0,0 +1,163 @@
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker import reduction
+from compliance_checker.checks.variable_checks.check_bounds_value_consistency import (
+    check_bounds_value_consistency,
+)
+from compliance_checker.reduction import (
+    VariableStats,
+    cached_stats,
+    iter_slabs,
+    reduce_values,
+    reduce_variable,
+    slab_rows,
+    variable_stats,
+)
+from compliance_checker.sampling import SamplingPolicy, sampled
+
+
+@pytest.fixture
+def nc(tmp_path):
+    ds = Dataset(tmp_path / "reduction.nc", "w")
+    ds.createDimension("time", 100)
+    ds.createDimension("x", 8)
+    ds.createDimension("bnds", 2)
+    temp = ds.createVariable(
+        "temp", "f4", ("time", "x"), chunksizes=(10, 8), fill_value=-1.0
+    )
+    data = np.ma.masked_array(
+        np.arange(800, dtype="f4").reshape(100, 8),
+        mask=np.zeros((100, 8), bool),
+    )
+    data[0, 0] = np.ma.masked
+    data[99, 7] = np.ma.masked
+    temp[:] = data
+    time = ds.createVariable("time", "f8", ("time",), chunksizes=(10,))
+    time.bounds = "time_bnds"
+    time[:] = np.arange(100) + 0.5
+    time_bnds = ds.createVariable("time_bnds", "f8", ("time", "bnds"))
+    time_bnds[:] = np.stack([np.arange(100), np.arange(100) + 1], axis=1)
+    yield ds
+    ds.close()
+
+
+def test_slab_rows_chunk_aligned(nc):
+    temp = nc.variables["temp"]
+    # 25 rows of 32 bytes, rounded down to whole chunks of 10 rows
+    assert list(slab_rows(temp, slab_bytes=25 * 32)) == [
+        slice(i, i + 20) for i in range(0, 100, 20)
+    ]
+    # at least one chunk per slab
+    assert len(list(slab_rows(temp, slab_bytes=1))) == 10
+    # rows not starting on a chunk boundary end on the next one
+    assert list(slab_rows(temp, [slice(5, 25), slice(90, 100)], slab_bytes=1)) == [
+        slice(5, 10),
+        slice(10, 20),
+        slice(20, 25),
+        slice(90, 100),
+    ]
+    slabs = list(iter_slabs(temp, slab_bytes=1))
+    assert np.ma.allequal(np.ma.concatenate(slabs), temp[:])
+
+
+def test_reduce_variable(nc):
+    stats = reduce_variable(nc.variables["temp"], slab_bytes=1)
+    assert (stats.count, stats.masked_count, stats.nan_count) == (800, 2, 0)
+    assert stats.valid_count == 798
+    assert (stats.min, stats.max) == (1, 798)
+    assert isinstance(stats.min, np.float32)
+    assert stats.coverage == 1
+    # monotonicity is only defined for 1-D variables
+    assert stats.increasing is None
+
+    stats = reduce_variable(nc.variables["time"], slab_bytes=1)
+    assert stats.increasing and stats.sorted and not stats.decreasing
+
+
+@pytest.mark.parametrize(
+    ("values", "increasing", "decreasing", "is_sorted"),
+    [
+        ([1, 2, 3, 4], True, False, True),
+        ([4, 3, 2, 1], False, True, False),
+        ([1, 2, 2, 3], False, False, True),
+        ([1, np.nan, 3, 4], False, False, False),
+        ([1], True, True, True),
+        # a masked value masks the differences on both sides
+        (np.ma.masked_array([1, 2, 0, 3], mask=[0, 0, 1, 0]), True, False, True),
+        (np.ma.masked_array([1, 2], mask=[0, 1]), False, False, False),
+    ],
+)
+def test_monotonicity(values, increasing, decreasing, is_sorted):
+    stats = VariableStats()
+    values = np.ma.asanyarray(values, dtype="f8")
+    # across slab boundaries
+    for i in range(len(values)):
+        stats.update(values[i : i + 1])
+    assert stats.increasing == increasing
+    assert stats.decreasing == decreasing
+    assert stats.sorted == is_sorted
+
+    old_diff = np.diff(values)
+    assert bool(np.all(old_diff > 0) or np.all(old_diff < 0)) == (
+        increasing or decreasing
+    )
+
+
+def test_nan_values():
+    stats = VariableStats()
+    stats.update(np.ma.masked_array([0.0, 2.0, np.nan], mask=[1, 0, 0], dtype="f4"))
+    stats.update(np.array([1.0, np.inf, 3.0], "f4"))
+    assert (stats.masked_count, stats.nan_count, stats.inf_count) == (1, 1, 1)
+    assert (stats.valid_count, stats.finite_count) == (4, 3)
+    assert (stats.first, stats.last) == (2, 3)
+    assert (stats.nanmin, stats.nanmax) == (1, np.inf)
+    # as numpy, NaN values propagate to the min and max
+    assert np.isnan(stats.min) and np.isnan(stats.max)
+
+
+def test_reduce_values_sampled(nc):
+    temp = nc.variables["temp"]
+    with sampled(nc, SamplingPolicy(chunks=2)):
+        stats = reduce_values(nc, temp)
+    assert stats.coverage == 0.2
+    assert stats.count == 160
+    assert (stats.min, stats.max) == (1, 798)
+    assert reduce_values(nc, temp).coverage == 1
+
+
+def test_bounds_consistency_slabs(nc, monkeypatch):
+    monkeypatch.setattr(reduction, "SLAB_BYTES", 1)
+    assert check_bounds_value_consistency(nc, "time")[0].value == (1, 1)
+
+    nc.variables["time"][37] = 50
+    nc.variables["time"][38] = np.ma.masked
+    result = check_bounds_value_consistency(nc, "time")[0]
+    assert result.value == (0, 1)
+    # indices into the whole variable, masked values are not compared
+    assert (
+        "1 value(s) lie outside declared bounds. Example(s): 37/50.0" in result.msgs[0]
+    )
+
+
+def test_cached_stats(nc, monkeypatch):
+    reads = []
+
+    def counting_reduce_variable(variable, rows=None, slab_bytes=None):
+        reads.append(variable.name)
+        return reduce_variable(variable, rows, slab_bytes)
+
+    monkeypatch.setattr(reduction, "reduce_variable", counting_reduce_variable)
+    time = nc.variables["time"]
+    with cached_stats(nc):
+        stats = variable_stats(nc, time)
+        assert variable_stats(nc, time) is stats
+        # nested blocks keep the statistics
+        with cached_stats(nc):
+            assert variable_stats(nc, time) is stats
+        # other rows are reduced on their own
+        assert variable_stats(nc, time, [slice(0, 10)]).count == 10
+        assert reads == ["time", "time"]
+    assert variable_stats(nc, time) is not stats
+    assert reads == ["time", "time", "time"]
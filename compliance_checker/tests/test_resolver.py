@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from compliance_checker.protocols.resolver import (
+    NETCDF,
+    OPENDAP,
+    UNKNOWN,
+    Protocol,
+    resolve,
+    url_pattern,
+)
+from compliance_checker.suite import CheckSuite
+
+from .conftest import datadir
+
+
+def _base_url(http_server):
+    host, port = http_server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+@pytest.fixture
+def fileserver(tmp_path):
+    os.makedirs(tmp_path / "thredds" / "fileServer")
+    for name in ("bad_region.nc", "bad_units.nc", "bad_data_type.nc"):
+        (tmp_path / "thredds" / "fileServer" / name).write_bytes(
+            (datadir / name).read_bytes(),
+        )
+
+
+def test_url_pattern():
+    pattern = url_pattern("https://esgf.example.org/thredds/fileServer/CMIP6/a/tas.nc")
+    assert pattern == url_pattern("https://esgf.example.org/thredds/fileServer/b/pr.nc")
+    for url in (
+        "https://esgf.example.org/thredds/dodsC/CMIP6/a/tas.nc",
+        "https://esgf.example.org/thredds/fileServer/CMIP6/a/tas.nc?var=tas",
+        "https://esgf.example.org/thredds/fileServer/CMIP6/a/tas.zarr",
+        "https://other.example.org/thredds/fileServer/CMIP6/a/tas.nc",
+    ):
+        assert url_pattern(url) != pattern
+
+
+def test_resolve_netcdf(http_server, fileserver):
+    base = f"{_base_url(http_server)}/thredds/fileServer"
+    assert resolve(f"{base}/bad_region.nc") == Protocol(NETCDF, http_server.ranges)
+    # a single request, answering both the protocol and the range support
+    assert len(http_server.requests) == 1
+    # the other files of the service are not probed
+    assert resolve(f"{base}/bad_units.nc") == Protocol(NETCDF, http_server.ranges)
+    assert len(http_server.requests) == 1
+
+    CheckSuite.load_all_available_checkers()
+    cs = CheckSuite()
+    score_groups = cs.check_location(f"{base}/bad_data_type.nc", ["acdd"])
+    assert not score_groups["acdd"][1]
+    # no OPeNDAP requests
+    assert not any(path.endswith(".das") for _, path, _ in http_server.requests)
+
+
+def test_resolve_opendap(http_server):
+    base = _base_url(http_server)
+    assert resolve(f"{base}/dodsC/CMIP6/tas.nc") == Protocol(OPENDAP, False)
+    assert resolve(f"{base}/dodsC/CMIP6/pr.nc").name == OPENDAP
+    assert [path for _, path, _ in http_server.requests] == ["/dodsC/CMIP6/tas.nc"]
+
+
+def test_resolve_unknown(http_server):
+    url = f"{_base_url(http_server)}/missing/tas.nc"
+    assert resolve(url) == UNKNOWN
+    # the probe and the OPeNDAP Data Attribute Structure request
+    assert [path for _, path, _ in http_server.requests] == [
+        "/missing/tas.nc",
+        "/missing/tas.nc.das",
+    ]
+    # unknown protocols may come from transient errors and are not cached
+    assert resolve(url) == UNKNOWN
+    assert len(http_server.requests) == 4
+
+
+def test_session_keep_alive(http_server, fileserver):
+    base = _base_url(http_server)
+    resolve(f"{base}/thredds/fileServer/bad_region.nc")
+    resolve(f"{base}/dodsC/CMIP6/tas.nc")
+    resolve(f"{base}/dodsC/CMIP6/tas.nc?time")
+    ports = [port for _, _, port in http_server.requests]
+    assert len(ports) == 3
+    # a probe answered with the whole file drops its connection
+    assert len(set(ports)) == (1 if http_server.ranges else 2)
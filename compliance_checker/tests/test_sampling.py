@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker.acdd import ACDD1_3Check
+from compliance_checker.checks.variable_checks.check_bounds_value_consistency import (
+    check_bounds_value_consistency,
+)
+from compliance_checker.sampling import (
+    SamplingPolicy,
+    get_policy,
+    read_values,
+    sampled,
+)
+
+
+@pytest.fixture
+def nc(tmp_path):
+    ds = Dataset(tmp_path / "sampled.nc", "w")
+    ds.createDimension("time", 1000)
+    ds.createDimension("bnds", 2)
+    ds.createDimension("x", 4)
+    time = ds.createVariable("time", "f8", ("time",))
+    time.bounds = "time_bnds"
+    time[:] = np.arange(1000) + 0.5
+    time_bnds = ds.createVariable("time_bnds", "f8", ("time", "bnds"))
+    time_bnds[:] = np.stack([np.arange(1000), np.arange(1000) + 1], axis=1)
+    temp = ds.createVariable("temp", "f4", ("time", "x"), chunksizes=(50, 4))
+    temp[:] = np.tile(np.arange(1000, dtype="f4")[:, None], (1, 4))
+    temp.actual_range = np.array([0, 999], "f4")
+    yield ds
+    ds.close()
+
+
+@pytest.mark.parametrize(
+    ("spec", "expected"),
+    [
+        ("fraction:0.1", {"fraction": 0.1}),
+        ("bytes:64M", {"max_bytes": 64 * 1024**2}),
+        ("bytes:1000", {"max_bytes": 1000}),
+        ("chunks:4", {"chunks": 4}),
+    ],
+)
+def test_from_spec(spec, expected):
+    policy = SamplingPolicy.from_spec(spec)
+    for name, value in expected.items():
+        assert getattr(policy, name) == value
+
+
+@pytest.mark.parametrize(
+    "spec",
+    ["fraction:0", "fraction:2", "bytes:lots", "bytes:1T", "chunks:-1", "rows:10"],
+)
+def test_from_spec_invalid(spec):
+    with pytest.raises(ValueError):
+        SamplingPolicy.from_spec(spec)
+
+
+def test_select_rows(nc):
+    # contiguous variables are read in blocks spread over the dimension
+    rows = SamplingPolicy(fraction=0.1).select_rows(nc.variables["time"])
+    assert rows[0].start == 0
+    assert rows[-1].stop == 1000
+    assert sum(row.stop - row.start for row in rows) >= 100
+
+    # chunked variables are read in whole chunks
+    rows = SamplingPolicy(chunks=3).select_rows(nc.variables["temp"])
+    assert rows == [slice(0, 50), slice(500, 550), slice(950, 1000)]
+
+    # 16 bytes per row of temp
+    rows = SamplingPolicy(max_bytes=1600).select_rows(nc.variables["temp"])
+    assert sum(row.stop - row.start for row in rows) == 100
+
+    # variables within the limit are read whole
+    assert SamplingPolicy(fraction=1).select_rows(nc.variables["temp"]) is None
+    assert SamplingPolicy(max_bytes=10**6).select_rows(nc.variables["time"]) is None
+
+
+def test_read_values(nc):
+    temp = nc.variables["temp"]
+    values, coverage = read_values(nc, temp)
+    assert coverage == 1.0
+    assert values.shape == (1000, 4)
+
+    with sampled(nc, SamplingPolicy(chunks=2)):
+        assert get_policy(nc) is not None
+        values, coverage = read_values(nc, temp)
+    assert get_policy(nc) is None
+    assert coverage == 0.1
+    assert values.shape == (100, 4)
+    assert values[-1, 0] == 999
+
+
+def test_sampled_checks(nc):
+    acdd = ACDD1_3Check()
+    nc.geospatial_vertical_min = 0
+    nc.geospatial_vertical_max = 999
+    with sampled(nc, SamplingPolicy(chunks=2)):
+        result = acdd._check_total_z_extents(nc, "temp")
+        assert result.value == (2, 2)
+        assert "sampled: checked 10.0% of the values of 'temp'" in result.msgs
+
+        result = check_bounds_value_consistency(nc, "time")[0]
+        assert result.value == (1, 1)
+        assert any(msg.startswith("sampled") for msg in result.msgs)
+
+        # sampled values beyond the extents fail
+        nc.geospatial_vertical_max = 500
+        result = acdd._check_total_z_extents(nc, "temp")
+        assert result.value == (1, 2)
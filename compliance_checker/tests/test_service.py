@@ -0,0 +1,169 @@
+import json
+import subprocess
+import threading
+
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker import service
+from compliance_checker.suite import CheckSuite
+
+
+@pytest.fixture
+def nc_path(tmp_path):
+    path = tmp_path / "example.nc"
+    with Dataset(path, "w") as nc:
+        nc.title = "Service test"
+        nc.createDimension("time", 2)
+        nc.createVariable("time", "f8", ("time",))[:] = [0, 1]
+    return str(path)
+
+
+@pytest.fixture
+def check_suite():
+    cs = CheckSuite()
+    cs.load_all_available_checkers()
+    return cs
+
+
+def _start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_unix_socket_service(tmp_path, check_suite, nc_path):
+    socket_path = str(tmp_path / "cc.sock")
+    server = service.UnixCheckServer(socket_path, check_suite)
+    _start(server)
+    try:
+        results, passed, errors = service.submit(
+            [nc_path],
+            tests=["acdd"],
+            socket_path=socket_path,
+            timeout=60,
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert list(results) == [nc_path]
+    assert results[nc_path]["acdd"]["testname"] == "acdd:1.3"
+    # ACDD global attributes are missing from the test dataset
+    assert not passed
+    assert not errors
+
+
+def test_tcp_service_matches_check_suite(check_suite, nc_path):
+    server = service.CheckServer(("127.0.0.1", 0), check_suite)
+    _start(server)
+    host, port = server.server_address[:2]
+    try:
+        results, passed, errors = service.submit(
+            [nc_path],
+            tests=["acdd"],
+            criteria="strict",
+            host=host,
+            port=port,
+            timeout=60,
+        )
+        with pytest.raises(RuntimeError):
+            service.submit([], host=host, port=port, timeout=60)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    score_groups = check_suite.check_location(nc_path, ["acdd"])
+    expected = check_suite.dict_output("acdd", score_groups["acdd"][0], nc_path, 1)
+    expected.pop("report_timestamp")
+    results[nc_path]["acdd"].pop("report_timestamp")
+    assert results[nc_path]["acdd"] == json.loads(json.dumps(expected))
+
+
+def test_parse_check_request():
+    request = service.parse_check_request(b'{"datasets": "a.nc"}')
+    assert request["datasets"] == ["a.nc"]
+    assert request["tests"] == ["acdd"]
+    assert request["criteria"] == "normal"
+    request = service.parse_check_request(
+        b'{"datasets": ["a.nc"], "tests": "cf", "skip_checks": null}',
+    )
+    assert request["tests"] == ["cf"]
+    assert request["skip_checks"] is None
+    for body in (
+        b"not json",
+        b"[]",
+        b'{"datasets": []}',
+        b'{"datasets": ["a.nc"], "criteria": "x"}',
+        b'{"datasets": ["a.nc"], "criteria": ["normal"]}',
+        b'{"datasets": ["a.nc"], "tests": {"acdd": 1}}',
+        b'{"datasets": ["a.nc"], "include_checks": [1]}',
+        b'{"datasets": ["a.nc"], "skip_checks": "check_high"}x',
+    ):
+        with pytest.raises(ValueError):
+            service.parse_check_request(body)
+
+
+def test_tcp_service_token(check_suite, nc_path):
+    # listening beyond loopback requires a token
+    with pytest.raises(ValueError, match="without a token"):
+        service.CheckServer(("0.0.0.0", 0), check_suite)
+
+    server = service.CheckServer(("127.0.0.1", 0), check_suite, token="secret")
+    _start(server)
+    host, port = server.server_address[:2]
+    try:
+        with pytest.raises(RuntimeError, match="401"):
+            service.submit([nc_path], host=host, port=port, timeout=60)
+        with pytest.raises(RuntimeError, match="401"):
+            service.submit([nc_path], host=host, port=port, timeout=60, token="wrong")
+        results, _passed, _errors = service.submit(
+            [nc_path],
+            tests=["acdd"],
+            host=host,
+            port=port,
+            timeout=60,
+            token="secret",
+        )
+        assert list(results) == [nc_path]
+        # unknown checkers are a bad request
+        with pytest.raises(RuntimeError, match="400"):
+            service.submit(
+                [nc_path],
+                tests=["no_such_checker"],
+                host=host,
+                port=port,
+                timeout=60,
+                token="secret",
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_tcp_service_survives_failed_cdl(tmp_path, check_suite, nc_path, monkeypatch):
+    cdl_path = tmp_path / "broken.cdl"
+    cdl_path.write_text("netcdf broken {")
+
+    # ncgen cannot convert the CDL file, upon which the suite exits
+    def failed_ncgen(args, **kwargs):
+        return subprocess.CompletedProcess(args, 1, stderr=b"syntax error")
+
+    monkeypatch.setattr(subprocess, "run", failed_ncgen)
+    server = service.CheckServer(("127.0.0.1", 0), check_suite)
+    _start(server)
+    host, port = server.server_address[:2]
+    try:
+        with pytest.raises(RuntimeError, match="400"):
+            service.submit([str(cdl_path)], host=host, port=port, timeout=60)
+        results, _passed, _errors = service.submit(
+            [nc_path],
+            tests=["acdd"],
+            host=host,
+            port=port,
+            timeout=60,
+        )
+        assert list(results) == [nc_path]
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -1,13 +1,24 @@
 import os
+import time
+from collections import defaultdict
+from importlib.metadata import entry_points
 from importlib.resources import files
 from pathlib import Path
 
 import numpy as np
 import pytest
+from netCDF4 import Dataset
 
 from compliance_checker.acdd import ACDDBaseCheck
-from compliance_checker.base import BaseCheck, GenericFile, Result
-from compliance_checker.suite import CheckSuite
+from compliance_checker.base import (
+    BaseCheck,
+    BaseNCCheck,
+    GenericFile,
+    Result,
+    path_only,
+    reads_data,
+)
+from compliance_checker.suite import CheckSuite, CheckTimeoutError
 
 static_files = {
     "2dim": files("compliance_checker") / "tests/data/2dim-grid.nc",
@@ -21,6 +32,67 @@ static_files = {
 }
 
 
+class SlowCheck(BaseNCCheck, BaseCheck):
+    """Checker with a check that runs for much longer than the others"""
+
+    _cc_spec = "slow"
+    _cc_spec_version = "1.0"
+
+    def check_a_fast(self, ds):
+        return Result(BaseCheck.HIGH, True, "fast")
+
+    def check_b_slow(self, ds):
+        time.sleep(10)
+        return Result(BaseCheck.HIGH, True, "slow")
+
+    def check_c_fast(self, ds):
+        return Result(BaseCheck.HIGH, True, "fast again")
+
+
+class GuardedSlowCheck(BaseNCCheck, BaseCheck):
+    """Checker with slow checks which catch the exceptions raised in them"""
+
+    _cc_spec = "guarded_slow"
+    _cc_spec_version = "1.0"
+
+    def check_a_exception(self, ds):
+        for _ in range(100):
+            try:
+                time.sleep(0.1)
+            except Exception:
+                pass
+        return Result(BaseCheck.HIGH, True, "exception")
+
+    def check_b_bare(self, ds):
+        for _ in range(10):
+            try:
+                time.sleep(0.1)
+            except:  # noqa: E722
+                pass
+        return Result(BaseCheck.HIGH, True, "bare")
+
+
+class GateCheck(BaseNCCheck, BaseCheck):
+    """Checker with path only, metadata and data reading checks"""
+
+    _cc_spec = "gate"
+    _cc_spec_version = "1.0"
+
+    @reads_data
+    def check_a_data(self, ds):
+        return Result(BaseCheck.LOW, False, "data")
+
+    def check_b_header(self, ds):
+        return Result(BaseCheck.MEDIUM, False, "header")
+
+    @path_only
+    def check_c_path(self, ds):
+        return Result(BaseCheck.HIGH, True, "path")
+
+    def check_d_header(self, ds):
+        return Result(BaseCheck.HIGH, (2, 2), "header again")
+
+
 class TestSuite:
     # @see
     # http://www.saltycrane.com/blog/2012/07/how-prevent-nose-unittest-using-docstring-when-verbosity-2/
@@ -116,6 +188,191 @@ class TestSuite:
         # none of the skipped messages should be in the result set
         assert len(msg_set & skipped_messages) == 0
 
+    def test_profile_checks(self):
+        """Tests that check timings are recorded when profiling"""
+        ds = self.cs.load_dataset(static_files["2dim"])
+        self.cs.run_all(ds, ["acdd"], include_checks=["check_high"])
+        assert self.cs.check_profile == {}
+
+        self.cs.options = {"profile": True}
+        score_groups = self.cs.run_all(ds, ["acdd"], include_checks=["check_high"])
+        profile = self.cs.check_profile["acdd"]
+        assert set(profile) == {"setup", "check_high"}
+        assert set(profile["check_high"]) == {"wall_time", "cpu_time", "peak_memory"}
+        assert profile["check_high"]["wall_time"] >= 0
+        assert "check_profile" in self.cs.dict_output(
+            "acdd",
+            score_groups["acdd"][0],
+            "2dim",
+            1,
+            profile,
+        )
+
+    def test_check_time_budgets(self, monkeypatch):
+        """Tests that checks exceeding their time budget are recorded as errors"""
+        monkeypatch.setitem(CheckSuite.checkers, "slow", SlowCheck)
+        with Dataset("budget.nc", "w", diskless=True) as ds:
+            self.cs.options = {"check_timeout": 0.2}
+            start = time.monotonic()
+            groups, errs = self.cs.run_all(ds, ["slow"])["slow"]
+            assert time.monotonic() - start < 5
+            assert list(errs) == ["check_b_slow"]
+            assert isinstance(errs["check_b_slow"][0], CheckTimeoutError)
+            assert {g.name for g in groups} == {"fast", "fast again"}
+
+            # checks left once the dataset budget is used up are not run
+            self.cs.options = {"dataset_timeout": 0.2}
+            groups, errs = self.cs.run_all(ds, ["slow"])["slow"]
+            assert sorted(errs) == ["check_b_slow", "check_c_fast"]
+            assert errs["check_c_fast"][1] is None
+            assert {g.name for g in groups} == {"fast"}
+
+    def test_check_time_budgets_caught(self, monkeypatch):
+        """Tests that checks catching exceptions cannot escape their time budget"""
+        monkeypatch.setitem(CheckSuite.checkers, "guarded_slow", GuardedSlowCheck)
+        with Dataset("guarded.nc", "w", diskless=True) as ds:
+            self.cs.options = {"check_timeout": 0.2}
+            start = time.monotonic()
+            groups, errs = self.cs.run_all(ds, ["guarded_slow"])["guarded_slow"]
+            assert time.monotonic() - start < 5
+            assert sorted(errs) == ["check_a_exception", "check_b_bare"]
+            assert all(isinstance(e, CheckTimeoutError) for e, _ in errs.values())
+            assert not groups
+
+    def test_entry_point_spec_versions(self):
+        """
+        Tests that the entry point names of the bundled checkers carry their
+        spec version, from which they are listed without being imported
+        """
+        for ep in entry_points(group="compliance_checker.suites"):
+            if not ep.value.startswith("compliance_checker."):
+                continue
+            checker = ep.load()
+            assert CheckSuite._entry_point_spec(ep.name) == (
+                checker._cc_spec,
+                checker._cc_spec_version,
+            )
+
+    def test_metadata_only(self):
+        """Tests that checks which read variable data are skipped in metadata only runs"""
+
+        def check_names(checker_name):
+            checks = self.cs._get_checks(
+                self.cs.checkers[checker_name],
+                {},
+                defaultdict(lambda: None),
+            )
+            return {c.__name__ for c, _ in checks}
+
+        all_cf_checks = check_names("cf:1.8")
+        all_acdd_checks = check_names("acdd")
+        self.cs.options = {"metadata_only": True}
+        assert all_cf_checks - check_names("cf:1.8") == {
+            "check_actual_range",
+            "check_calendar_crossover",
+            "check_cell_boundaries_interval",
+            "check_coordinate_variables_strict_monotonicity",
+            "check_geographic_region",
+            "check_geometry",
+            "check_taxa",
+        }
+        assert all_acdd_checks - check_names("acdd") == {
+            "check_lat_extents",
+            "check_lon_extents",
+            "check_time_extents",
+            "check_vertical_extents",
+        }
+
+    def test_fail_fast(self, monkeypatch):
+        """Tests that fail-fast runs stop at the first failure blocking the criteria"""
+        monkeypatch.setitem(CheckSuite.checkers, "gate", GateCheck)
+        monkeypatch.setitem(CheckSuite.checkers, "gate_copy", GateCheck)
+        with Dataset("gate.nc", "w", diskless=True) as ds:
+            full_groups = self.cs.run_all(ds, ["gate"])["gate"][0]
+
+            self.cs.options = {"fail_fast": 1}
+            checks = self.cs._get_checks(GateCheck(), {}, defaultdict(lambda: None))
+            assert [c.__name__ for c, _ in checks] == [
+                "check_c_path",
+                "check_b_header",
+                "check_d_header",
+                "check_a_data",
+            ]
+            # no further checker runs after the blocking failure
+            score_groups = self.cs.run_all(ds, ["gate", "gate_copy"])
+            assert len(score_groups) == 1
+            groups = next(iter(score_groups.values()))[0]
+            assert {g.name for g in groups} == {"path", "header"}
+            assert not self.cs.passtree(groups, 1)
+            assert not self.cs.passtree(full_groups, 1)
+
+            # failures below the limit don't stop the run
+            self.cs.options = {"fail_fast": 3}
+            groups = self.cs.run_all(ds, ["gate"])["gate"][0]
+            assert [g.serialize() for g in groups] == [
+                g.serialize() for g in full_groups
+            ]
+            assert self.cs.passtree(groups, 3)
+
+    def test_reused_checkers(self, tmp_path):
+        """Tests that checker instances are kept across datasets without leaking results"""
+
+        def make_dataset(name, variables):
+            path = str(tmp_path / name)
+            with Dataset(path, "w") as nc:
+                nc.title = name
+                nc.createDimension("time", 3)
+                for var_name, attrs in variables.items():
+                    var = nc.createVariable(var_name, "f8", ("time",))
+                    var.setncatts(attrs)
+                    var[:] = [0, 1, 2]
+            return path
+
+        first = make_dataset(
+            "first.nc",
+            {
+                "time": {"units": "days since 2000-01-01", "standard_name": "time"},
+                "temp": {
+                    "units": "degC",
+                    "standard_name": "not_a_standard_name",
+                    "grid_mapping": "missing_crs",
+                },
+            },
+        )
+        # shares a variable name with the first dataset, so that results
+        # kept by a checker for "temp" would show up again
+        second = make_dataset(
+            "second.nc",
+            {
+                "time": {"units": "seconds since 1970-01-01", "axis": "T"},
+                "temp": {"units": "K", "grid_mapping": ""},
+            },
+        )
+        checker_names = ["cf:1.6", "acdd"]
+
+        self.cs.check_location(first, checker_names)
+        instances = dict(self.cs._checker_instances)
+        reused = self.cs.check_location(second, checker_names)
+        assert {
+            cls: checker for cls, (_opts, checker) in self.cs._checker_instances.items()
+        } == {cls: checker for cls, (_opts, checker) in instances.items()}
+
+        fresh_suite = CheckSuite()
+        fresh = fresh_suite.check_location(second, checker_names)
+        for checker_name in checker_names:
+            assert reused[checker_name][0] == fresh[checker_name][0]
+
+        # different checker options get a new instance
+        self.cs.options = {"cf": {"enable_appendix_a_checks": None}}
+        self.cs.check_location(second, ["cf:1.6"])
+        cf_class = self.cs.checkers["cf:1.6"]
+        assert self.cs._checker_instances[cf_class][1] is not instances[cf_class][1]
+
+        # subclasses are only reused when they set _cc_reusable themselves
+        subclass = type("CFSubclassCheck", (cf_class,), {})
+        checker = self.cs._get_checker_instance(subclass, {})
+        assert self.cs._get_checker_instance(subclass, {}) is not checker
+
     def test_skip_check_level(self):
         """Checks level limited skip checks"""
         ds = self.cs.load_dataset(static_files["ru07"])
@@ -186,6 +443,30 @@ class TestSuite:
         assert score[1].name == "two"
         assert score[1].value == (1, 2)
 
+    def test_nested_score_grouping(self):
+        res = [
+            Result(BaseCheck.HIGH, (1, 2), ("b", "var1"), ["var1 first"]),
+            Result(BaseCheck.HIGH, False, "b", ["b only"]),
+            Result(BaseCheck.LOW, True, ("b", "var1")),
+            Result(BaseCheck.HIGH, (0, 1), ("b", "var1"), ["var1 second"]),
+            Result(BaseCheck.HIGH, True, ("a",)),
+        ]
+        score = self.cs.scores(res)
+        assert [(r.name, r.weight, r.value) for r in score] == [
+            ("a", BaseCheck.HIGH, (1, 1)),
+            ("b", BaseCheck.LOW, (1, 1)),
+            ("b", BaseCheck.HIGH, (1, 4)),
+        ]
+        # the result ending at "b" is grouped apart from those of its
+        # variables, the messages keep the order of the checks
+        children = score[2].children
+        assert [(r.name, r.value, r.msgs) for r in children] == [
+            ("", (0, 1), ["b only"]),
+            ("var1", (1, 3), ["var1 first", "var1 second"]),
+        ]
+        assert score[2].msgs == []
+        assert self.cs.scores([Result(BaseCheck.HIGH, True, ())]) == []
+
     @pytest.fixture
     def cleanup_nc_file(self, request):
         # Define the cleanup function
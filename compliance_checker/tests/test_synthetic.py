@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pytest
+from netCDF4 import Dataset
+
+from compliance_checker.crawler import iter_datasets
+from compliance_checker.synthetic import DEFECTS, iter_tree, parse_size
+
+
+def _read(path):
+    with Dataset(path) as nc:
+        return nc.__dict__, {name: var[:] for name, var in nc.variables.items()}
+
+
+def test_drs_tree(tmp_path):
+    files = list(
+        iter_tree(tmp_path, files=4, files_per_dataset=2, time_steps=3, grid=(4, 8))
+    )
+    assert len(files) == 4
+    assert sorted(iter_datasets(tmp_path)) == sorted(f.path for f in files)
+    # two datasets of two consecutive files each
+    assert files[0].dataset_id == files[1].dataset_id != files[2].dataset_id
+
+    for generated in files:
+        attrs, variables = _read(generated.path)
+        drs = os.path.relpath(generated.path, tmp_path).split(os.sep)
+        assert drs[:-1] == [
+            "CMIP6",
+            attrs["activity_id"],
+            attrs["institution_id"],
+            attrs["source_id"],
+            attrs["experiment_id"],
+            attrs["variant_label"],
+            attrs["table_id"],
+            attrs["variable_id"],
+            attrs["grid_label"],
+            "v20190101",
+        ]
+        assert drs[-1].startswith(
+            "_".join(drs[i] for i in (7, 6, 3, 4, 5, 8)) + "_",
+        )
+        assert generated.dataset_id == ".".join(drs[:9]) + "#20190101"
+        assert generated.size == os.path.getsize(generated.path)
+        assert variables[attrs["variable_id"]].shape == (3, 4, 8)
+        bounds = variables["time_bnds"]
+        assert np.all(bounds[:, 0] <= variables["time"])
+        assert np.all(variables["time"] <= bounds[:, 1])
+
+
+def test_periods(tmp_path):
+    names = [
+        os.path.basename(f.path)
+        for f in iter_tree(
+            tmp_path, files=24, files_per_dataset=2, time_steps=14, grid=(2, 2)
+        )
+    ]
+    assert any(name.endswith("_gn_185001-185102.nc") for name in names)
+    assert any(name.endswith("_gn_185103-185204.nc") for name in names)
+    # daily files
+    assert any(name.endswith("_gn_18500101-18500114.nc") for name in names)
+    assert any(name.endswith("_gn_18500115-18500128.nc") for name in names)
+
+
+def test_deterministic(tmp_path):
+    kwargs = {"files": 3, "time_steps": 2, "grid": (2, 3), "defect_rate": 0.5}
+    first = list(iter_tree(tmp_path / "a", seed=1, **kwargs))
+    second = list(iter_tree(tmp_path / "b", seed=1, **kwargs))
+    other = list(iter_tree(tmp_path / "c", seed=2, **kwargs))
+    for a, b in zip(first, second):
+        assert os.path.relpath(a.path, tmp_path / "a") == os.path.relpath(
+            b.path, tmp_path / "b"
+        )
+        assert a.defect == b.defect
+        attrs_a, vars_a = _read(a.path)
+        attrs_b, vars_b = _read(b.path)
+        assert attrs_a == attrs_b
+        assert all(np.array_equal(vars_a[name], vars_b[name]) for name in vars_a)
+    assert [_read(a.path)[0]["tracking_id"] for a in first] != [
+        _read(c.path)[0]["tracking_id"] for c in other
+    ]
+
+
+def test_chunking_and_compression(tmp_path):
+    (generated,) = iter_tree(
+        tmp_path, files=1, time_steps=12, grid=(4, 8), chunk_time=4, complevel=5
+    )
+    with Dataset(generated.path) as nc:
+        var = nc.variables[nc.variable_id]
+        assert var.chunking() == [4, 4, 8]
+        assert var.filters()["zlib"]
+        assert var.filters()["complevel"] == 5
+
+
+@pytest.mark.parametrize("defect", DEFECTS)
+def test_defects(tmp_path, defect):
+    (generated,) = iter_tree(
+        tmp_path, files=1, time_steps=6, grid=(2, 2), defect_rate=1, defects=[defect]
+    )
+    assert generated.defect == defect
+    attrs, variables = _read(generated.path)
+    times, bounds = variables["time"], variables["time_bnds"]
+    if defect == "missing_attribute":
+        assert (
+            len(
+                {
+                    "institution_id",
+                    "table_id",
+                    "variant_label",
+                    "frequency",
+                    "grid_label",
+                }
+                - set(attrs)
+            )
+            == 1
+        )
+    elif defect == "attribute_mismatch":
+        assert f"_{attrs['experiment_id']}_" not in os.path.basename(generated.path)
+    elif defect == "bad_units":
+        assert variables[attrs["variable_id"]] is not None
+        with Dataset(generated.path) as nc:
+            assert nc.variables[attrs["variable_id"]].units.startswith("degrees of ")
+    elif defect == "bounds_violation":
+        assert np.any(times > bounds[:, 1])
+    elif defect == "time_gap":
+        assert len(times) == 5
+
+
+def test_unknown_defect(tmp_path):
+    with pytest.raises(ValueError):
+        list(iter_tree(tmp_path, files=1, defects=["corrupt"]))
+
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("64k") == 64 * 1024
+    assert parse_size("1.5M") == 3 * 512 * 1024
@@ -13,7 +13,7 @@
 
 import os
 import toml
-from compliance_checker.base import BaseCheck, Result, TestCtx
+from compliance_checker.base import BaseCheck, Result, TestCtx, path_only, reads_data
 from .wcrp_base import WCRPBaseCheck
 from netCDF4 import Dataset
 from ..checks.consistency_checks.check_experiment_consistency import *
@@ -36,6 +36,7 @@ from ..checks.time_checks.check_time_range_vs_filename import *
 # --- Esgvoc universe import---
 try:
     from esgvoc.api.universe import find_terms_in_data_descriptor
+    from esgvoc.core.exceptions import EsgvocException
     ESG_VOCAB_AVAILABLE = True
 except ImportError:
     ESG_VOCAB_AVAILABLE = False
@@ -47,6 +48,7 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
     _cc_spec = "wcrp_cmip6"
     _cc_spec_version = "1.0"
     _cc_description = "WCRP Project Checks"
+    _cc_reusable = True
     supported_ds = [Dataset]
 
     def __init__(self, options=None):
@@ -59,6 +61,9 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
 
         # Define project name here for vocabulary checks 
         self.project_name = "cmip6"
+        self._registry_variable = None
+        # whether check_Variable_Registry reported the lookup failures
+        self._registry_reported = False
        
     def _load_project_config(self):
     
@@ -74,10 +79,20 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
             self.config = {}
             print(f"Error parsing TOML configuration from {self.project_config_path}: {e}")
 
+    def reset(self):
+        super().reset()
+        self._registry_variable = None
+        self._registry_reported = False
+
     def setup(self, ds):
         
         """Loads the main configuration and the variable mapping file before running checks."""
         super().setup(ds)
+        self._registry_variable = None
+        self._registry_reported = False
+        # both files are only read once by an instance reused across datasets
+        if self.config is not None:
+            return
         self._load_project_config()
 
         # Load variable mapping directly from 'mapping_variables.toml' located in the same folder as the config
@@ -96,6 +111,7 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
             print(f"Error while loading variable mapping: {e}")
             self.variable_mapping = {}
     
+    @path_only
     def check_Drs_Vocabulary(self, ds):
         
         """
@@ -163,16 +179,25 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
 
 
 
-    def check_Variable_Registry(self, ds):
+    def _find_registry_variable(self, ds):
+        """
+        Looks up the dataset's variable in the esgvoc variable registry, once
+        per dataset.  Returns a tuple of the variable_id, the registry term,
+        its expected dimensions and a list of failure results, which is empty
+        if the variable was found.
+        """
+        if self._registry_variable is not None:
+            return self._registry_variable
 
-        results = []
-        if "variable_registry_checks" not in self.config:
-            return results
+        self._registry_variable = self._lookup_registry_variable(ds)
+        return self._registry_variable
 
+    def _lookup_registry_variable(self, ds):
+        """Uncached lookup done by _find_registry_variable."""
         if not ESG_VOCAB_AVAILABLE:
             ctx = TestCtx(BaseCheck.HIGH, "Variable Registry Discovery")
             ctx.add_failure("The 'esgvoc' library is required but not installed.")
-            return [ctx.to_result()]
+            return None, None, [], [ctx.to_result()]
 
         try:
             variable_id = ds.getncattr("variable_id")
@@ -180,7 +205,7 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
         except AttributeError as e:
             ctx = TestCtx(BaseCheck.HIGH, "Variable Registry Discovery")
             ctx.add_failure(f"Missing required global attribute: {e}.")
-            return [ctx.to_result()]
+            return None, None, [], [ctx.to_result()]
 
         mapping_key = f"{table_id}.{variable_id}"
         
@@ -189,7 +214,7 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
         if not known_branded_variable:
             ctx = TestCtx(BaseCheck.HIGH, "Variable Registry Discovery")
             ctx.add_failure(f"No mapping found for '{mapping_key}'.")
-            return [ctx.to_result()]
+            return variable_id, None, [], [ctx.to_result()]
 
         fields_to_get = [
             "cf_standard_name",
@@ -200,28 +225,48 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
             "description"
         ]
 
-        terms = find_terms_in_data_descriptor(
-            expression=known_branded_variable,
-            data_descriptor_id="known_branded_variable",
-            only_id=True,
-            selected_term_fields=fields_to_get
-        )
+        try:
+            terms = find_terms_in_data_descriptor(
+                expression=known_branded_variable,
+                data_descriptor_id="known_branded_variable",
+                only_id=True,
+                selected_term_fields=fields_to_get,
+            )
+        except EsgvocException as e:
+            ctx = TestCtx(BaseCheck.HIGH, "Variable Registry Discovery")
+            ctx.add_failure(
+                f"Could not look up '{known_branded_variable}' in the vocabulary: {e}"
+            )
+            return variable_id, None, [], [ctx.to_result()]
 
         if not terms:
             ctx = TestCtx(BaseCheck.HIGH, "Variable Registry Discovery")
             ctx.add_failure(f"Could not retrieve vocabulary details for '{known_branded_variable}'.")
-            return [ctx.to_result()]
+            return variable_id, None, [], [ctx.to_result()]
 
         expected = terms[0]
-
-        # === Step 2: Launch checks using discovered info ===
         expected_dims = getattr(expected, 'dimensions', [])
-       
 
         if not isinstance(expected_dims, list) or not all(isinstance(d, str) for d in expected_dims):
             print(f" Unexpected format for expected_dims: {expected_dims}")
             expected_dims = []
 
+        return variable_id, expected, expected_dims, []
+
+    def check_Variable_Registry(self, ds):
+
+        results = []
+        if "variable_registry_checks" not in self.config:
+            return results
+
+        variable_id, expected, expected_dims, failures = self._find_registry_variable(
+            ds
+        )
+        if failures:
+            self._registry_reported = True
+            return failures
+
+        # === Step 2: Launch checks using discovered info ===
         if expected_dims:
             
             actual_dims = set(ds.dimensions.keys())
@@ -333,14 +378,12 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
             if var_name in ds.variables:
                 
                 results.extend(check_variable_shape(var_name, ds, severity=self.get_severity("H")))
-                results.extend(check_bounds_value_consistency(ds, var_name, severity=self.get_severity("H")))
                 all_vars_checked.add(var_name)
 
         # Remaining Variables size checks
         for var_name in sorted(remaining_vars):
             if var_name not in all_vars_checked:
                 results.extend(check_variable_shape(var_name, ds, severity=self.get_severity("H")))
-                results.extend(check_bounds_value_consistency(ds, var_name, severity=self.get_severity("H")))
                 all_vars_checked.add(var_name)
         
     # === Step 7 : Size Checks for bounds and vertices ====
@@ -353,12 +396,55 @@ class Cmip6ProjectCheck(WCRPBaseCheck):
             if dim in ["vertices","nv4"]:
                 results.extend(check_dimension_size_is_equals_to(ds, dimension_name=dim, expected_size=4, severity=self.get_severity("H")))
     
-    # === Step 8 : Time Checks if time exists ====
-        for var in already_checked_vars:
-            if var in ["time"]:
-                results.extend(check_time_range_vs_filename(ds, severity=self.get_severity("H"))) 
-                results.extend(check_time_bounds(ds,severity=self.get_severity("H")))
-                  
+        return results
+
+    @reads_data
+    def check_Variable_Registry_Values(self, ds):
+        """
+        Runs the variable registry checks which read variable data: the bounds
+        value consistency of each variable and the time range and time bounds
+        checks.  Lookup failures are reported by check_Variable_Registry, or
+        here when it did not run, e.g. when skipped.
+        """
+        results = []
+        if "variable_registry_checks" not in self.config:
+            return results
+
+        variable_id, expected, expected_dims, failures = self._find_registry_variable(
+            ds
+        )
+        if failures:
+            return results if self._registry_reported else failures
+
+        all_expected_vars = expected_dims + [variable_id]
+        remaining_vars = set(ds.variables.keys()) - set(all_expected_vars)
+        all_vars_checked = set()
+
+        for var_name in sorted(set(all_expected_vars)):
+            if var_name in ds.variables:
+                results.extend(
+                    check_bounds_value_consistency(
+                        ds, var_name, severity=self.get_severity("H")
+                    )
+                )
+                all_vars_checked.add(var_name)
+
+        for var_name in sorted(remaining_vars):
+            if var_name not in all_vars_checked:
+                results.extend(
+                    check_bounds_value_consistency(
+                        ds, var_name, severity=self.get_severity("H")
+                    )
+                )
+                all_vars_checked.add(var_name)
+
+        # Time checks if time exists
+        if "time" in all_expected_vars:
+            results.extend(
+                check_time_range_vs_filename(ds, severity=self.get_severity("H"))
+            )
+            results.extend(check_time_bounds(ds, severity=self.get_severity("H")))
+
         return results
 
 